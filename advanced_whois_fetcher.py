@@ -1,22 +1,45 @@
+# Import-light core: pandas, requests and python-whois are imported where they
+# are first used, so short-lived workers that never touch them don't pay for them
+# (see bench_import.py).
+from __future__ import annotations
+
 import time
 import random
 import os
+import contextlib
+import itertools
 import json
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from tqdm import tqdm
-import pandas as pd
-import requests
-import whois  # fallback
-from datetime import datetime
-import streamlit as st
-from typing import Dict, List, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import TYPE_CHECKING, Dict, List, Optional
+from urllib.parse import urlsplit
+from date_utils import to_iso_date, normalize_date_columns
+from resilience import get_circuit_breaker, get_retry_budget, is_upstream_failure
+from scheduling import DelayQueue, DispatchPlanner, RegistryResolver
+from tracing import trace_span, instrumented_http_adapter
+from timeouts import AdaptiveTimeouts
+from registrars import registrar_dictionary, compact_columns
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 # ----------------- CONFIG -----------------
 MAX_THREADS = 5                    # concurrency (keep modest)
-RDAP_TIMEOUT = 10                  # seconds for RDAP/HTTP requests
+RDAP_TIMEOUT = 10                  # seconds for RDAP/HTTP requests until a host's latency is learned
 RETRIES = 3
 INITIAL_BACKOFF = 1.0              # seconds
 MAX_BACKOFF = 8.0
+BREAKER_FAILURE_THRESHOLD = 5      # consecutive upstream failures before a source is skipped
+BREAKER_RECOVERY_TIMEOUT = 30.0    # seconds before an open breaker lets a probe through
+RDAP_URL = os.environ.get("WHOIS_RDAP_URL", "https://rdap.org/domain/{domain}")  # env override for stubs/mirrors
+HTTP_POOL_SIZE = 32                # keep-alive connections per host in the shared session
+CACHE_BATCH_SIZE = 500             # domains per cache multi-get / multi-set round trip
+HOST_MAX_IN_FLIGHT = None          # hard cap on lookups per registry host; None = fair share of max_threads
+REGISTRY_SOURCES = ("RDAP", "WHOIS_PORT43")  # sources whose requests land on the domain's registry
+SCHEDULER_POLL = 0.25              # seconds an idle run waits for a scheduler slot before re-checking retries
+PLAN_WINDOW = 5000                 # input domains read ahead so the planner can interleave registries
+VALIDATOR_TTL = 30 * 24 * 3600     # seconds RDAP ETag/Last-Modified validators are kept in the cache
+VALIDATOR_KEY_PREFIX = "rdap-validators:"
 WHOIS_API_KEY = ""                 # Optional: set your paid WHOIS API key if you have one
 WHOIS_API_URL = "https://example-whois-api.com/v1/whois"  # placeholder - change if using paid API
 # ------------------------------------------
@@ -25,25 +48,141 @@ HEADERS = {
     "User-Agent": "Mozilla/5.0 (compatible; WhoisFetcher/1.0; +https://yourdomain.example/)"
 }
 
+_http_session = None
+_http_session_lock = threading.Lock()
+
+def get_http_session():
+    """
+    Process-wide requests session so every fetcher (and WHOISFetcher, which
+    runs on top of AdvancedWHOISFetcher) reuses the same keep-alive pool.
+    """
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            import requests
+            session = requests.Session()
+            # connections report connect/TLS timings when a lookup is being traced
+            adapter = instrumented_http_adapter(
+                connect_observer=adaptive_timeouts.observe_connect,
+                pool_connections=16,
+                pool_maxsize=HTTP_POOL_SIZE
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _http_session = session
+        return _http_session
+
+_registry_resolver = RegistryResolver()
+
+# Per-host connect/read timeouts learned from observed latency, shared by all fetchers
+adaptive_timeouts = AdaptiveTimeouts(default=(RDAP_TIMEOUT, RDAP_TIMEOUT))
+
+def registry_breaker_key(source, host):
+    """Circuit breaker name for an RDAP / port-43 source at one registry host"""
+    return f"{source}:{host}"
+
+def normalize_domain(domain):
+    """Lowercase a domain and strip scheme, path and leading www."""
+    domain = domain.strip().lower()
+    if domain.startswith('http://') or domain.startswith('https://'):
+        domain = domain.split('/')[2]
+    if domain.startswith('www.'):
+        domain = domain[4:]
+    return domain
+
+def not_in_zone_result(domain):
+    """Result for a domain missing from its zone file (unregistered, or registered but on hold)."""
+    return failed_result(domain, "NOT_IN_ZONE", "Not in zone file: unregistered or without nameservers")
+
+
+def failed_result(domain, source="FAILED", error="All methods failed"):
+    return {
+        "Domain": domain,
+        "Registrar": None,
+        "Creation Date": None,
+        "Expiration Date": None,
+        "Updated Date": None,
+        "Source": source,
+        "Error": error
+    }
+
+class LookupTask:
+    """Progress of one domain through the source chain"""
+    __slots__ = ("domain", "host", "source_index", "attempt", "span", "backoff_started")
+
+    def __init__(self, domain, host=None):
+        self.domain = domain
+        self.host = host             # registry host the dispatch planner groups by
+        self.source_index = 0
+        self.attempt = 0
+        self.span = None             # root tracing span, when tracing
+        self.backoff_started = None  # perf_counter() when parked for backoff
+
+    def next_source(self):
+        self.source_index += 1
+        self.attempt = 0
+
 class AdvancedWHOISFetcher:
-    def __init__(self, max_threads=5, api_key=""):
+    def __init__(self, max_threads=5, api_key="", archive=None, port43_delay=None, tracer=None,
+                 cache=None, change_tracker=None, zone_index=None, transport=None, scheduler=None,
+                 host_max_in_flight=HOST_MAX_IN_FLIGHT):
+        """
+        Args:
+            max_threads: Concurrent lookups
+            api_key: Paid WHOIS API key (optional)
+            archive: response_archive.ResponseArchive that keeps every raw
+                upstream response for offline reparsing (optional)
+            port43_delay: Fixed pause after each port-43 query; default is a
+                short random pause (0.2-0.5s)
+            tracer: tracing.Tracer recording a span tree per domain (optional)
+            cache: result_cache.TieredCache (or any object with get_many /
+                set_many) of resolved domains shared with other fetchers (optional)
+            change_tracker: change_tracker.ChangeTracker that diffs every result
+                against the previous run; the run's ChangeSet is left in
+                self.last_changes (optional)
+            zone_index: zone_index.ZoneIndex; domains missing from their zone
+                complete as NOT_IN_ZONE without any network lookup (optional)
+            transport: transport.Http2Transport, replay.RecordingTransport /
+                ReplayTransport or any object with a requests-style get() for
+                RDAP and API requests (and optionally whois_text(domain) for
+                port 43); default is the shared HTTP/1.1 requests session
+            scheduler: scheduling.FairShareScheduler shared with other
+                fetchers; every lookup attempt then waits for a slot from it,
+                fairly shared across tenants and jobs (optional)
+            host_max_in_flight: Hard cap on concurrent RDAP/port-43 lookups per
+                registry; None gives each registry with pending work an equal
+                share of max_threads (all of them for single-registry lists)
+        """
         self.max_threads = max_threads
         self.api_key = api_key
+        self.archive = archive
+        self.port43_delay = port43_delay
+        self.tracer = tracer
+        self.cache = cache
+        self.change_tracker = change_tracker
+        self.zone_index = zone_index
+        self.transport = transport
+        self.scheduler = scheduler
+        self.host_max_in_flight = host_max_in_flight
+        self.last_changes = None
+        self.revalidated = 0            # RDAP lookups answered by 304 Not Modified in the last run
+        self._validators = {}           # domain -> {"etag", "last_modified", "result"} for this run
+        self._validator_updates = {}
+        self._validator_lock = threading.Lock()
         self.results = []
         
-    def exponential_backoff_sleep(self, attempt):
-        """Sleep with exponential backoff + jitter."""
+    def backoff_delay(self, attempt):
+        """Exponential backoff + jitter for the given attempt, in seconds."""
         backoff = min(MAX_BACKOFF, INITIAL_BACKOFF * (2 ** attempt))
         jitter = random.uniform(0, backoff * 0.2)
-        time.sleep(backoff + jitter)
+        return backoff + jitter
+
+    def exponential_backoff_sleep(self, attempt):
+        """Sleep with exponential backoff + jitter."""
+        time.sleep(self.backoff_delay(attempt))
 
     def parse_rdap_date(self, datestr):
-        if not datestr:
-            return None
-        try:
-            return datetime.fromisoformat(datestr.replace("Z", "")).strftime("%Y-%m-%d")
-        except Exception:
-            return datestr[:10]  # fallback
+        return to_iso_date(datestr)
 
     def extract_vcard_name(self, vcard_array):
         """Extract readable org name from RDAP vcard array."""
@@ -58,12 +197,79 @@ class AdvancedWHOISFetcher:
             pass
         return None
 
+    def http_get(self, url, domain, params=None, headers=None):
+        """
+        GET through the transport (shared requests session by default) with
+        adaptive per-host timeouts.
+
+        The timeout is the larger of what the request host (e.g. the rdap.org
+        redirector) and the domain's registry host have needed so far; every
+        response in the redirect chain feeds its host's latency samples.
+        """
+        request_host = urlsplit(url).hostname
+        connect, read = adaptive_timeouts.timeout_for(request_host)
+        registry_connect, registry_read = adaptive_timeouts.timeout_for(_registry_resolver.host_for(domain))
+        timeout = (max(connect, registry_connect), max(read, registry_read))
+
+        if self.transport is not None:
+            get, read_timeout_errors = self.transport.get, self.transport.read_timeout_errors
+        else:
+            import requests
+            get, read_timeout_errors = get_http_session().get, (requests.exceptions.ReadTimeout,)
+
+        with trace_span("http_request", url=url, connect_timeout=timeout[0], read_timeout=timeout[1]) as span:
+            try:
+                resp = get(url, params=params, headers={**HEADERS, **headers} if headers else HEADERS,
+                           timeout=timeout)
+            except read_timeout_errors:
+                adaptive_timeouts.observe_read(request_host, timeout[1])
+                raise
+            for hop in list(resp.history) + [resp]:
+                adaptive_timeouts.observe_read(urlsplit(str(hop.url)).hostname, hop.elapsed.total_seconds())
+            if span is not None:
+                span.attrs.update(status=resp.status_code, ttfb=resp.elapsed.total_seconds(),
+                                  bytes=len(resp.content))
+        return resp
+
     def rdap_lookup(self, domain):
-        url = f"https://rdap.org/domain/{domain}"
-        resp = requests.get(url, headers=HEADERS, timeout=RDAP_TIMEOUT)
+        url = RDAP_URL.format(domain=domain)
+        validator = self._validators.get(domain)
+        headers = None
+        if validator is not None:
+            # conditional request: a 304 means the cached result is still current
+            headers = {}
+            if validator.get("etag"):
+                headers["If-None-Match"] = validator["etag"]
+            if validator.get("last_modified"):
+                headers["If-Modified-Since"] = validator["last_modified"]
+        resp = self.http_get(url, domain, headers=headers)
+        if resp.status_code == 304 and validator is not None:
+            with self._validator_lock:
+                self.revalidated += 1
+                self._validator_updates[domain] = validator
+            return dict(validator["result"])
         resp.raise_for_status()
-        data = resp.json()
+        with trace_span("json_decode"):
+            data = resp.json()
+        if self.archive is not None:
+            self.archive.append(domain, "RDAP", data)
+        with trace_span("parse"):
+            res = self.parse_rdap_response(domain, data)
+        self.remember_validators(domain, resp, res)
+        return res
+
+    def remember_validators(self, domain, resp, res):
+        """Queue the response's ETag/Last-Modified (with its result) for the cache."""
+        if self.cache is None:
+            return
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        with self._validator_lock:
+            self._validator_updates[domain] = {"etag": etag, "last_modified": last_modified, "result": res}
 
+    def parse_rdap_response(self, domain, data):
         registrar = None
         creation = None
         expiration = None
@@ -95,7 +301,7 @@ class AdvancedWHOISFetcher:
 
         return {
             "Domain": domain,
-            "Registrar": registrar,
+            "Registrar": registrar_dictionary.intern(registrar),
             "Creation Date": creation,
             "Expiration Date": expiration,
             "Updated Date": updated,
@@ -109,17 +315,24 @@ class AdvancedWHOISFetcher:
         You must replace WHOIS_API_URL with real API endpoint and parse its JSON response.
         """
         params = {"domain": domain, "apiKey": api_key}
-        resp = requests.get(WHOIS_API_URL, params=params, headers=HEADERS, timeout=RDAP_TIMEOUT)
+        resp = self.http_get(WHOIS_API_URL, domain, params=params)
         resp.raise_for_status()
-        data = resp.json()
+        with trace_span("json_decode"):
+            data = resp.json()
+        if self.archive is not None:
+            self.archive.append(domain, "WHOIS_API", data)
+        with trace_span("parse"):
+            return self.parse_whois_api_response(domain, data)
+
+    def parse_whois_api_response(self, domain, data):
         # Example parsing - depends on API provider
         registrar = data.get("registrarName") or data.get("registrar")
-        creation = data.get("createdDate") or data.get("created_at") or data.get("creationDate")
-        expiration = data.get("expiresDate") or data.get("expires_at") or data.get("expirationDate")
-        updated = data.get("updatedDate") or data.get("updated_at")
+        creation = to_iso_date(data.get("createdDate") or data.get("created_at") or data.get("creationDate"))
+        expiration = to_iso_date(data.get("expiresDate") or data.get("expires_at") or data.get("expirationDate"))
+        updated = to_iso_date(data.get("updatedDate") or data.get("updated_at"))
         return {
             "Domain": domain,
-            "Registrar": registrar,
+            "Registrar": registrar_dictionary.intern(registrar),
             "Creation Date": creation,
             "Expiration Date": expiration,
             "Updated Date": updated,
@@ -128,129 +341,355 @@ class AdvancedWHOISFetcher:
         }
 
     def python_whois_lookup(self, domain):
-        w = whois.whois(domain)
-
-        def first_date(d):
-            if isinstance(d, list):
-                for x in d:
-                    if x:
-                        try:
-                            return x.strftime('%Y-%m-%d')
-                        except Exception:
-                            return str(x)[:10]
-            elif d:
-                try:
-                    return d.strftime('%Y-%m-%d')
-                except Exception:
-                    return str(d)[:10]
-            return None
+        import whois  # fallback
+        whois_text = getattr(self.transport, "whois_text", None)
+        with trace_span("port43_query"):
+            if whois_text is not None:
+                # transport-provided raw answer (recording/replay), parsed like whois.whois() would
+                raw = whois_text(domain)
+                w = whois.parser.WhoisEntry.load(domain, raw)
+                w["raw"] = raw
+            else:
+                # socket errors must raise: the library default turns them into an
+                # all-None "answer" that would be cached and never trip the breaker
+                w = whois.whois(domain, inc_raw=self.archive is not None, ignore_socket_errors=False)
+        if self.archive is not None:
+            raw = getattr(w, "text", None) or w.get("raw")
+            if raw:
+                self.archive.append(domain, "WHOIS_PORT43", raw)
+        with trace_span("parse"):
+            return self.parse_python_whois(domain, w)
 
+    def parse_python_whois(self, domain, w):
         return {
             "Domain": domain,
-            "Registrar": getattr(w, "registrar", None),
-            "Creation Date": first_date(getattr(w, "creation_date", None)),
-            "Expiration Date": first_date(getattr(w, "expiration_date", None)),
-            "Updated Date": first_date(getattr(w, "updated_date", None)),
+            "Registrar": registrar_dictionary.intern(getattr(w, "registrar", None)),
+            "Creation Date": to_iso_date(getattr(w, "creation_date", None)),
+            "Expiration Date": to_iso_date(getattr(w, "expiration_date", None)),
+            "Updated Date": to_iso_date(getattr(w, "updated_date", None)),
             "Source": "WHOIS_PORT43",
             "Error": None
         }
 
-    def fetch_domain_with_backoff(self, domain):
+    def parse_response(self, domain, source, payload):
+        """Parse an archived raw response of the given source into a result row."""
+        if source == "RDAP":
+            return self.parse_rdap_response(domain, payload)
+        if source == "WHOIS_API":
+            return self.parse_whois_api_response(domain, payload)
+        if source == "WHOIS_PORT43":
+            import whois.parser
+            return self.parse_python_whois(domain, whois.parser.WhoisEntry.load(domain, payload))
+        raise ValueError(f"Unknown source: {source}")
+
+    def python_whois_polite_lookup(self, domain):
+        res = self.python_whois_lookup(domain)
+        # optional small sleep to be polite to port43 servers
+        with trace_span("port43_politeness"):
+            if self.port43_delay is None:
+                time.sleep(0.2 + random.uniform(0, 0.3))
+            else:
+                time.sleep(self.port43_delay)
+        return res
+
+    def lookup_sources(self):
         """
-        Attempt to fetch WHOIS info using:
+        Ordered (source, breaker key, lookup) chain tried for every domain:
         1) Paid WHOIS API (if configured),
         2) RDAP (HTTP JSON),
         3) python-whois fallback (port 43).
-        Uses retries + exponential backoff.
+
+        RDAP and port-43 attempts use one breaker per registry host (see
+        registry_breaker_key); their key here is only the fallback for domains
+        whose registry is unknown.
         """
-        # Clean domain name
-        domain = domain.strip().lower()
-        if domain.startswith('http://') or domain.startswith('https://'):
-            domain = domain.split('/')[2]
-        if domain.startswith('www.'):
-            domain = domain[4:]
-            
-        # Try paid API first if configured
+        sources = []
         if self.api_key:
-            for attempt in range(RETRIES):
-                try:
-                    return self.whois_api_lookup(domain, self.api_key)
-                except Exception:
-                    if attempt < RETRIES - 1:
-                        self.exponential_backoff_sleep(attempt)
-                    else:
-                        # fallthrough to RDAP
-                        break
+            sources.append(("WHOIS_API", "WHOIS_API:" + WHOIS_API_URL.split('/')[2],
+                            lambda d: self.whois_api_lookup(d, self.api_key)))
+        sources.append(("RDAP", "RDAP:" + RDAP_URL.split('/')[2], self.rdap_lookup))
+        sources.append(("WHOIS_PORT43", "WHOIS_PORT43", self.python_whois_polite_lookup))
+        return sources
 
-        # Try RDAP next
-        for attempt in range(RETRIES):
-            try:
-                return self.rdap_lookup(domain)
-            except Exception:
-                if attempt < RETRIES - 1:
-                    self.exponential_backoff_sleep(attempt)
-                else:
-                    # fallthrough to python-whois
-                    break
+    def start_task(self, domain, host=None):
+        """Create the LookupTask for a raw input domain (opening its trace span)."""
+        task = LookupTask(normalize_domain(domain), host)
+        if self.tracer is not None:
+            task.span = self.tracer.start_span("domain", domain=task.domain)
+        return task
+
+    def finish_task(self, task, res):
+        if self.tracer is not None:
+            self.tracer.end_span(task.span, source=res["Source"])
+
+    def park_task(self, task):
+        """Mark task as waiting out its backoff."""
+        task.backoff_started = time.perf_counter()
 
-        # Final fallback: python-whois (may be blocked/rate-limited)
-        for attempt in range(RETRIES):
+    def resume_task(self, task):
+        """Record the backoff wait of a parked task that is about to run again."""
+        if self.tracer is not None and task.backoff_started is not None:
+            self.tracer.record("backoff", task.backoff_started, time.perf_counter(), parent=task.span)
+        task.backoff_started = None
+
+    def trace_attempt(self, task, source, breaker_key):
+        if self.tracer is None:
+            return contextlib.nullcontext()
+        # breaker keys name the registry for RDAP/port-43 attempts, so the
+        # per-host summary separates slow registries behind one proxy host
+        return self.tracer.span("attempt", parent=task.span, source=source,
+                                host=breaker_key.split(":", 1)[-1], attempt=task.attempt + 1)
+
+    def run_attempt(self, task, sources):
+        """
+        Advance task by one lookup attempt through the source chain.
+        Skips sources whose circuit breaker is open and stops retrying once the
+        shared retry budget is spent.
+
+        Returns:
+            (result, None) when the domain is finished, or (None, delay) when the
+            task should be retried after delay seconds of backoff
+        """
+        budget = get_retry_budget()
+
+        while task.source_index < len(sources):
+            source, breaker_key, lookup = sources[task.source_index]
+            if source in REGISTRY_SOURCES and task.host:
+                breaker_key = registry_breaker_key(source, task.host)
+            breaker = get_circuit_breaker(
+                breaker_key,
+                failure_threshold=BREAKER_FAILURE_THRESHOLD,
+                recovery_timeout=BREAKER_RECOVERY_TIMEOUT
+            )
+            if not breaker.allow_request():
+                # source is down - go straight to the next one
+                task.next_source()
+                continue
+
+            budget.record_request()
             try:
-                res = self.python_whois_lookup(domain)
-                # optional small sleep to be polite to port43 servers
-                time.sleep(0.2 + random.uniform(0, 0.3))
+                with self.trace_attempt(task, source, breaker_key):
+                    res = lookup(task.domain)
+            except Exception as e:
+                if not is_upstream_failure(e):
+                    # definitive answer (e.g. 404) - upstream is healthy, try next source
+                    breaker.record_success()
+                    task.next_source()
+                    continue
+                breaker.record_failure()
+                if task.attempt < RETRIES - 1 and budget.try_acquire_retry():
+                    delay = self.backoff_delay(task.attempt)
+                    task.attempt += 1
+                    return None, delay
+                # fallthrough to next source
+                task.next_source()
+                continue
+
+            breaker.record_success()
+            return res, None
+
+        return failed_result(task.domain), None
+
+    def fetch_domain_with_backoff(self, domain):
+        """
+        Attempt to fetch WHOIS info from each source in lookup_sources() order,
+        sleeping through backoff waits (single-domain, blocking version).
+        """
+        if self.cache is not None:
+            cached = self.cache.get(normalize_domain(domain))
+            if cached is not None:
+                return cached
+
+        task = self.start_task(domain, _registry_resolver.host_for(normalize_domain(domain)))
+        sources = self.lookup_sources()
+        while True:
+            res, delay = self.run_attempt(task, sources)
+            if res is not None:
+                self.finish_task(task, res)
+                if self.cache is not None and res["Source"] not in ("FAILED", "EXCEPTION"):
+                    self.cache.set(task.domain, res)
                 return res
-            except Exception:
-                if attempt < RETRIES - 1:
-                    self.exponential_backoff_sleep(attempt)
-                else:
-                    return {
-                        "Domain": domain,
-                        "Registrar": None,
-                        "Creation Date": None,
-                        "Expiration Date": None,
-                        "Updated Date": None,
-                        "Source": "FAILED",
-                        "Error": "All methods failed"
-                    }
-
-    def fetch_multiple_domains_advanced(self, domains: List[str], progress_callback=None) -> pd.DataFrame:
+            self.park_task(task)
+            time.sleep(delay)
+            self.resume_task(task)
+
+    def fetch_multiple_domains_advanced(self, domains: List[str], progress_callback=None,
+                                        prefetched: Optional[Dict[str, dict]] = None,
+                                        refresh: bool = False, progress_stream=None,
+                                        tenant: str = "default") -> pd.DataFrame:
         """
-        Fetch WHOIS data for multiple domains using advanced concurrent approach
+        Fetch WHOIS data for multiple domains using advanced concurrent approach.
+
+        Workers run one attempt at a time. A failed attempt is parked in a delay
+        queue for its backoff period instead of sleeping, so its worker picks up
+        another domain straight away. With a cache, domains are looked up in
+        batches first and only misses are dispatched; new results are written
+        back in batches. Pending lookups are interleaved across registry hosts
+        (see scheduling.DispatchPlanner); RDAP and port-43 attempts against
+        one registry are limited to host_max_in_flight, or by default to that
+        registry's fair share of max_threads among the registries with work.
+
+        prefetched maps normalized domains to results already resolved (e.g. by
+        prefetch.Prefetcher); those domains complete immediately, as do
+        domains missing from the zone index (as NOT_IN_ZONE).
+
+        With refresh=True cached results are not reused; every domain is looked
+        up again, but RDAP lookups that have ETag/Last-Modified validators
+        from an earlier run are sent as conditional requests, and a 304 reuses
+        the stored result without downloading or parsing the document
+        (counted in self.revalidated).
+
+        progress_callback(completed, total, domain) is called for every
+        completed domain; progress_stream (progress.ProgressStream) instead
+        aggregates completions and publishes throttled snapshots, which is
+        what UIs should use for large lists.
+
+        With a scheduler the run is registered as a job of `tenant`, and
+        attempts are only started when the scheduler grants a slot.
         """
+        import pandas as pd
+
         if not domains:
             return pd.DataFrame()
 
-        max_threads = min(self.max_threads, len(domains))
+        total = len(domains)
+        max_threads = min(self.max_threads, total)
+        sources = self.lookup_sources()
+        new_domains = iter(domains)
+        planner = DispatchPlanner(self.host_max_in_flight, max_threads)  # cache misses and due retries, by registry
+        delayed = DelayQueue()   # retries still backing off
+        in_flight = {}
         results = []
+        to_cache = {}
+        completed = 0
+        self._validators = {}
+        self.revalidated = 0
+
+        def registry_bound(source_index):
+            return source_index < len(sources) and sources[source_index][0] in REGISTRY_SOURCES
+
+        def complete(res):
+            nonlocal completed
+            results.append(res)
+            completed += 1
+            if self.change_tracker is not None:
+                self.change_tracker.observe(res)
+            if progress_stream is not None:
+                progress_stream.record(res)
+
+            # Update progress if callback provided
+            if progress_callback:
+                progress_callback(completed, total, res['Domain'])
+
+        def refill_planner():
+            """Read input ahead in batches, answering cache hits right away."""
+            while len(planner) < PLAN_WINDOW:
+                batch = [normalize_domain(d) for d in itertools.islice(new_domains, CACHE_BATCH_SIZE)]
+                if not batch:
+                    return
+                hits = {d: prefetched[d] for d in batch if d in prefetched} if prefetched else {}
+                if self.cache is not None and not refresh:
+                    misses = [d for d in batch if d not in hits]
+                    if misses:
+                        hits.update(self.cache.get_many(misses))
+                if self.zone_index is not None:
+                    misses = [d for d in batch if d not in hits]
+                    hits.update((d, not_in_zone_result(d)) for d in self.zone_index.absent(misses))
+                if self.cache is not None:
+                    misses = [d for d in batch if d not in hits]
+                    if misses:
+                        found = self.cache.get_many([VALIDATOR_KEY_PREFIX + d for d in misses])
+                        self._validators.update((key[len(VALIDATOR_KEY_PREFIX):], validator)
+                                                for key, validator in found.items())
+                for domain in batch:
+                    if domain in hits:
+                        complete(hits[domain])
+                    else:
+                        planner.add(domain, _registry_resolver.host_for(domain), capped=registry_bound(0))
+
+        def flush_cache():
+            if self.cache is None:
+                return
+            if to_cache:
+                self.cache.set_many(to_cache)
+                to_cache.clear()
+            with self._validator_lock:
+                updates, self._validator_updates = self._validator_updates, {}
+            if updates:
+                self.cache.set_many({VALIDATOR_KEY_PREFIX + d: v for d, v in updates.items()}, ttl=VALIDATOR_TTL)
+
+        job = self.scheduler.job(tenant, total) if self.scheduler is not None else None
+
+        with contextlib.ExitStack() as stack:
+            if job is not None:
+                stack.callback(job.close)  # runs after the executor below has drained
+            executor = stack.enter_context(ThreadPoolExecutor(max_workers=max_threads))
+            while True:
+                for task in delayed.pop_ready():
+                    planner.add(task, task.host, front=True, capped=registry_bound(task.source_index))
+                refill_planner()
+
+                # Fill free worker slots, round-robin across registries, retries first
+                while len(in_flight) < max_threads:
+                    planned = planner.next()
+                    if planned is None:
+                        break
+                    item, host, capped = planned
+                    # block for a slot only when nothing of ours is running to wake us up
+                    if job is not None and not job.acquire(timeout=0 if in_flight else SCHEDULER_POLL):
+                        planner.done(host, capped)
+                        planner.add(item, host, front=True, capped=capped)
+                        break
+                    if isinstance(item, LookupTask):
+                        task = item
+                        self.resume_task(task)
+                    else:
+                        task = self.start_task(item, host)
+                    future = executor.submit(self.run_attempt, task, sources)
+                    if job is not None:
+                        future.add_done_callback(lambda _: job.release())
+                    in_flight[future] = (task, capped)
+
+                if progress_stream is not None:
+                    progress_stream.tick()
+
+                if not in_flight:
+                    if planner:
+                        continue  # still waiting for a scheduler slot
+                    if not delayed:
+                        break
+                    time.sleep(delayed.next_ready_in())
+                    continue
+
+                done, _ = wait(in_flight, timeout=delayed.next_ready_in(), return_when=FIRST_COMPLETED)
+                for future in done:
+                    task, capped = in_flight.pop(future)
+                    planner.done(task.host, capped)
+                    try:
+                        res, delay = future.result()
+                    except Exception as e:
+                        # Shouldn't happen due to internal error handling, but capture anyway
+                        res, delay = failed_result(task.domain, "EXCEPTION", str(e)), None
+
+                    if res is None:
+                        self.park_task(task)
+                        delayed.push(task, delay)
+                        continue
+
+                    self.finish_task(task, res)
+                    complete(res)
+                    if res['Source'] not in ('FAILED', 'EXCEPTION'):
+                        to_cache[res['Domain']] = res
+                        if len(to_cache) >= CACHE_BATCH_SIZE:
+                            flush_cache()
+
+        flush_cache()
+        adaptive_timeouts.save()
+        if progress_stream is not None:
+            progress_stream.finish()
+        if self.change_tracker is not None:
+            self.last_changes = self.change_tracker.finish()
 
-        # Submit tasks with progress tracking
-        with ThreadPoolExecutor(max_workers=max_threads) as executor:
-            futures = {executor.submit(self.fetch_domain_with_backoff, d): d for d in domains}
-            
-            completed = 0
-            for future in as_completed(futures):
-                try:
-                    res = future.result()
-                except Exception as e:
-                    # Shouldn't happen due to internal error handling, but capture anyway
-                    res = {
-                        "Domain": futures.get(future, "unknown"),
-                        "Registrar": None,
-                        "Creation Date": None,
-                        "Expiration Date": None,
-                        "Updated Date": None,
-                        "Source": "EXCEPTION",
-                        "Error": str(e)
-                    }
-                
-                results.append(res)
-                completed += 1
-                
-                # Update progress if callback provided
-                if progress_callback:
-                    progress_callback(completed, len(domains), res['Domain'])
-
-        return pd.DataFrame(results)
+        return compact_columns(normalize_date_columns(pd.DataFrame(results)))
 
 
@@ -1,10 +1,19 @@
 import streamlit as st
 import pandas as pd
+import os
+import re
 import time
-import io
+import uuid
 from advanced_whois_fetcher import AdvancedWHOISFetcher
-from utils import read_domains_from_file, create_sample_csv, format_whois_results, convert_df_to_csv
-import base64
+from utils import read_domains_from_file, create_sample_csv, format_whois_results
+from results_view import ResultSet, DISPLAY_COLUMNS
+from result_cache import cache_from_url
+from prefetch import Prefetcher
+from zone_index import ZoneIndex
+from progress import ProgressStream
+from result_spool import ResultSpool
+from response_archive import ResponseArchive
+from scheduling import FairShareScheduler
 
 # Page configuration
 st.set_page_config(
@@ -14,283 +23,84 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# Custom CSS for professional UI with glassmorphism
+# Custom CSS for professional UI with glassmorphism, kept in static/styles.css
+CSS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "styles.css")
+
+@st.cache_resource
+def build_css_block():
+    """Read and minify the stylesheet once per process, not on every rerun"""
+    with open(CSS_PATH, encoding="utf-8") as f:
+        css = f.read()
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    return f"<style>{css.strip()}</style>"
+
 def load_css():
-    st.markdown("""
-    <style>
-    /* Import Google Fonts */
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
-    
-    /* Global Styles */
-    .stApp {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        font-family: 'Inter', sans-serif;
-    }
-    
-    /* Hide Streamlit branding */
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    header {visibility: hidden;}
-    
-    /* Sticky Header */
-    .sticky-header {
-        position: sticky;
-        top: 0;
-        z-index: 999;
-        background: rgba(255, 255, 255, 0.1);
-        backdrop-filter: blur(20px);
-        border-bottom: 1px solid rgba(255, 255, 255, 0.2);
-        padding: 1rem 0;
-        margin-bottom: 2rem;
-    }
-    
-    /* Main Container */
-    .main-container {
-        background: rgba(255, 255, 255, 0.1);
-        backdrop-filter: blur(20px);
-        border-radius: 20px;
-        border: 1px solid rgba(255, 255, 255, 0.2);
-        padding: 2rem;
-        margin: 1rem 0;
-        box-shadow: 0 8px 32px rgba(31, 38, 135, 0.37);
-    }
-    
-    /* Card Components */
-    .glass-card {
-        background: rgba(255, 255, 255, 0.15);
-        backdrop-filter: blur(10px);
-        border-radius: 15px;
-        border: 1px solid rgba(255, 255, 255, 0.2);
-        padding: 1.5rem;
-        margin: 1rem 0;
-        box-shadow: 0 4px 16px rgba(31, 38, 135, 0.2);
-        transition: transform 0.3s ease, box-shadow 0.3s ease;
-    }
-    
-    .glass-card:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 8px 24px rgba(31, 38, 135, 0.3);
-    }
-    
-    /* Typography */
-    .main-title {
-        font-size: 3rem;
-        font-weight: 700;
-        color: white;
-        text-align: center;
-        margin-bottom: 0.5rem;
-        text-shadow: 0 2px 4px rgba(0,0,0,0.3);
-    }
-    
-    .subtitle {
-        font-size: 1.2rem;
-        color: rgba(255, 255, 255, 0.8);
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    
-    .section-title {
-        font-size: 1.5rem;
-        font-weight: 600;
-        color: white;
-        margin-bottom: 1rem;
-        display: flex;
-        align-items: center;
-        gap: 0.5rem;
-    }
-    
-    .step-title {
-        font-size: 1.3rem;
-        font-weight: 600;
-        color: white;
-        margin-bottom: 1rem;
-    }
-    
-    /* Step Indicator */
-    .step-indicator {
-        display: flex;
-        justify-content: center;
-        align-items: center;
-        margin: 2rem 0;
-        gap: 1rem;
-    }
-    
-    .step {
-        display: flex;
-        align-items: center;
-        gap: 0.5rem;
-        padding: 0.5rem 1rem;
-        border-radius: 25px;
-        background: rgba(255, 255, 255, 0.1);
-        border: 1px solid rgba(255, 255, 255, 0.2);
-        color: rgba(255, 255, 255, 0.7);
-        font-weight: 500;
-        transition: all 0.3s ease;
-    }
-    
-    .step.active {
-        background: rgba(255, 255, 255, 0.2);
-        color: white;
-        border-color: rgba(255, 255, 255, 0.4);
-        box-shadow: 0 4px 16px rgba(255, 255, 255, 0.1);
-    }
-    
-    .step.completed {
-        background: rgba(34, 197, 94, 0.2);
-        color: #22c55e;
-        border-color: rgba(34, 197, 94, 0.4);
-    }
-    
-    /* Upload Area */
-    .upload-area {
-        border: 2px dashed rgba(255, 255, 255, 0.3);
-        border-radius: 15px;
-        padding: 2rem;
-        text-align: center;
-        background: rgba(255, 255, 255, 0.05);
-        transition: all 0.3s ease;
-        cursor: pointer;
-    }
-    
-    .upload-area:hover {
-        border-color: rgba(255, 255, 255, 0.5);
-        background: rgba(255, 255, 255, 0.1);
-    }
-    
-    /* Buttons */
-    .stButton > button {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        border: none;
-        border-radius: 10px;
-        padding: 0.75rem 2rem;
-        font-weight: 600;
-        font-size: 1rem;
-        transition: all 0.3s ease;
-        box-shadow: 0 4px 16px rgba(102, 126, 234, 0.3);
-    }
-    
-    .stButton > button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 8px 24px rgba(102, 126, 234, 0.4);
-    }
-    
-    /* Progress Bar */
-    .stProgress > div > div > div > div {
-        background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
-        border-radius: 10px;
-    }
-    
-    /* Metrics */
-    .metric-card {
-        background: rgba(255, 255, 255, 0.1);
-        backdrop-filter: blur(10px);
-        border-radius: 10px;
-        padding: 1rem;
-        text-align: center;
-        border: 1px solid rgba(255, 255, 255, 0.2);
-    }
-    
-    .metric-value {
-        font-size: 2rem;
-        font-weight: 700;
-        color: white;
-        margin-bottom: 0.5rem;
-    }
-    
-    .metric-label {
-        font-size: 0.9rem;
-        color: rgba(255, 255, 255, 0.7);
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-    }
-    
-    /* Data Table */
-    .stDataFrame {
-        background: rgba(255, 255, 255, 0.1);
-        border-radius: 10px;
-        border: 1px solid rgba(255, 255, 255, 0.2);
-    }
-    
-    /* Status Badges */
-    .status-success {
-        background: rgba(34, 197, 94, 0.2);
-        color: #22c55e;
-        padding: 0.25rem 0.75rem;
-        border-radius: 20px;
-        font-size: 0.8rem;
-        font-weight: 600;
-        border: 1px solid rgba(34, 197, 94, 0.3);
-    }
-    
-    .status-error {
-        background: rgba(239, 68, 68, 0.2);
-        color: #ef4444;
-        padding: 0.25rem 0.75rem;
-        border-radius: 20px;
-        font-size: 0.8rem;
-        font-weight: 600;
-        border: 1px solid rgba(239, 68, 68, 0.3);
-    }
-    
-    /* Info Cards */
-    .info-card {
-        background: rgba(59, 130, 246, 0.1);
-        border: 1px solid rgba(59, 130, 246, 0.2);
-        border-radius: 10px;
-        padding: 1rem;
-        color: rgba(255, 255, 255, 0.9);
-    }
-    
-    .warning-card {
-        background: rgba(245, 158, 11, 0.1);
-        border: 1px solid rgba(245, 158, 11, 0.2);
-        border-radius: 10px;
-        padding: 1rem;
-        color: rgba(255, 255, 255, 0.9);
-    }
-    
-    .success-card {
-        background: rgba(34, 197, 94, 0.1);
-        border: 1px solid rgba(34, 197, 94, 0.2);
-        border-radius: 10px;
-        padding: 1rem;
-        color: rgba(255, 255, 255, 0.9);
-    }
-    
-    /* Animation */
-    @keyframes fadeInUp {
-        from {
-            opacity: 0;
-            transform: translateY(30px);
-        }
-        to {
-            opacity: 1;
-            transform: translateY(0);
-        }
-    }
-    
-    .fade-in-up {
-        animation: fadeInUp 0.6s ease-out;
-    }
-    
-    /* Responsive Design */
-    @media (max-width: 768px) {
-        .main-title {
-            font-size: 2rem;
-        }
-        
-        .step-indicator {
-            flex-direction: column;
-            gap: 0.5rem;
-        }
-        
-        .glass-card {
-            padding: 1rem;
-        }
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    st.markdown(build_css_block(), unsafe_allow_html=True)
+
+@st.cache_resource
+def get_result_cache():
+    """
+    Process-wide result cache: in-process LRU shared by all sessions, backed by
+    the Redis-protocol server in WHOIS_CACHE_URL (if set) shared by all replicas
+    """
+    return cache_from_url(os.environ.get("WHOIS_CACHE_URL"))
+
+@st.cache_resource
+def get_zone_index():
+    """Offline registration index from WHOIS_ZONE_INDEX (built by zone_index.py), if configured"""
+    path = os.environ.get("WHOIS_ZONE_INDEX")
+    return ZoneIndex(path) if path else None
+
+@st.cache_resource
+def get_transport():
+    """Shared HTTP/2 transport when WHOIS_HTTP2 is set (requires httpx[http2]); None = HTTP/1.1 session"""
+    if not os.environ.get("WHOIS_HTTP2"):
+        return None
+    from transport import Http2Transport
+    from advanced_whois_fetcher import adaptive_timeouts
+    return Http2Transport(connect_observer=adaptive_timeouts.observe_connect)
+
+@st.cache_resource
+def get_archive():
+    """Raw response archive in WHOIS_ARCHIVE_DIR (replayable with response_archive.py reparse), if configured"""
+    path = os.environ.get("WHOIS_ARCHIVE_DIR")
+    return ResponseArchive(path) if path else None
+
+@st.cache_resource
+def get_scheduler():
+    """Lookup slots shared fairly by all sessions, so one big upload cannot starve small ones"""
+    return FairShareScheduler()
+
+@st.cache_resource
+def get_result_spool():
+    """Disk-backed result store shared by all sessions; sessions keep only result IDs"""
+    return ResultSpool()
+
+def build_fetcher(max_threads=5, api_key=""):
+    """Fetcher wired to the shared archive, cache, zone index, transport and scheduler"""
+    return AdvancedWHOISFetcher(max_threads=max_threads, api_key=api_key, archive=get_archive(),
+                                cache=get_result_cache(), zone_index=get_zone_index(),
+                                transport=get_transport(), scheduler=get_scheduler())
+
+def start_prefetch(domains, file_key):
+    """Start warming lookups for a newly parsed file (once per file)"""
+    if st.session_state.get('prefetch_key') == file_key:
+        return
+    stop_prefetch()
+    st.session_state.prefetcher = Prefetcher(domains, fetcher=build_fetcher(),
+                                             tenant=st.session_state.tenant_id).start()
+    st.session_state.prefetch_key = file_key
+
+def stop_prefetch():
+    """Stop background prefetch and return the results it warmed up"""
+    prefetcher = st.session_state.get('prefetcher')
+    if prefetcher is None:
+        return {}
+    prefetcher.stop()
+    st.session_state.prefetcher = None
+    st.session_state.prefetch_key = None
+    return prefetcher.warm_results()
 
 def render_header():
     """Render sticky header"""
@@ -339,8 +149,8 @@ def render_upload_section():
         
         uploaded_file = st.file_uploader(
             "Choose your domain file",
-            type=['txt', 'csv', 'xlsx', 'xls'],
-            help="Supported formats: TXT, CSV, Excel (.xlsx, .xls)",
+            type=['txt', 'csv', 'xlsx', 'xls', 'gz', 'zst', 'zip'],
+            help="Supported formats: TXT, CSV, Excel (.xlsx, .xls), gzip/zstd compressed (.csv.gz, .txt.zst) or zip bundles",
             label_visibility="collapsed"
         )
         
@@ -354,7 +164,7 @@ def render_upload_section():
             <div class="upload-area">
                 <h3>📤 Drag & Drop Your File Here</h3>
                 <p>Or click to browse and select your domain file</p>
-                <small>Supports: .txt, .csv, .xlsx, .xls</small>
+                <small>Supports: .txt, .csv, .xlsx, .xls (optionally .gz, .zst or .zip)</small>
             </div>
             """, unsafe_allow_html=True)
         
@@ -369,7 +179,8 @@ def render_upload_section():
             Supported Formats:<br>
             • Plain text (.txt)<br>
             • CSV files (.csv)<br>
-            • Excel files (.xlsx, .xls)
+            • Excel files (.xlsx, .xls)<br>
+            • Any of the above compressed (.gz, .zst) or bundled in a .zip
             
             Domain Format:
             • One domain per line(Row)
@@ -434,7 +245,7 @@ def render_configuration_section():
     
     return max_threads, api_key
 
-def render_processing_section(domains, max_threads, api_key):
+def render_processing_section(domains, max_threads, api_key, prefetched=None):
     """Render processing section with real-time progress"""
     st.markdown('<div class="main-container fade-in-up">', unsafe_allow_html=True)
     st.markdown('<div class="section-title">⚡ Processing Domains</div>', unsafe_allow_html=True)
@@ -467,20 +278,21 @@ def render_processing_section(domains, max_threads, api_key):
         """.format("Premium" if api_key else "Free"), unsafe_allow_html=True)
     
     with col4:
-        estimated_time = len(domains) * 2 / max_threads  # Rough estimate
-        st.markdown("""
+        # filled in from progress snapshots once a completion rate is known
+        eta_card = st.empty()
+        eta_card.markdown("""
         <div class="metric-card">
-            <div class="metric-value">~{}m</div>
+            <div class="metric-value">—</div>
             <div class="metric-label">Est. Time</div>
         </div>
-        """.format(int(estimated_time)), unsafe_allow_html=True)
+        """, unsafe_allow_html=True)
     
     # Progress tracking
     progress_container = st.container()
     status_container = st.container()
     
     # Initialize fetcher
-    fetcher = AdvancedWHOISFetcher(max_threads=max_threads, api_key=api_key)
+    fetcher = build_fetcher(max_threads, api_key)
     
     # Progress tracking variables
     progress_bar = progress_container.progress(0)
@@ -489,30 +301,43 @@ def render_processing_section(domains, max_threads, api_key):
     try:
         start_time = time.time()
         
-        def update_progress(completed, total, current_domain):
-            progress = completed / total
-            progress_bar.progress(progress)
+        def update_progress(snapshot):
+            progress_bar.progress(min(snapshot.fraction, 1.0))
             
-            elapsed = time.time() - start_time
-            eta = (elapsed / completed * total - elapsed) if completed > 0 else 0
+            eta = "—" if snapshot.eta is None else f"{snapshot.eta:.1f}s"
+            sources = ", ".join(f"{source}: {count}" for source, count in sorted(snapshot.source_counts.items()))
             
             status_text.markdown(f"""
             <div class="glass-card">
                 <div style="display: flex; justify-content: space-between; align-items: center;">
                     <div>
-                        <strong>Processing:</strong> {current_domain}<br>
-                        <strong>Progress:</strong> {completed}/{total} ({progress:.1%})
+                        <strong>Processing:</strong> {snapshot.last_domain}<br>
+                        <strong>Progress:</strong> {snapshot.completed}/{snapshot.total} ({snapshot.fraction:.1%})<br>
+                        <strong>Sources:</strong> {sources}
                     </div>
                     <div style="text-align: right;">
-                        <strong>Elapsed:</strong> {elapsed:.1f}s<br>
-                        <strong>ETA:</strong> {eta:.1f}s
+                        <strong>Elapsed:</strong> {snapshot.elapsed:.1f}s<br>
+                        <strong>Throughput:</strong> {snapshot.throughput:.1f}/s<br>
+                        <strong>Errors:</strong> {snapshot.error_rate:.1%}<br>
+                        <strong>ETA:</strong> {eta}
                     </div>
                 </div>
             </div>
             """, unsafe_allow_html=True)
+            
+            if snapshot.eta is not None:
+                eta_card.markdown(f"""
+                <div class="metric-card">
+                    <div class="metric-value">~{snapshot.eta / 60:.1f}m</div>
+                    <div class="metric-label">Est. Time</div>
+                </div>
+                """, unsafe_allow_html=True)
         
-        # Process domains
-        df_results = fetcher.fetch_multiple_domains_advanced(domains, update_progress)
+        # Process domains; the UI re-renders on throttled snapshots, not per domain
+        progress_stream = ProgressStream(len(domains)).subscribe(update_progress)
+        df_results = fetcher.fetch_multiple_domains_advanced(domains, prefetched=prefetched,
+                                                             progress_stream=progress_stream,
+                                                             tenant=st.session_state.tenant_id)
         
         processing_time = time.time() - start_time
         
@@ -536,64 +361,35 @@ def render_processing_section(domains, max_threads, api_key):
         st.markdown('</div>', unsafe_allow_html=True)
         return None, 0
 
-def render_results_section(df_results, processing_time):
+def render_results_section(results, processing_time):
     """Render results section with advanced table features"""
     st.markdown('<div class="main-container fade-in-up">', unsafe_allow_html=True)
     st.markdown('<div class="section-title">📊 WHOIS Results</div>', unsafe_allow_html=True)
     
-    if df_results is None or df_results.empty:
+    if results is None or len(results) == 0:
         st.markdown('<div class="warning-card">⚠️ No results to display</div>', unsafe_allow_html=True)
         st.markdown('</div>', unsafe_allow_html=True)
         return
     
-    # Results summary
-    col1, col2, col3, col4, col5 = st.columns(5)
-    
-    total_domains = len(df_results)
-    rdap_success = len(df_results[df_results['Source'] == 'RDAP'])
-    api_success = len(df_results[df_results['Source'] == 'WHOIS_API'])
-    whois_success = len(df_results[df_results['Source'] == 'WHOIS_PORT43'])
-    failed = len(df_results[df_results['Source'] == 'FAILED'])
-    
-    with col1:
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-value">{total_domains}</div>
-            <div class="metric-label">Total</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-value">{rdap_success}</div>
-            <div class="metric-label">RDAP</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-value">{api_success}</div>
-            <div class="metric-label">API</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col4:
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-value">{whois_success}</div>
-            <div class="metric-label">WHOIS</div>
-        </div>
-        """, unsafe_allow_html=True)
+    # Results summary (computed once per result set, not per rerun)
+    summary = results.summary()
+    metrics = [
+        (summary['Total'], "Total"),
+        (summary['RDAP'], "RDAP"),
+        (summary['WHOIS_API'], "API"),
+        (summary['WHOIS_PORT43'], "WHOIS"),
+        (summary['NOT_IN_ZONE'], "Not in Zone"),
+        (summary['FAILED'], "Failed")
+    ]
     
-    with col5:
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-value">{failed}</div>
-            <div class="metric-label">Failed</div>
-        </div>
-        """, unsafe_allow_html=True)
+    for col, (value, label) in zip(st.columns(len(metrics)), metrics):
+        with col:
+            st.markdown(f"""
+            <div class="metric-card">
+                <div class="metric-value">{value}</div>
+                <div class="metric-label">{label}</div>
+            </div>
+            """, unsafe_allow_html=True)
     
     # Search and filter controls
     st.markdown('<div class="glass-card">', unsafe_allow_html=True)
@@ -606,45 +402,53 @@ def render_results_section(df_results, processing_time):
     
     with col2:
         source_filter = st.selectbox("📡 Filter by source", 
-                                   options=["All"] + list(df_results['Source'].unique()))
+                                   options=["All"] + list(results.source_counts.index))
     
     with col3:
         status_filter = st.selectbox("📊 Filter by status",
                                    options=["All", "Success", "Failed"])
     
-    # Apply filters
-    filtered_df = df_results.copy()
+    # Apply filters using the prebuilt search index (counts only - no rows materialized)
+    match_count = results.count(search_term, source_filter, status_filter)
     
-    if search_term:
-        filtered_df = filtered_df[filtered_df['Domain'].str.contains(search_term, case=False, na=False)]
+    col1, col2, col3, col4 = st.columns(4)
     
-    if source_filter != "All":
-        filtered_df = filtered_df[filtered_df['Source'] == source_filter]
+    with col1:
+        sort_by = st.selectbox("↕️ Sort by", options=["None"] + [c for c in DISPLAY_COLUMNS if c != 'Status'])
+    
+    with col2:
+        sort_order = st.selectbox("🔃 Order", options=["Ascending", "Descending"])
+    
+    with col3:
+        page_size = st.selectbox("📄 Rows per page", options=[50, 100, 250, 500], index=1)
     
-    if status_filter == "Success":
-        filtered_df = filtered_df[filtered_df['Source'] != 'FAILED']
-    elif status_filter == "Failed":
-        filtered_df = filtered_df[filtered_df['Source'] == 'FAILED']
+    total_pages = max(1, -(-match_count // page_size))
     
-    st.markdown(f"**Showing {len(filtered_df)} of {len(df_results)} results**")
+    with col4:
+        # Keyed on the filters so the page resets to 1 whenever the match set changes
+        page = st.number_input("📑 Page", min_value=1, max_value=total_pages, value=1, step=1,
+                               key=f"page_{search_term}_{source_filter}_{status_filter}_{page_size}")
+    
+    start_row = (page - 1) * page_size
+    end_row = min(start_row + page_size, match_count)
+    st.markdown(f"**Showing {start_row + 1 if match_count else 0}-{end_row} of {match_count} matches "
+                f"({len(results)} results, page {page} of {total_pages})**")
     st.markdown('</div>', unsafe_allow_html=True)
     
-    # Results table
+    # Results table - only the visible page is sent to the browser
     st.markdown('<div class="glass-card">', unsafe_allow_html=True)
     
-    if not filtered_df.empty:
-        # Format the dataframe for display
-        display_df = filtered_df.copy()
-        
-        # Add status badges (simplified for Streamlit)
-        display_df['Status'] = display_df['Source'].apply(
-            lambda x: "✅ Success" if x != 'FAILED' else "❌ Failed"
+    if match_count > 0:
+        display_df = results.page(
+            page=page,
+            page_size=page_size,
+            sort_by=None if sort_by == "None" else sort_by,
+            ascending=sort_order == "Ascending",
+            search_term=search_term,
+            source_filter=source_filter,
+            status_filter=status_filter
         )
         
-        # Reorder columns
-        column_order = ['Domain', 'Registrar', 'Creation Date', 'Expiration Date', 'Updated Date', 'Source', 'Status']
-        display_df = display_df[[col for col in column_order if col in display_df.columns]]
-        
         st.dataframe(
             display_df,
             use_container_width=True,
@@ -669,13 +473,14 @@ def render_results_section(df_results, processing_time):
     st.markdown('<div class="step-title">📥 Export Results</div>', unsafe_allow_html=True)
     
     col1, col2, col3 = st.columns(3)
+    timestamp = pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')
     
+    # Exports are serialized only when a download button is clicked
     with col1:
-        csv_data = convert_df_to_csv(filtered_df)
         st.download_button(
             label="📄 Download CSV",
-            data=csv_data,
-            file_name=f"whois_results_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            data=lambda: results.export('csv', search_term, source_filter, status_filter),
+            file_name=f"whois_results_{timestamp}.csv",
             mime="text/csv",
             use_container_width=True
         )
@@ -686,11 +491,10 @@ def render_results_section(df_results, processing_time):
     
     with col3:
         # JSON export
-        json_data = filtered_df.to_json(orient='records', indent=2)
         st.download_button(
             label="📋 Download JSON",
-            data=json_data,
-            file_name=f"whois_results_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.json",
+            data=lambda: results.export('json', search_term, source_filter, status_filter),
+            file_name=f"whois_results_{timestamp}.json",
             mime="application/json",
             use_container_width=True
         )
@@ -698,14 +502,12 @@ def render_results_section(df_results, processing_time):
     st.markdown('</div>', unsafe_allow_html=True)
     
     # Method distribution chart
-    if not df_results.empty:
-        st.markdown('<div class="glass-card">', unsafe_allow_html=True)
-        st.markdown('<div class="step-title">📈 Data Source Distribution</div>', unsafe_allow_html=True)
-        
-        source_counts = df_results['Source'].value_counts()
-        st.bar_chart(source_counts, use_container_width=True)
-        
-        st.markdown('</div>', unsafe_allow_html=True)
+    st.markdown('<div class="glass-card">', unsafe_allow_html=True)
+    st.markdown('<div class="step-title">📈 Data Source Distribution</div>', unsafe_allow_html=True)
+    
+    st.bar_chart(results.source_counts, use_container_width=True)
+    
+    st.markdown('</div>', unsafe_allow_html=True)
     
     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -719,10 +521,12 @@ def main():
         st.session_state.current_step = 1
     if 'domains' not in st.session_state:
         st.session_state.domains = None
-    if 'results' not in st.session_state:
-        st.session_state.results = None
+    if 'results_id' not in st.session_state:
+        st.session_state.results_id = None
     if 'processing_time' not in st.session_state:
         st.session_state.processing_time = 0
+    if 'tenant_id' not in st.session_state:
+        st.session_state.tenant_id = uuid.uuid4().hex  # fair-share scheduling key
     
     # Render step indicator
     render_step_indicator(st.session_state.current_step)
@@ -748,6 +552,17 @@ def main():
                 if len(domains) > 10:
                     st.markdown(f'<div class="info-card">Showing first 10 domains. Total: {len(domains)}</div>', unsafe_allow_html=True)
                 
+                # Start cache lookups and low-rate RDAP while the user configures the run
+                prefetch_enabled = st.toggle(
+                    "⚡ Warm up lookups in the background",
+                    value=True,
+                    help="Resolve cached and easy domains while you configure the run"
+                )
+                if prefetch_enabled:
+                    start_prefetch(domains, (uploaded_file.name, uploaded_file.size))
+                else:
+                    stop_prefetch()
+                
                 st.markdown('</div>', unsafe_allow_html=True)
                 
                 if st.button("➡️ Continue to Configuration", type="primary", use_container_width=True):
@@ -760,12 +575,18 @@ def main():
     elif st.session_state.current_step == 2:
         max_threads, api_key = render_configuration_section()
         
+        prefetcher = st.session_state.get('prefetcher')
+        if prefetcher is not None and prefetcher.warm_count:
+            st.markdown(f'<div class="info-card">⚡ {prefetcher.warm_count} of {len(st.session_state.domains)} '
+                        f'domains already resolved in the background</div>', unsafe_allow_html=True)
+        
         if st.button("🚀 Start Processing", type="primary", use_container_width=True):
             st.session_state.current_step = 2.5  # Processing state
             st.rerun()
         
         # Back button
         if st.button("⬅️ Back to Upload"):
+            stop_prefetch()
             st.session_state.current_step = 1
             st.rerun()
     
@@ -775,11 +596,11 @@ def main():
         api_key = ""    # Default value during processing
         
         results, processing_time = render_processing_section(
-            st.session_state.domains, max_threads, api_key
+            st.session_state.domains, max_threads, api_key, prefetched=stop_prefetch()
         )
         
         if results is not None:
-            st.session_state.results = results
+            st.session_state.results_id = get_result_spool().put(results)
             st.session_state.processing_time = processing_time
             st.session_state.current_step = 3
             time.sleep(2)  # Brief pause to show completion
@@ -787,7 +608,13 @@ def main():
     
     # Step 3: Results
     elif st.session_state.current_step == 3:
-        render_results_section(st.session_state.results, st.session_state.processing_time)
+        results = None
+        if st.session_state.results_id is not None:
+            results = get_result_spool().get(st.session_state.results_id, lambda df: ResultSet(df).prepare())
+        if results is None:
+            st.markdown('<div class="warning-card">⚠️ These results have expired. '
+                        'Please process the domains again.</div>', unsafe_allow_html=True)
+        render_results_section(results, st.session_state.processing_time)
         
         # Action buttons
         col1, col2 = st.columns(2)
@@ -795,9 +622,12 @@ def main():
         with col1:
             if st.button("🔄 Process New Domains", use_container_width=True):
                 # Reset session state
+                stop_prefetch()
                 st.session_state.current_step = 1
                 st.session_state.domains = None
-                st.session_state.results = None
+                if st.session_state.results_id is not None:
+                    get_result_spool().discard(st.session_state.results_id)
+                st.session_state.results_id = None
                 st.session_state.processing_time = 0
                 st.rerun()
         
@@ -806,37 +636,13 @@ def main():
                 st.session_state.current_step = 2
                 st.rerun()
 
-    # --- Sticky Footer ---
+    # --- Sticky Footer --- (styles live in static/styles.css)
 st.markdown("""
-    <style>
-    .footer {
-        position: fixed;
-        left: 0;
-        bottom: 0;
-        width: 100%;
-        background-color: #0e1117; /* matches Streamlit dark theme */
-        color: white;
-        text-align: center;
-        padding: 10px 0;
-        font-size: 15px;
-        border-top: 1px solid #333;
-    }
-    </style>
-
     <div class="footer">
         Made with ❤️ by <b>Tafseer Alam</b>
     </div>
 """, unsafe_allow_html=True)
 
-st.markdown("""
-    <style>
-    /* Hide the empty main container */
-    .main-container.fade-in-up {
-        display: none !important;
-    }
-    </style>
-""", unsafe_allow_html=True)
-
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,77 @@
+"""
+Import-time benchmark for the fetcher core and the Streamlit app modules.
+
+Each module is imported in a fresh interpreter (so nothing is already cached
+in sys.modules) and timed over several runs. The report also lists which heavy
+dependencies the import pulled in, so a regression that drags pandas or
+streamlit back into the fetcher core shows up immediately.
+
+Usage:
+    python bench_import.py [--runs 10] [--module advanced_whois_fetcher ...]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+DEFAULT_MODULES = ['advanced_whois_fetcher', 'whois_fetcher', 'utils']
+HEAVY_DEPENDENCIES = ['pandas', 'numpy', 'requests', 'whois', 'streamlit', 'tqdm']
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def time_import(module: str, runs: int) -> dict:
+    """
+    Time importing module in fresh interpreters
+
+    Args:
+        module: Module name to import
+        runs: Number of cold imports to time
+
+    Returns:
+        Dictionary with median/min/max seconds and heavy dependencies loaded
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    samples = []
+    loaded = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, '-c', _PROBE.format(module=module, heavy=HEAVY_DEPENDENCIES)],
+            cwd=here, capture_output=True, text=True, check=True
+        )
+        probe = json.loads(out.stdout.strip().splitlines()[-1])
+        samples.append(probe['seconds'])
+        loaded = probe['loaded']
+
+    return {
+        'module': module,
+        'median': statistics.median(samples),
+        'min': min(samples),
+        'max': max(samples),
+        'loaded': loaded
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cold import time")
+    parser.add_argument('--runs', type=int, default=10, help="Cold imports per module")
+    parser.add_argument('--module', action='append', dest='modules', help="Module to benchmark (repeatable)")
+    args = parser.parse_args()
+
+    print(f"{'module':<28}{'median ms':>10}{'min ms':>10}{'max ms':>10}  heavy deps loaded")
+    for module in args.modules or DEFAULT_MODULES:
+        r = time_import(module, args.runs)
+        print(f"{r['module']:<28}{r['median'] * 1000:>10.1f}{r['min'] * 1000:>10.1f}{r['max'] * 1000:>10.1f}"
+              f"  {', '.join(r['loaded']) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""
+Incremental change detection between runs.
+
+ChangeTracker keeps one fingerprint (a BLAKE2b digest of the normalized
+tracked fields) per domain in a SQLite file. Each result of a run is compared
+with the stored fingerprint as it arrives, so a run produces its change set
+(new domains, changed domains with field-level diffs, unchanged count)
+without loading or joining previous exports.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from registrars import registrar_key
+
+TRACKED_FIELDS = ['Registrar', 'Creation Date', 'Expiration Date', 'Updated Date']
+# Results without registration data to fingerprint
+UNTRACKED_SOURCES = ('FAILED', 'EXCEPTION', 'NOT_IN_ZONE')
+BATCH_SIZE = 500
+
+
+def normalize_fields(result: dict) -> Dict[str, Optional[str]]:
+    """Tracked fields of a result as comparable strings (None for missing)"""
+    fields = {}
+    for field in TRACKED_FIELDS:
+        value = result.get(field)
+        if value is None or value != value:  # None or NaN/NaT
+            fields[field] = None
+        elif hasattr(value, 'strftime'):
+            fields[field] = value.strftime('%Y-%m-%d')
+        else:
+            fields[field] = str(value).strip()
+    return fields
+
+
+def comparable(field: str, value: Optional[str]) -> str:
+    """
+    Form of a normalized field value used for change detection: registrars
+    are compared by registrar_key, since the interned display spelling
+    depends on which spelling the process happened to see first
+    """
+    if value is None:
+        return ''
+    return registrar_key(value) if field == 'Registrar' else value
+
+
+def fingerprint(fields: Dict[str, Optional[str]]) -> bytes:
+    payload = '\x1f'.join(comparable(f, fields[f]) for f in TRACKED_FIELDS)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).digest()
+
+
+class ChangeSet:
+    """Changes detected in one run"""
+
+    def __init__(self):
+        self.new: List[str] = []
+        self.changed: Dict[str, Dict[str, Tuple[Optional[str], Optional[str]]]] = {}
+        self.unchanged = 0
+
+    def summary(self) -> Dict[str, int]:
+        return {'new': len(self.new), 'changed': len(self.changed), 'unchanged': self.unchanged}
+
+    def to_dict(self) -> dict:
+        return {
+            'new': self.new,
+            'changed': {domain: {field: {'old': old, 'new': new} for field, (old, new) in diff.items()}
+                        for domain, diff in self.changed.items()},
+            'unchanged': self.unchanged
+        }
+
+
+class ChangeTracker:
+    """
+    Per-domain fingerprint store that diffs each run against the previous one
+
+    Args:
+        path: SQLite file holding fingerprints (created if missing)
+        events_path: Optional JSON-lines file; every new/changed domain is
+            appended to it as soon as it is detected
+    """
+
+    def __init__(self, path: str, events_path: Optional[str] = None):
+        self.path = path
+        self.events_path = events_path
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS fingerprints ("
+            "domain TEXT PRIMARY KEY, fp BLOB NOT NULL, fields TEXT NOT NULL, seen_at REAL NOT NULL)"
+        )
+        self._pending: List[dict] = []
+        self._lock = threading.Lock()
+        self.changes = ChangeSet()
+
+    def observe(self, result: dict):
+        """Queue a result for comparison (processed in batches)"""
+        if result.get('Source') in UNTRACKED_SOURCES:
+            return
+        with self._lock:
+            self._pending.append(result)
+            if len(self._pending) >= BATCH_SIZE:
+                self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+
+        current = {}
+        for result in batch:
+            fields = normalize_fields(result)
+            current[result['Domain']] = (fingerprint(fields), fields)
+
+        domains = list(current)
+        placeholders = ','.join('?' * len(domains))
+        previous = {
+            domain: (fp, fields)
+            for domain, fp, fields in self._db.execute(
+                f"SELECT domain, fp, fields FROM fingerprints WHERE domain IN ({placeholders})", domains
+            )
+        }
+
+        now = time.time()
+        writes = []
+        events = []
+        for domain, (fp, fields) in current.items():
+            old = previous.get(domain)
+            if old is None:
+                self.changes.new.append(domain)
+                events.append({'domain': domain, 'change': 'new', 'fields': fields})
+            elif old[0] == fp:
+                self.changes.unchanged += 1
+                continue
+            else:
+                old_fields = json.loads(old[1])
+                diff = {f: (old_fields.get(f), fields[f]) for f in TRACKED_FIELDS
+                        if comparable(f, old_fields.get(f)) != comparable(f, fields[f])}
+                if not diff:
+                    # same data, fingerprinted by an older scheme: just refresh it
+                    self.changes.unchanged += 1
+                    writes.append((domain, fp, json.dumps(fields), now))
+                    continue
+                self.changes.changed[domain] = diff
+                events.append({'domain': domain, 'change': 'changed',
+                               'diff': {f: {'old': o, 'new': n} for f, (o, n) in diff.items()}})
+            writes.append((domain, fp, json.dumps(fields), now))
+
+        if writes:
+            with self._db:
+                self._db.executemany(
+                    "INSERT INTO fingerprints (domain, fp, fields, seen_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(domain) DO UPDATE SET fp=excluded.fp, fields=excluded.fields, "
+                    "seen_at=excluded.seen_at",
+                    writes
+                )
+        if events and self.events_path:
+            with open(self.events_path, 'a', encoding='utf-8') as f:
+                for event in events:
+                    f.write(json.dumps(event) + '\n')
+
+    def finish(self) -> ChangeSet:
+        """Process queued results and return the run's change set, starting a new one"""
+        with self._lock:
+            self._flush()
+            changes, self.changes = self.changes, ChangeSet()
+        return changes
+
+    def close(self):
+        self.finish()
+        self._db.close()
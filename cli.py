@@ -0,0 +1,96 @@
+"""
+Command-line batch runner.
+
+Reads a domain list (CSV, Excel or plain text, one domain per line), looks
+everything up with AdvancedWHOISFetcher and writes the results as CSV or
+JSON, printing throttled progress snapshots to stderr.
+"""
+import argparse
+import os
+import sys
+
+from advanced_whois_fetcher import AdvancedWHOISFetcher, MAX_THREADS, adaptive_timeouts
+from progress import PROGRESS_INTERVAL, ProgressStream, format_snapshot
+
+
+def read_domain_list(path):
+    """Domains from a CSV, Excel or text file, optionally compressed or zipped (see utils.iter_domains)"""
+    from utils import iter_domains
+    with open(path, 'rb') as f:
+        return list(iter_domains(f, path, default_format='txt', warn=lambda message: print(message, file=sys.stderr)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk WHOIS/RDAP lookups")
+    parser.add_argument("input", help="Domain list (.csv, .xlsx, .xls or text; may be .gz/.zst compressed or .zip)")
+    parser.add_argument("-o", "--output", required=True, help="Output file (.csv or .json)")
+    parser.add_argument("--threads", type=int, default=MAX_THREADS, help="Concurrent lookups")
+    parser.add_argument("--api-key", default="", help="Paid WHOIS API key")
+    parser.add_argument("--cache-url", default=os.environ.get("WHOIS_CACHE_URL"),
+                        help="redis://host:port of the shared result cache")
+    parser.add_argument("--zone-index", default=os.environ.get("WHOIS_ZONE_INDEX"),
+                        help="Zone index directory (see zone_index.py)")
+    parser.add_argument("--archive", metavar="DIR", default=os.environ.get("WHOIS_ARCHIVE_DIR"),
+                        help="Archive raw upstream responses in DIR (see response_archive.py)")
+    parser.add_argument("--http2", action="store_true", help="Use the HTTP/2 transport (requires httpx)")
+    parser.add_argument("--record", metavar="CORPUS", help="Record sanitized upstream traffic to this file")
+    parser.add_argument("--replay", metavar="CORPUS", help="Serve upstream traffic from a recorded corpus (offline)")
+    parser.add_argument("--replay-speed", type=float, default=1.0,
+                        help="Replay latency divisor (0 = no delays)")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="Write a Chrome trace of every lookup to FILE and print a latency summary")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Ignore cached results and revalidate every domain")
+    parser.add_argument("--progress-interval", type=float, default=PROGRESS_INTERVAL,
+                        help="Seconds between progress lines")
+    args = parser.parse_args()
+
+    domains = read_domain_list(args.input)
+    if not domains:
+        parser.error(f"No domains found in {args.input}")
+
+    cache = zone_index = transport = tracer = archive = None
+    if args.cache_url:
+        from result_cache import cache_from_url
+        cache = cache_from_url(args.cache_url)
+    if args.zone_index:
+        from zone_index import ZoneIndex
+        zone_index = ZoneIndex(args.zone_index)
+    if args.archive:
+        from response_archive import ResponseArchive
+        archive = ResponseArchive(args.archive)
+    if args.http2:
+        from transport import Http2Transport
+        transport = Http2Transport(connect_observer=adaptive_timeouts.observe_connect)
+    if args.replay:
+        from replay import ReplayTransport
+        transport = ReplayTransport(args.replay, speed=args.replay_speed)
+    elif args.record:
+        from replay import RecordingTransport
+        transport = RecordingTransport(args.record, inner=transport)
+    if args.trace:
+        from tracing import Tracer
+        tracer = Tracer()
+
+    def show(snapshot):
+        end = "\n" if snapshot.finished else ""
+        print("\r" + format_snapshot(snapshot).ljust(100), end=end, file=sys.stderr, flush=True)
+
+    progress_stream = ProgressStream(len(domains), interval=args.progress_interval).subscribe(show)
+    fetcher = AdvancedWHOISFetcher(max_threads=args.threads, api_key=args.api_key, archive=archive, cache=cache,
+                                   zone_index=zone_index, transport=transport, tracer=tracer)
+    df = fetcher.fetch_multiple_domains_advanced(domains, refresh=args.refresh, progress_stream=progress_stream)
+
+    if args.output.endswith(".json"):
+        df.to_json(args.output, orient="records", indent=2, date_format="iso")
+    else:
+        df.to_csv(args.output, index=False)
+    print(f"Wrote {len(df)} results to {args.output}", file=sys.stderr)
+    if tracer is not None:
+        tracer.export_chrome_trace(args.trace)
+        print(tracer.format_summary(), file=sys.stderr)
+        print(f"Wrote trace to {args.trace}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
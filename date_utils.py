@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Iterable, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Result columns holding dates
+DATE_COLUMNS = ['Creation Date', 'Expiration Date', 'Updated Date']
+
+# Formats seen in RDAP, WHOIS API and port-43 responses (ISO 8601 is handled first)
+DATE_FORMATS = [
+    '%Y-%m-%dT%H:%M:%S%z',
+    '%Y-%m-%dT%H:%M:%S.%f%z',
+    '%Y-%m-%dT%H:%M:%SZ',
+    '%Y-%m-%dT%H:%M:%S.%fZ',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d %H:%M:%S%z',
+    '%Y-%m-%d %H:%M:%S %Z',
+    '%Y-%m-%d',
+    '%Y.%m.%d',
+    '%Y.%m.%d %H:%M:%S',
+    '%Y/%m/%d',
+    '%Y/%m/%d %H:%M:%S',
+    '%Y%m%d',
+    '%d-%b-%Y',
+    '%d-%b-%Y %H:%M:%S',
+    '%d-%B-%Y',
+    '%d.%m.%Y',
+    '%d.%m.%Y %H:%M:%S',
+    '%d/%m/%Y',
+    '%d/%m/%Y %H:%M:%S',
+    '%b %d %Y',
+    '%d %b %Y',
+    '%B %d %Y',
+    '%a %b %d %H:%M:%S %Y',
+    '%a %b %d %H:%M:%S %Z %Y',
+]
+
+_DIGITS = re.compile(r'\d')
+_LETTERS = re.compile(r'[A-Za-z]')
+
+# Shape of a date string (digits -> 9, letters -> a) -> format that parsed it
+_format_cache: Dict[str, str] = {}
+
+
+def _shape(value: str) -> str:
+    return _LETTERS.sub('a', _DIGITS.sub('9', value))
+
+
+@lru_cache(maxsize=65536)
+def parse_date_string(value: str) -> Optional[date]:
+    """
+    Parse a date string in any known format
+
+    Formats are detected once per string shape and remembered, so a column of
+    dates written the same way costs one format search, not one per value.
+
+    Args:
+        value: Date string from an upstream response
+
+    Returns:
+        Parsed date or None if no known format matches
+    """
+    value = value.strip()
+    if not value:
+        return None
+
+    try:
+        return datetime.fromisoformat(value).date()
+    except ValueError:
+        pass
+
+    shape = _shape(value)
+    fmt = _format_cache.get(shape)
+    if fmt is not None:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            pass
+
+    for fmt in DATE_FORMATS:
+        try:
+            parsed = datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+        _format_cache[shape] = fmt
+        return parsed
+    return None
+
+
+def to_date(value) -> Optional[date]:
+    """
+    Normalize a raw date value (string, datetime, or list of either) to a date
+
+    Lists, as returned by python-whois for multi-valued fields, use their
+    first non-empty element.
+    """
+    if isinstance(value, (list, tuple)):
+        value = next((v for v in value if v), None)
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        return parse_date_string(value)
+    return parse_date_string(str(value))
+
+
+def to_iso_date(value) -> Optional[str]:
+    """Normalize a raw date value to a 'YYYY-MM-DD' string (None if unparseable)"""
+    parsed = to_date(value)
+    return parsed.isoformat() if parsed else None
+
+
+def normalize_date_columns(df: pd.DataFrame, columns: Iterable[str] = DATE_COLUMNS) -> pd.DataFrame:
+    """
+    Convert result date columns to typed datetime64 columns in place
+
+    Values already in ISO 8601 are converted in one vectorized pass; anything
+    left over goes through the memoized parser once per distinct value.
+
+    Args:
+        df: Results DataFrame
+        columns: Date columns to convert (missing ones are skipped)
+
+    Returns:
+        The same DataFrame, for chaining
+    """
+    import pandas as pd
+
+    for column in columns:
+        if column not in df.columns:
+            continue
+        values = df[column]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            continue
+
+        # Vectorized fast path: plain ISO strings, keeping the date as written
+        converted = pd.to_datetime(values.astype('string').str.slice(0, 10),
+                                   format='%Y-%m-%d', errors='coerce')
+
+        leftover = converted.isna() & values.notna()
+        if leftover.any():
+            raw = values[leftover]
+            mapping = {v: to_date(v) for v in pd.unique(raw.astype(str))}
+            converted[leftover] = pd.to_datetime(raw.astype(str).map(mapping), errors='coerce')
+
+        # second resolution: nanoseconds overflow after 2262, and registries
+        # use 9999-12-31 as a "never expires" placeholder
+        df[column] = converted.astype('datetime64[s]')
+    return df
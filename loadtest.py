@@ -0,0 +1,189 @@
+"""
+Multi-session load test for the Streamlit app.
+
+Drives concurrent headless sessions (streamlit.testing AppTest) through
+upload -> configure -> process -> results -> search in app.py against a local
+stub RDAP server, at increasing concurrency levels, and reports per-step page
+latency, resident memory per session and lookup throughput for each level.
+
+    python loadtest.py --levels 1,2,4,8 --domains 200 --latency 0.05
+
+Every session uploads its own domain names, so the shared result cache does
+not hide the lookup work. The process step includes the app's fixed 2s pause
+before showing results.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+STEPS = ["load", "upload", "configure", "process", "search"]
+SESSION_TIMEOUT = 600  # seconds one script run may take
+
+
+class StubRdapServer:
+    """
+    Local RDAP stand-in answering every domain with a small fixed document
+
+    Args:
+        latency: Seconds to wait before each response
+        jitter: Extra uniformly random latency (seconds)
+    """
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.02, host: str = "127.0.0.1", port: int = 0):
+        stub = self
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        self._lock = threading.Lock()
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests += 1
+                time.sleep(stub.latency + random.uniform(0, stub.jitter))
+                domain = self.path.rsplit("/", 1)[-1]
+                body = json.dumps({
+                    "ldhName": domain,
+                    "events": [
+                        {"eventAction": "registration", "eventDate": "2015-03-01T00:00:00Z"},
+                        {"eventAction": "expiration", "eventDate": "2030-03-01T00:00:00Z"},
+                    ],
+                    "entities": [{"roles": ["registrar"],
+                                  "vcardArray": ["vcard", [["fn", {}, "text", "Stub Registrar, Inc."]]]}],
+                }).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/rdap+json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.host, self.port = self._server.server_address[:2]
+
+    @property
+    def rdap_url(self) -> str:
+        return f"http://{self.host}:{self.port}/domain/{{domain}}"
+
+    def start(self) -> "StubRdapServer":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process (Linux), 0 where unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _button(at, prefix: str):
+    return next(b for b in at.button if b.label.startswith(prefix))
+
+
+def run_session(session: int, level: int, domains: int) -> Dict[str, float]:
+    """Walk one headless session through the whole app; returns seconds per step"""
+    from streamlit.testing.v1 import AppTest
+
+    csv = "domain\n" + "".join(f"s{level}-{session}-{i}.example.com\n" for i in range(domains))
+    at = AppTest.from_file(APP_PATH, default_timeout=SESSION_TIMEOUT)
+    timings = {}
+
+    def step(name, action):
+        start = time.perf_counter()
+        action()
+        timings[name] = time.perf_counter() - start
+        if at.exception:
+            raise RuntimeError(f"session {session} failed at {name}: {at.exception[0].value}")
+
+    step("load", at.run)
+    at.file_uploader[0].set_value((f"domains_{session}.csv", csv.encode("utf-8"), "text/csv"))
+    step("upload", at.run)
+    at.toggle[0].set_value(False)  # no background prefetch: measure the processing path itself
+    step("configure", lambda: _button(at, "➡️").click().run())
+    step("process", lambda: _button(at, "🚀").click().run())
+    step("search", lambda: at.text_input[0].set_value(f"s{level}-{session}-1").run())
+    # keep the session (and its memory) alive until the level is measured
+    timings["_app"] = at
+    return timings
+
+
+def run_level(level: int, domains: int) -> dict:
+    """Run `level` concurrent sessions and summarize them"""
+    rss_before = rss_bytes()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=level) as pool:
+        sessions = list(pool.map(lambda i: run_session(i, level, domains), range(level)))
+    wall = time.perf_counter() - start
+    rss_after = rss_bytes()
+
+    summary = {"sessions": level, "wall_s": round(wall, 3),
+               "lookups_per_s": round(level * domains / wall, 1),
+               "rss_mb": round(rss_after / 2 ** 20, 1),
+               "rss_per_session_mb": round((rss_after - rss_before) / 2 ** 20 / level, 2)}
+    for name in STEPS:
+        samples = sorted(s[name] for s in sessions)
+        summary[f"{name}_p50_s"] = round(statistics.median(samples), 3)
+        summary[f"{name}_max_s"] = round(samples[-1], 3)
+    sessions.clear()
+    return summary
+
+
+def format_table(rows: List[dict]) -> str:
+    columns = ["sessions", "wall_s", "lookups_per_s", "rss_mb", "rss_per_session_mb"] + \
+              [f"{name}_p50_s" for name in STEPS] + ["process_max_s", "search_max_s"]
+    lines = ["  ".join(f"{c:>14}" for c in columns)]
+    for row in rows:
+        lines.append("  ".join(f"{row[c]:>14}" for c in columns))
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Load test app.py with concurrent headless sessions")
+    parser.add_argument("--levels", default="1,2,4,8", help="Comma-separated concurrent session counts")
+    parser.add_argument("--domains", type=int, default=200, help="Domains uploaded per session")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub RDAP latency (seconds)")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    stub = StubRdapServer(latency=args.latency).start()
+    # must be set before app.py (and with it advanced_whois_fetcher) is first imported
+    os.environ["WHOIS_RDAP_URL"] = stub.rdap_url
+    os.environ.pop("WHOIS_CACHE_URL", None)
+
+    rows = []
+    try:
+        for level in (int(n) for n in args.levels.split(",")):
+            rows.append(run_level(level, args.domains))
+            table = format_table(rows).splitlines()
+            print("\n".join(table if len(rows) == 1 else table[-1:]), flush=True)
+    finally:
+        stub.stop()
+
+    print(f"\nStub served {stub.requests} RDAP requests")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
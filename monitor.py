@@ -0,0 +1,437 @@
+"""
+Continuous expiry monitoring.
+
+Monitor keeps a watch list (SQLite) of domains, each with its next check
+time, and drives AdvancedWHOISFetcher from a hashed timing wheel instead of
+re-fetching everything on a cron. Each domain's cadence follows its
+Expiration Date and change history (daily close to expiry, monthly for
+domains years away from it), so the upstream query rate tracks what is
+actually likely to change. Changes found by the ChangeTracker are emitted as
+alerts, as are watched domains that drop (fall out of the zone file or stop
+resolving) and come back.
+
+Checks run with refresh=True through a result cache, so RDAP answers that
+have not changed are revalidated with conditional requests (304 Not
+Modified) instead of downloaded again. Set WHOIS_CACHE_URL (or --cache-url)
+to a shared Redis-protocol cache for large watch lists: the in-process layer
+only holds LOCAL_MAX_ENTRIES validators and is lost on restart.
+
+    python monitor.py add domains.csv --db monitor.db
+    python monitor.py run --db monitor.db --events alerts.jsonl
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Optional
+
+DAY = 24 * 3600
+
+# Re-check cadence (seconds)
+NEAR_EXPIRY_DAYS = 30              # daily checks inside this window (and after expiry)
+SOON_EXPIRY_DAYS = 90              # weekly checks inside this window
+NEAR_EXPIRY_INTERVAL = DAY
+SOON_EXPIRY_INTERVAL = 7 * DAY
+DEFAULT_INTERVAL = 30 * DAY        # far from expiry
+UNKNOWN_INTERVAL = 7 * DAY         # no expiration date / not in zone
+FAILED_INTERVAL = 6 * 3600         # lookup failed; try again soon
+RECENT_CHANGE_WINDOW = 30 * DAY    # domains changed this recently are checked at least weekly
+CADENCE_JITTER = 0.1               # +/- fraction, spreads checks scheduled together
+
+TICK_SECONDS = 60.0
+WHEEL_SLOTS = 4096                 # ~2.8 days per revolution at one-minute ticks
+MAX_CHECKS_PER_TICK = 500          # upstream budget; excess due checks wait for the next tick
+INITIAL_SPREAD = 3600.0            # newly watched domains are first checked within this window
+FAILED_SOURCES = ('FAILED', 'EXCEPTION')
+DROP_ALERT_FAILURES = 3            # consecutive failed checks before a registered domain counts as dropped
+TICK_RETRY_MAX = 3600.0            # cap on the backoff after consecutive failed ticks
+
+# Registration states kept per watched domain (alerts fire on transitions)
+REGISTERED = 'registered'
+NOT_IN_ZONE = 'not_in_zone'        # unregistered, or on hold / in redemption
+UNRESOLVED = 'unresolved'
+
+logger = logging.getLogger(__name__)
+
+
+class TimingWheel:
+    """
+    Hashed timing wheel
+
+    Keys are placed in slot (due tick % slots) with their absolute due tick,
+    so scheduling and cancelling are O(1) and each tick only looks at one
+    slot; keys due more than one revolution ahead stay in their slot until
+    their round comes up.
+    """
+
+    def __init__(self, tick: float = TICK_SECONDS, slots: int = WHEEL_SLOTS, start: Optional[float] = None):
+        self.tick = tick
+        self.slots = slots
+        self._wheel: List[Dict[Hashable, int]] = [{} for _ in range(slots)]
+        self._slot_of: Dict[Hashable, int] = {}
+        self._current = int((time.time() if start is None else start) // tick)  # next tick to process
+
+    def __len__(self):
+        return len(self._slot_of)
+
+    def __contains__(self, key):
+        return key in self._slot_of
+
+    def schedule(self, key: Hashable, when: float):
+        """(Re)schedule key for time `when` (overdue times fire on the next tick)"""
+        self.cancel(key)
+        due = max(int(when // self.tick), self._current)
+        slot = due % self.slots
+        self._wheel[slot][key] = due
+        self._slot_of[key] = slot
+
+    def cancel(self, key: Hashable):
+        slot = self._slot_of.pop(key, None)
+        if slot is not None:
+            del self._wheel[slot][key]
+
+    def advance(self, now: float) -> List[Hashable]:
+        """Keys due up to `now`, earliest tick first"""
+        target = int(now // self.tick)
+        due = []
+        if target - self._current >= self.slots:
+            # fell behind by a whole revolution or more: one pass over every slot
+            for bucket in self._wheel:
+                ready = [key for key, tick in bucket.items() if tick <= target]
+                for key in ready:
+                    del bucket[key]
+                    del self._slot_of[key]
+                due.extend(ready)
+            self._current = target + 1
+            return due
+        while self._current <= target:
+            bucket = self._wheel[self._current % self.slots]
+            ready = [key for key, tick in bucket.items() if tick <= self._current]
+            for key in ready:
+                del bucket[key]
+                del self._slot_of[key]
+            due.extend(ready)
+            self._current += 1
+        return due
+
+
+def _timestamp(value) -> Optional[float]:
+    """Epoch seconds of a date/Timestamp result value, None for missing"""
+    if value is None or value != value:  # None or NaN/NaT
+        return None
+    if hasattr(value, 'timestamp'):
+        return value.timestamp()
+    return None
+
+
+def next_check_interval(result: dict, last_change: Optional[float], now: float) -> float:
+    """
+    Seconds until a domain should be checked again
+
+    Args:
+        result: Latest lookup result
+        last_change: When the domain last changed (epoch seconds), if ever
+        now: Current time (epoch seconds)
+    """
+    if result.get('Source') in FAILED_SOURCES:
+        return FAILED_INTERVAL
+
+    expiration = _timestamp(result.get('Expiration Date'))
+    if expiration is None:
+        interval = UNKNOWN_INTERVAL
+    else:
+        days_left = (expiration - now) / DAY
+        if days_left <= NEAR_EXPIRY_DAYS:
+            interval = NEAR_EXPIRY_INTERVAL
+        elif days_left <= SOON_EXPIRY_DAYS:
+            interval = SOON_EXPIRY_INTERVAL
+        else:
+            # never sleep past the point where daily checks should start
+            interval = min(DEFAULT_INTERVAL, expiration - NEAR_EXPIRY_DAYS * DAY - now)
+
+    if last_change is not None and now - last_change < RECENT_CHANGE_WINDOW:
+        interval = min(interval, SOON_EXPIRY_INTERVAL)
+    return max(interval, NEAR_EXPIRY_INTERVAL)
+
+
+class Monitor:
+    """
+    Long-running monitor over a persistent watch list
+
+    Args:
+        db_path: SQLite file with the watch list (the ChangeTracker
+            fingerprints live in the same file)
+        fetcher_factory: Callable(change_tracker) -> AdvancedWHOISFetcher
+            (default: a fetcher with the WHOIS_CACHE_URL result cache, which
+            also keeps the RDAP validators used for revalidation, and the
+            WHOIS_ZONE_INDEX zone index, which drop alerts rely on)
+        events_path: JSON-lines file the ChangeTracker appends changes to
+        on_alert: Callables(alert dict) called for every detected change and
+            registration state transition
+        tick: Timing wheel resolution in seconds
+        max_checks_per_tick: Upper bound on lookups started per tick
+    """
+
+    def __init__(self, db_path: str, fetcher_factory: Optional[Callable] = None,
+                 events_path: Optional[str] = None, on_alert: Optional[List[Callable[[dict], None]]] = None,
+                 tick: float = TICK_SECONDS, max_checks_per_tick: int = MAX_CHECKS_PER_TICK):
+        from change_tracker import ChangeTracker
+
+        self.db_path = db_path
+        self.max_checks_per_tick = max_checks_per_tick
+        self.on_alert = list(on_alert or [])
+        self.tracker = ChangeTracker(db_path, events_path=events_path)
+        self.fetcher = (fetcher_factory or self._default_fetcher)(self.tracker)
+        self.wheel = TimingWheel(tick=tick)
+        self._stop = threading.Event()
+        self._failed_ticks = 0
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS watch ("
+            "domain TEXT PRIMARY KEY, next_check REAL NOT NULL, last_check REAL, last_change REAL, "
+            "state TEXT, failures INTEGER NOT NULL DEFAULT 0)"
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(watch)")}
+        if 'state' not in columns:  # watch lists created before state tracking
+            with self._db:
+                self._db.execute("ALTER TABLE watch ADD COLUMN state TEXT")
+                self._db.execute("ALTER TABLE watch ADD COLUMN failures INTEGER NOT NULL DEFAULT 0")
+        self._last_change: Dict[str, float] = {}
+        for domain, next_check, last_change in self._db.execute(
+                "SELECT domain, next_check, last_change FROM watch"):
+            self.wheel.schedule(domain, next_check)
+            if last_change is not None:
+                self._last_change[domain] = last_change
+
+    @staticmethod
+    def _default_fetcher(tracker):
+        from advanced_whois_fetcher import AdvancedWHOISFetcher
+        from result_cache import cache_from_url
+        from zone_index import ZoneIndex
+        zone_index_path = os.environ.get("WHOIS_ZONE_INDEX")
+        return AdvancedWHOISFetcher(cache=cache_from_url(os.environ.get("WHOIS_CACHE_URL")),
+                                    zone_index=ZoneIndex(zone_index_path) if zone_index_path else None,
+                                    change_tracker=tracker)
+
+    def __len__(self):
+        return len(self.wheel)
+
+    def watch(self, domains: List[str], spread: float = INITIAL_SPREAD) -> int:
+        """Add domains (first checks spread over `spread` seconds); returns how many were new"""
+        from advanced_whois_fetcher import normalize_domain
+
+        now = time.time()
+        rows = []
+        for domain in dict.fromkeys(normalize_domain(d) for d in domains if d.strip()):
+            if domain in self.wheel:
+                continue
+            when = now + random.uniform(0, spread)
+            self.wheel.schedule(domain, when)
+            rows.append((domain, when))
+        with self._db:
+            self._db.executemany("INSERT OR IGNORE INTO watch (domain, next_check) VALUES (?, ?)", rows)
+        return len(rows)
+
+    def unwatch(self, domains: List[str]):
+        for domain in domains:
+            self.wheel.cancel(domain)
+            self._last_change.pop(domain, None)
+        with self._db:
+            self._db.executemany("DELETE FROM watch WHERE domain = ?", [(d,) for d in domains])
+
+    def run_once(self, now: Optional[float] = None) -> int:
+        """
+        Check every domain due by `now` (up to the per-tick budget); returns the number checked
+
+        If the check fails as a whole (fetcher or database error), the error is
+        logged and the due domains are put back on the wheel with an
+        exponential backoff, so they are never lost from the schedule.
+        """
+        now = time.time() if now is None else now
+        due = self.wheel.advance(now)
+        if not due:
+            return 0
+        due, deferred = due[:self.max_checks_per_tick], due[self.max_checks_per_tick:]
+        for domain in deferred:
+            self.wheel.schedule(domain, now + self.wheel.tick)
+
+        try:
+            checked = self._check(due, now)
+        except Exception:
+            self._failed_ticks += 1
+            delay = min(TICK_RETRY_MAX, self.wheel.tick * 2 ** self._failed_ticks)
+            logger.exception("Check of %d due domains failed; retrying in %.0fs", len(due), delay)
+            self._reschedule([d for d in due if d not in self.wheel], now + delay)
+            return 0
+        self._failed_ticks = 0
+        return checked
+
+    def _reschedule(self, domains: List[str], start: float):
+        """Put domains back on the wheel, spread over one tick from start"""
+        rows = []
+        for domain in domains:
+            when = start + random.uniform(0, self.wheel.tick)
+            self.wheel.schedule(domain, when)
+            rows.append((when, domain))
+        try:
+            with self._db:
+                self._db.executemany("UPDATE watch SET next_check = ? WHERE domain = ?", rows)
+        except sqlite3.Error:
+            logger.exception("Could not persist rescheduled checks")
+
+    def _check(self, due: List[str], now: float) -> int:
+        """Look up due domains, raise alerts and schedule their next checks"""
+        due_set = set(due)
+        results = self.fetcher.fetch_multiple_domains_advanced(due, refresh=True)
+        changes = self.fetcher.last_changes
+        changed = changes.changed if changes is not None else {}
+        for domain, diff in changed.items():
+            self._last_change[domain] = now
+            self._alert({'domain': domain, 'change': 'changed', 'checked_at': now,
+                         'diff': {f: {'old': old, 'new': new} for f, (old, new) in diff.items()}})
+
+        placeholders = ','.join('?' * len(due))
+        states = {domain: (state, failures) for domain, state, failures in self._db.execute(
+            f"SELECT domain, state, failures FROM watch WHERE domain IN ({placeholders})", due)}
+
+        rows = []
+        for result in results.to_dict('records'):
+            domain = result['Domain']
+            if domain not in due_set:
+                continue
+            state, failures = self._transition(result, *states.get(domain, (None, 0)), now)
+            last_change = self._last_change.get(domain)
+            interval = next_check_interval(result, last_change, now)
+            when = now + interval * random.uniform(1 - CADENCE_JITTER, 1 + CADENCE_JITTER)
+            self.wheel.schedule(domain, when)
+            rows.append((when, now, last_change, state, failures, domain))
+        with self._db:
+            self._db.executemany(
+                "UPDATE watch SET next_check = ?, last_check = ?, last_change = ?, state = ?, failures = ? "
+                "WHERE domain = ?", rows)
+        return len(due)
+
+    def _transition(self, result: dict, state: Optional[str], failures: int, now: float):
+        """
+        New (state, failures) of a watched domain after a check, alerting when
+        a registered domain drops or a dropped one is registered again
+
+        A failed lookup only counts as a drop after DROP_ALERT_FAILURES
+        consecutive failures, so an upstream hiccup does not raise an alert.
+        """
+        source = result.get('Source')
+        domain = result['Domain']
+        if source in FAILED_SOURCES:
+            failures += 1
+            if state == REGISTERED and failures >= DROP_ALERT_FAILURES:
+                self._alert({'domain': domain, 'change': UNRESOLVED, 'checked_at': now,
+                             'failures': failures, 'error': result.get('Error')})
+                state = UNRESOLVED
+            return state, failures
+        if source == 'NOT_IN_ZONE':
+            if state == REGISTERED:
+                self._alert({'domain': domain, 'change': NOT_IN_ZONE, 'checked_at': now})
+            return NOT_IN_ZONE, 0
+        if state in (NOT_IN_ZONE, UNRESOLVED):
+            self._alert({'domain': domain, 'change': REGISTERED, 'checked_at': now, 'previous': state})
+            self._last_change[domain] = now
+        return REGISTERED, 0
+
+    def _alert(self, alert: dict):
+        for callback in self.on_alert:
+            callback(alert)
+
+    def run_forever(self):
+        """Check due domains every tick until stop() is called"""
+        while not self._stop.is_set():
+            started = time.time()
+            self.run_once(started)
+            self._stop.wait(max(0.0, self.wheel.tick - (time.time() - started)))
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self) -> dict:
+        """Watched domains and how many checks fall in the next day / week"""
+        now = time.time()
+        counts = {}
+        for label, horizon in (('next_day', DAY), ('next_week', 7 * DAY)):
+            counts[label] = self._db.execute(
+                "SELECT COUNT(*) FROM watch WHERE next_check <= ?", (now + horizon,)).fetchone()[0]
+        counts['watched'] = len(self.wheel)
+        return counts
+
+    def close(self):
+        self.tracker.close()
+        self._db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Continuous domain expiry monitor")
+    parser.add_argument("--db", required=True, help="Monitor state (SQLite)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="Watch the domains in a file")
+    add.add_argument("input", help="Domain list (.csv, .xlsx, .xls or text; may be .gz/.zst compressed or .zip)")
+
+    remove = commands.add_parser("remove", help="Stop watching domains")
+    remove.add_argument("domains", nargs="+")
+
+    run = commands.add_parser("run", help="Check due domains until interrupted, printing alerts as JSON lines")
+    run.add_argument("--events", help="Also append change events to this JSON-lines file")
+    run.add_argument("--tick", type=float, default=TICK_SECONDS, help="Seconds between checks of the wheel")
+    run.add_argument("--max-checks-per-tick", type=int, default=MAX_CHECKS_PER_TICK)
+    run.add_argument("--threads", type=int, default=5, help="Concurrent lookups")
+    run.add_argument("--cache-url", default=os.environ.get("WHOIS_CACHE_URL"),
+                     help="redis://host:port of the shared result cache (keeps RDAP validators across restarts)")
+    run.add_argument("--zone-index", default=os.environ.get("WHOIS_ZONE_INDEX"),
+                     help="Zone index directory (see zone_index.py); needed for not-in-zone alerts")
+
+    commands.add_parser("status", help="Show the watch list size and upcoming checks")
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        from advanced_whois_fetcher import AdvancedWHOISFetcher
+        from result_cache import cache_from_url
+        from zone_index import ZoneIndex
+        monitor = Monitor(
+            args.db,
+            fetcher_factory=lambda tracker: AdvancedWHOISFetcher(
+                max_threads=args.threads, cache=cache_from_url(args.cache_url),
+                zone_index=ZoneIndex(args.zone_index) if args.zone_index else None, change_tracker=tracker),
+            events_path=args.events,
+            on_alert=[lambda alert: print(json.dumps(alert), flush=True)],
+            tick=args.tick,
+            max_checks_per_tick=args.max_checks_per_tick
+        )
+        try:
+            monitor.run_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            monitor.close()
+        return
+
+    monitor = Monitor(args.db)
+    try:
+        if args.command == "add":
+            from cli import read_domain_list
+            added = monitor.watch(read_domain_list(args.input))
+            print(f"Watching {added} new domains ({len(monitor)} total)")
+        elif args.command == "remove":
+            monitor.unwatch(args.domains)
+            print(f"Watching {len(monitor)} domains")
+        elif args.command == "status":
+            print(json.dumps(monitor.status(), indent=2))
+    finally:
+        monitor.close()
+
+
+if __name__ == "__main__":
+    main()
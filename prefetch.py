@@ -0,0 +1,156 @@
+"""
+Speculative background prefetch while the user is still configuring a run.
+
+As soon as an uploaded file is parsed, a Prefetcher normalizes and
+de-duplicates the domain list, resolves whatever the result cache already
+knows, and then trickles low-rate RDAP lookups for the rest. When the user
+starts processing, the warm results are handed to
+AdvancedWHOISFetcher.fetch_multiple_domains_advanced(prefetched=...) and only
+the remaining domains go through the full pipeline.
+
+The Prefetcher uses the session's own fetcher, so background lookups go
+through the same transport (HTTP/2, record/replay), archive, zone index,
+cache and per-registry breakers as the real run, and take their slots from
+the same FairShareScheduler.
+"""
+import threading
+import time
+from typing import Dict, List, Optional
+
+from advanced_whois_fetcher import (
+    AdvancedWHOISFetcher, BREAKER_FAILURE_THRESHOLD, BREAKER_RECOVERY_TIMEOUT, SCHEDULER_POLL,
+    _registry_resolver, normalize_domain, not_in_zone_result, registry_breaker_key
+)
+from resilience import get_circuit_breaker, is_upstream_failure
+
+PREFETCH_RATE = 2.0          # RDAP lookups per second while the user is configuring
+PREFETCH_MAX_DOMAINS = 1000  # only lists up to this size are prefetched over the network
+CACHE_BATCH_SIZE = 500
+
+
+class Prefetcher:
+    """
+    Background warm-up of one domain list
+
+    Args:
+        domains: Raw domains from the uploaded file
+        fetcher: The fetcher the real run will use (its cache, zone index,
+            transport, archive and scheduler are shared); a default
+            AdvancedWHOISFetcher if omitted
+        tenant: Fair-share scheduling tenant of the session
+        rate: RDAP lookups per second
+        max_network_domains: Skip network prefetch for lists longer than this
+    """
+
+    def __init__(self, domains: List[str], fetcher: Optional[AdvancedWHOISFetcher] = None,
+                 tenant: str = "default", rate: float = PREFETCH_RATE,
+                 max_network_domains: int = PREFETCH_MAX_DOMAINS):
+        self.raw_domains = domains
+        self.fetcher = fetcher or AdvancedWHOISFetcher()
+        self.cache = self.fetcher.cache
+        self.tenant = tenant
+        self.rate = rate
+        self.max_network_domains = max_network_domains
+        self.domains: List[str] = []
+        self._warm: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "Prefetcher":
+        self._thread = threading.Thread(target=self._run, name="whois-prefetch", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 2.0):
+        """Stop prefetching (an in-flight lookup is allowed to finish)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def warm_count(self) -> int:
+        with self._lock:
+            return len(self._warm)
+
+    def warm_results(self) -> Dict[str, dict]:
+        """Results resolved so far, keyed by normalized domain"""
+        with self._lock:
+            return dict(self._warm)
+
+    def _run(self):
+        # 1) normalize + dedup, keeping input order
+        self.domains = list(dict.fromkeys(normalize_domain(d) for d in self.raw_domains if d.strip()))
+
+        # 2) whatever the shared cache already knows
+        if self.cache is not None:
+            for i in range(0, len(self.domains), CACHE_BATCH_SIZE):
+                if self._stop.is_set():
+                    return
+                hits = self.cache.get_many(self.domains[i:i + CACHE_BATCH_SIZE])
+                with self._lock:
+                    self._warm.update(hits)
+
+        # 3) domains the zone files say are unregistered need no lookup
+        fetcher = self.fetcher
+        if fetcher.zone_index is not None:
+            with self._lock:
+                misses = [d for d in self.domains if d not in self._warm]
+            absent = fetcher.zone_index.absent(misses)
+            with self._lock:
+                self._warm.update((d, not_in_zone_result(d)) for d in absent)
+
+        # 4) low-rate RDAP for the rest of small and medium lists
+        if len(self.domains) > self.max_network_domains:
+            return
+        with self._lock:
+            pending = [d for d in self.domains if d not in self._warm]
+        if not pending:
+            return
+        job = fetcher.scheduler.job(self.tenant, len(pending)) if fetcher.scheduler is not None else None
+        try:
+            self._lookup(pending, job)
+        finally:
+            if job is not None:
+                job.close()
+
+    def _lookup(self, pending: List[str], job):
+        interval = 1.0 / self.rate
+        for domain in pending:
+            if self._stop.is_set():
+                return
+            with self._lock:
+                if domain in self._warm:
+                    continue
+            breaker = get_circuit_breaker(
+                registry_breaker_key("RDAP", _registry_resolver.host_for(domain)),
+                failure_threshold=BREAKER_FAILURE_THRESHOLD,
+                recovery_timeout=BREAKER_RECOVERY_TIMEOUT
+            )
+            if not breaker.allow_request():
+                # registry is down - leave the domain to the real run
+                continue
+            while job is not None and not job.acquire(SCHEDULER_POLL):
+                if self._stop.is_set():
+                    return
+
+            started = time.monotonic()
+            try:
+                res = self.fetcher.rdap_lookup(domain)
+            except Exception as e:
+                # leave it to the real run (which has retries and fallbacks)
+                if is_upstream_failure(e):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+            else:
+                breaker.record_success()
+                with self._lock:
+                    self._warm[domain] = res
+                if self.cache is not None:
+                    self.cache.set(domain, res)
+            finally:
+                if job is not None:
+                    job.release()
+
+            self._stop.wait(max(0.0, interval - (time.monotonic() - started)))
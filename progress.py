@@ -0,0 +1,146 @@
+"""
+Throttled, aggregated progress events for long lookup runs.
+
+Calling a UI callback for every completed domain makes rendering and
+websocket traffic the bottleneck at high throughput. ProgressStream instead
+counts completions as they happen (cheap) and hands subscribers a
+ProgressSnapshot at most every `interval` seconds, with throughput, per-source
+counts, error rate and an ETA smoothed with an exponentially weighted moving
+average of the completion rate.
+"""
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+PROGRESS_INTERVAL = 0.25   # seconds between snapshots
+RATE_SMOOTHING = 0.3       # EWMA weight of the newest rate sample
+FAILED_SOURCES = ('FAILED', 'EXCEPTION')
+
+
+class ProgressSnapshot:
+    """Progress of a run at one point in time"""
+
+    __slots__ = ("completed", "total", "elapsed", "throughput", "source_counts", "errors", "eta",
+                 "last_domain", "finished")
+
+    def __init__(self, completed: int, total: int, elapsed: float, throughput: float,
+                 source_counts: Dict[str, int], errors: int, eta: Optional[float],
+                 last_domain: Optional[str], finished: bool):
+        self.completed = completed
+        self.total = total
+        self.elapsed = elapsed
+        self.throughput = throughput        # domains per second (smoothed)
+        self.source_counts = source_counts
+        self.errors = errors
+        self.eta = eta                      # seconds remaining, None until a rate is known
+        self.last_domain = last_domain
+        self.finished = finished
+
+    @property
+    def fraction(self) -> float:
+        return self.completed / self.total if self.total else 1.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.completed if self.completed else 0.0
+
+    def to_dict(self) -> dict:
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data["error_rate"] = self.error_rate
+        return data
+
+
+class ProgressStream:
+    """
+    Aggregates completions and publishes snapshots at a fixed rate
+
+    Args:
+        total: Number of domains in the run
+        interval: Minimum seconds between snapshots
+        smoothing: EWMA weight of the newest completion-rate sample
+    """
+
+    def __init__(self, total: int, interval: float = PROGRESS_INTERVAL, smoothing: float = RATE_SMOOTHING):
+        self.total = total
+        self.interval = interval
+        self.smoothing = smoothing
+        self._subscribers: List[Callable[[ProgressSnapshot], None]] = []
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._completed = 0
+        self._errors = 0
+        self._source_counts: Dict[str, int] = {}
+        self._last_domain = None
+        self._last_emit = self._started
+        self._last_emit_completed = 0
+        self._rate: Optional[float] = None
+
+    def subscribe(self, callback: Callable[[ProgressSnapshot], None]) -> "ProgressStream":
+        """Call callback(snapshot) for every published snapshot"""
+        self._subscribers.append(callback)
+        return self
+
+    def record(self, result: dict):
+        """Count one completed domain; publishes a snapshot if the interval has passed"""
+        with self._lock:
+            self._completed += 1
+            source = result.get('Source')
+            self._source_counts[source] = self._source_counts.get(source, 0) + 1
+            if source in FAILED_SOURCES:
+                self._errors += 1
+            self._last_domain = result.get('Domain')
+        self.tick()
+
+    def tick(self):
+        """Publish a snapshot if the interval has passed (keeps the ETA moving during stalls)"""
+        if time.monotonic() - self._last_emit >= self.interval:
+            self.publish()
+
+    def publish(self, finished: bool = False):
+        """Publish a snapshot now"""
+        snapshot = self.snapshot(finished)
+        for callback in self._subscribers:
+            callback(snapshot)
+
+    def finish(self):
+        """Publish the final snapshot"""
+        self.publish(finished=True)
+
+    def snapshot(self, finished: bool = False) -> ProgressSnapshot:
+        with self._lock:
+            now = time.monotonic()
+            window = now - self._last_emit
+            # once a rate is known, quiet windows count too, so a stall lengthens the ETA
+            if window > 0 and (self._completed > self._last_emit_completed or self._rate is not None):
+                sample = (self._completed - self._last_emit_completed) / window
+                self._rate = sample if self._rate is None else (
+                    self.smoothing * sample + (1 - self.smoothing) * self._rate)
+            self._last_emit = now
+            self._last_emit_completed = self._completed
+
+            remaining = self.total - self._completed
+            if finished or remaining <= 0:
+                eta = 0.0
+            elif self._rate:
+                eta = remaining / self._rate
+            else:
+                eta = None
+            return ProgressSnapshot(
+                completed=self._completed,
+                total=self.total,
+                elapsed=now - self._started,
+                throughput=self._rate or 0.0,
+                source_counts=dict(self._source_counts),
+                errors=self._errors,
+                eta=eta,
+                last_domain=self._last_domain,
+                finished=finished
+            )
+
+
+def format_snapshot(snapshot: ProgressSnapshot) -> str:
+    """One-line text rendering of a snapshot (for terminals and logs)"""
+    eta = "--" if snapshot.eta is None else f"{snapshot.eta:.0f}s"
+    sources = " ".join(f"{source}={count}" for source, count in sorted(snapshot.source_counts.items()))
+    return (f"{snapshot.completed}/{snapshot.total} ({snapshot.fraction:.1%}) "
+            f"{snapshot.throughput:.1f}/s errors={snapshot.error_rate:.1%} eta={eta} {sources}")
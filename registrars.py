@@ -0,0 +1,128 @@
+"""
+Interned, compact registrar and source columns.
+
+A few thousand registrar names repeat across millions of result rows, often
+in several spellings ("GoDaddy.com, LLC", "GODADDY.COM, LLC", "GoDaddy.com LLC").
+RegistrarDictionary maps every spelling to one canonical name and a stable
+integer code, shared by every result set in the process, so the Registrar and
+Source columns can be stored as pandas categoricals (one small int per row plus
+the dictionary) instead of one Python string per row.
+"""
+from __future__ import annotations
+
+import re
+import sys
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Every Source value a result row can carry
+SOURCE_CATEGORIES = ['RDAP', 'WHOIS_API', 'WHOIS_PORT43', 'NOT_IN_ZONE', 'FAILED', 'EXCEPTION']
+
+_KEY_SEPARATORS = re.compile(r'[\s,.]+')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def registrar_key(name: str) -> str:
+    """
+    Comparison key for a registrar name: case, whitespace and the punctuation
+    around legal suffixes are ignored ("GoDaddy.com, LLC" == "GODADDY.COM LLC")
+    """
+    return _KEY_SEPARATORS.sub(' ', name.casefold()).strip()
+
+
+def _is_mixed_case(name: str) -> bool:
+    return name != name.upper() and name != name.lower()
+
+
+class RegistrarDictionary:
+    """
+    Process-wide registrar dictionary
+
+    The first spelling seen for a key becomes its canonical name, except that
+    an all-caps or all-lowercase spelling is replaced by the first mixed-case
+    one ("GODADDY.COM, LLC" -> "GoDaddy.com, LLC"). Codes are assigned in
+    first-seen order and never change, but the canonical spelling depends on
+    arrival order, so anything persisted across runs should compare
+    registrar_key() values rather than canonical names.
+    """
+
+    def __init__(self):
+        self._codes: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._names)
+
+    @property
+    def categories(self) -> List[str]:
+        """Canonical names, indexed by code"""
+        return list(self._names)
+
+    def code(self, name: Optional[str]) -> int:
+        """Code of name's canonical form (-1 for missing/blank)"""
+        if not isinstance(name, str):
+            return -1
+        name = _WHITESPACE.sub(' ', name).strip()
+        if not name:
+            return -1
+        key = registrar_key(name)
+        code = self._codes.get(key)
+        if code is None or (name != self._names[code] and _is_mixed_case(name)
+                            and not _is_mixed_case(self._names[code])):
+            with self._lock:
+                code = self._codes.get(key)
+                if code is None:
+                    code = len(self._names)
+                    self._names.append(sys.intern(name))
+                    self._codes[key] = code
+                elif not _is_mixed_case(self._names[code]):
+                    self._names[code] = sys.intern(name)
+        return code
+
+    def intern(self, name: Optional[str]) -> Optional[str]:
+        """Canonical (interned) spelling of name, None for missing/blank"""
+        code = self.code(name)
+        return None if code < 0 else self._names[code]
+
+    def categorical(self, values: "pd.Series") -> "pd.Categorical":
+        """
+        Registrar values as a Categorical over this dictionary
+
+        Each distinct raw value is looked up once; rows are mapped with one
+        vectorized take.
+        """
+        import numpy as np
+        import pandas as pd
+
+        row_codes, uniques = pd.factorize(values)
+        # trailing -1 so missing rows (factorize code -1) map to missing
+        mapping = np.fromiter((self.code(v) for v in uniques), dtype=np.int32, count=len(uniques))
+        codes = np.append(mapping, -1)[row_codes]
+        return pd.Categorical.from_codes(codes, categories=self.categories)
+
+
+registrar_dictionary = RegistrarDictionary()
+
+
+def compact_columns(df: "pd.DataFrame") -> "pd.DataFrame":
+    """
+    Store Registrar and Source as categoricals with shared dictionaries
+
+    Args:
+        df: Result DataFrame (modified in place)
+
+    Returns:
+        The same DataFrame
+    """
+    import pandas as pd
+
+    if 'Registrar' in df.columns:
+        df['Registrar'] = registrar_dictionary.categorical(df['Registrar'])
+    if 'Source' in df.columns:
+        extra = sorted(set(df['Source'].dropna().unique()) - set(SOURCE_CATEGORIES))
+        df['Source'] = pd.Categorical(df['Source'], categories=SOURCE_CATEGORIES + extra)
+    return df
@@ -0,0 +1,219 @@
+"""
+Record and replay upstream traffic for offline benchmarks.
+
+RecordingTransport sits in front of the normal HTTP session (or another
+transport) and the port-43 client, and appends every exchange (sanitized
+request URL, status, validator headers, body, redirect hops and timing, or
+the error raised) to a JSON-lines corpus. ReplayTransport serves a corpus
+back with the recorded latencies and no network access, so parsing and
+scheduling changes can be benchmarked against production-shaped traffic:
+
+    python cli.py domains.csv -o out.csv --record corpus.jsonl
+    python cli.py domains.csv -o out.csv --replay corpus.jsonl
+"""
+import json
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import timedelta
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters never written to a corpus
+SECRET_PARAMS = {"apikey", "api_key", "key", "token", "access_token", "password"}
+# Response headers kept (the fetcher only looks at these)
+RECORDED_HEADERS = ("content-type", "etag", "last-modified")
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE_RE = re.compile(r"(?<![\w.])\+\d{1,3}[.\s]?\d[\d.\s-]{5,}\d")
+
+
+def sanitize_url(url: str, params: Optional[dict] = None) -> str:
+    """URL with params merged in, secret parameters dropped and the rest sorted"""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query) + list((params or {}).items())
+    query = sorted((k, str(v)) for k, v in query if k.lower() not in SECRET_PARAMS)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+
+def sanitize_text(text: str) -> str:
+    """Mask e-mail addresses and phone numbers (contact data in RDAP/WHOIS payloads)"""
+    text = EMAIL_RE.sub("redacted@example.invalid", text)
+    return PHONE_RE.sub("+0.0000000000", text)
+
+
+def _read_timeout_errors(inner):
+    if inner is not None:
+        return inner.read_timeout_errors
+    import requests
+    return (requests.exceptions.ReadTimeout,)
+
+
+class RecordingTransport:
+    """
+    Transport that records every exchange to a corpus file
+
+    Args:
+        path: Corpus file (JSON lines, appended to)
+        inner: Transport to record (default: the fetcher's shared requests session)
+    """
+
+    def __init__(self, path: str, inner=None):
+        self.path = path
+        self.inner = inner
+        self.read_timeout_errors = _read_timeout_errors(inner)
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _write(self, entry: dict):
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def get(self, url: str, params=None, headers=None, timeout=None):
+        if self.inner is not None:
+            get = self.inner.get
+        else:
+            from advanced_whois_fetcher import get_http_session
+            get = get_http_session().get
+
+        entry = {"kind": "http", "url": sanitize_url(url, params), "recorded_at": time.time()}
+        start = time.perf_counter()
+        try:
+            resp = get(url, params=params, headers=headers, timeout=timeout)
+        except Exception as e:
+            entry.update(elapsed=time.perf_counter() - start, error=type(e).__name__)
+            self._write(entry)
+            raise
+        entry.update(
+            elapsed=time.perf_counter() - start,
+            status=resp.status_code,
+            headers={h: resp.headers[h] for h in RECORDED_HEADERS if h in resp.headers},
+            body=sanitize_text(resp.text),
+            hops=[{"url": sanitize_url(str(hop.url)), "status": hop.status_code,
+                   "elapsed": hop.elapsed.total_seconds()} for hop in resp.history],
+            final_url=sanitize_url(str(resp.url))
+        )
+        self._write(entry)
+        return resp
+
+    def whois_text(self, domain: str) -> str:
+        """Raw port-43 WHOIS answer for domain"""
+        import whois
+
+        entry = {"kind": "whois", "domain": domain, "recorded_at": time.time()}
+        start = time.perf_counter()
+        try:
+            text = whois.NICClient().whois_lookup(None, domain.encode("idna").decode("utf-8"), 0, quiet=True)
+        except Exception as e:
+            entry.update(elapsed=time.perf_counter() - start, error=type(e).__name__)
+            self._write(entry)
+            raise
+        entry.update(elapsed=time.perf_counter() - start, body=sanitize_text(text or ""))
+        self._write(entry)
+        return text
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class ReplayResponse:
+    """The parts of a requests.Response the fetcher uses, rebuilt from a corpus entry"""
+
+    def __init__(self, url: str, status: int, body: str = "", headers: Optional[dict] = None,
+                 elapsed: float = 0.0, history=()):
+        from requests.structures import CaseInsensitiveDict
+
+        self.url = url
+        self.status_code = status
+        self.text = body
+        self.content = body.encode("utf-8")
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.elapsed = timedelta(seconds=elapsed)
+        self.history = list(history)
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+
+class ReplayTransport:
+    """
+    Serves a recorded corpus back offline with the recorded latencies
+
+    Requests are matched on the sanitized URL (WHOIS queries on the domain);
+    repeated requests cycle through the recorded answers. Unknown requests get
+    a 404 (counted in self.misses) so they end like an unknown domain.
+
+    Args:
+        path: Corpus file written by RecordingTransport
+        speed: Latency divisor (2.0 replays twice as fast, 0 = no delays)
+    """
+
+    def __init__(self, path: str, speed: float = 1.0):
+        import requests
+
+        self.speed = speed
+        self.read_timeout_errors = (requests.exceptions.ReadTimeout,)
+        self._errors = {
+            "ReadTimeout": requests.exceptions.ReadTimeout,
+            "ConnectTimeout": requests.exceptions.ConnectTimeout,
+            "ConnectionError": requests.exceptions.ConnectionError,
+        }
+        self._entries: Dict[tuple, deque] = defaultdict(deque)
+        self._lock = threading.Lock()
+        self.misses = 0
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    key = ("whois", entry["domain"]) if entry["kind"] == "whois" else ("http", entry["url"])
+                    self._entries[key].append(entry)
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._entries.values())
+
+    def _next(self, key: tuple) -> Optional[dict]:
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                self.misses += 1
+                return None
+            entry = entries[0]
+            entries.rotate(-1)
+            return entry
+
+    def _wait(self, entry: dict):
+        if self.speed:
+            time.sleep(entry["elapsed"] / self.speed)
+
+    def _raise(self, entry: dict):
+        raise self._errors.get(entry["error"], OSError)(f"Replayed {entry['error']}")
+
+    def get(self, url: str, params=None, headers=None, timeout=None):
+        key = ("http", sanitize_url(url, params))
+        entry = self._next(key)
+        if entry is None:
+            return ReplayResponse(key[1], 404, '{"errorCode": 404, "title": "Not in replay corpus"}')
+        self._wait(entry)
+        if "error" in entry:
+            self._raise(entry)
+        hops = [ReplayResponse(hop["url"], hop["status"], elapsed=hop["elapsed"]) for hop in entry["hops"]]
+        return ReplayResponse(entry["final_url"], entry["status"], entry["body"], entry["headers"],
+                              elapsed=max(0.0, entry["elapsed"] - sum(hop["elapsed"] for hop in entry["hops"])),
+                              history=hops)
+
+    def whois_text(self, domain: str) -> str:
+        entry = self._next(("whois", domain))
+        if entry is None:
+            raise self._errors["ConnectionError"](f"{domain} not in replay corpus")
+        self._wait(entry)
+        if "error" in entry:
+            self._raise(entry)
+        return entry["body"]
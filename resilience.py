@@ -0,0 +1,149 @@
+import threading
+import time
+from typing import Dict
+
+# Circuit breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one upstream source/host
+
+    Opens after `failure_threshold` consecutive upstream failures so callers skip
+    straight to the next source. After `recovery_timeout` seconds it goes
+    half-open and lets a limited number of probe requests through; a successful
+    probe closes it again, a failed one re-opens it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0,
+                 half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.half_open_calls = 0
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """Return True if a request to this upstream may be attempted now"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.recovery_timeout:
+                    return False
+                self.state = HALF_OPEN
+                self.half_open_calls = 0
+            if self.half_open_calls < self.half_open_max_calls:
+                self.half_open_calls += 1
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            if self.state != CLOSED:
+                self.state = CLOSED
+                self.half_open_calls = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self.half_open_calls = 0
+
+
+class RetryBudget:
+    """
+    Process-wide cap on retries relative to first attempts
+
+    Retries are allowed while they stay below `ratio` of the requests seen in
+    the last `window` seconds (with a floor of `min_per_second` so a quiet
+    process can still retry), so retry storms cannot multiply upstream load
+    during an outage.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 1.0, window: int = 10):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.window = window
+        self._requests = [0] * window
+        self._retries = [0] * window
+        self._stamps = [0] * window
+        self._lock = threading.Lock()
+
+    def _bucket(self) -> int:
+        now = int(time.monotonic())
+        i = now % self.window
+        if self._stamps[i] != now:
+            self._stamps[i] = now
+            self._requests[i] = 0
+            self._retries[i] = 0
+        return i
+
+    def _live(self, counts) -> int:
+        oldest = int(time.monotonic()) - self.window
+        return sum(c for c, stamp in zip(counts, self._stamps) if stamp > oldest)
+
+    def record_request(self):
+        with self._lock:
+            self._requests[self._bucket()] += 1
+
+    def try_acquire_retry(self) -> bool:
+        """Consume one retry from the budget; False if the budget is exhausted"""
+        with self._lock:
+            i = self._bucket()
+            allowed = max(self.min_per_second * self.window, self.ratio * self._live(self._requests))
+            if self._live(self._retries) >= allowed:
+                return False
+            self._retries[i] += 1
+            return True
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+_retry_budget = RetryBudget()
+
+
+def get_circuit_breaker(name: str, **kwargs) -> CircuitBreaker:
+    """Shared breaker for a source/host, created on first use"""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name, **kwargs)
+        return _breakers[name]
+
+
+def get_retry_budget() -> RetryBudget:
+    return _retry_budget
+
+
+# python-whois errors (matched by class name, so whois need not be imported)
+# that mean the WHOIS server or client is unhealthy rather than answering
+WHOIS_UPSTREAM_ERRORS = {"WhoisQuotaExceededError", "WhoisCommandFailedError"}
+
+
+def is_upstream_failure(exc: Exception) -> bool:
+    """
+    True if exc says the upstream is unhealthy (network error, 5xx, 429,
+    WHOIS quota exceeded)
+
+    Other HTTP errors (404 for an unknown domain, 400, ...) and python-whois
+    "no match" / parse errors are definitive answers: they should not trip a
+    breaker and retrying them is pointless.
+    """
+    names = {cls.__name__ for cls in type(exc).__mro__}
+    if "PywhoisError" in names:
+        return bool(names & WHOIS_UPSTREAM_ERRORS)
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None)
+    if status is None:
+        return True
+    return status >= 500 or status == 429
@@ -0,0 +1,157 @@
+import argparse
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, Optional, Tuple
+
+DATA_FILE = "responses.dat"
+INDEX_FILE = "responses.idx"
+COMPRESSION_LEVEL = 6
+
+_FRAME_HEADER = struct.Struct(">I")
+
+
+class ResponseArchive:
+    """
+    Append-only, compressed store of raw upstream responses
+
+    Every successful lookup's raw payload (RDAP / WHOIS API JSON or port-43
+    WHOIS text) is zlib-compressed and appended to a data file; a JSON-lines
+    index records where each (domain, source) response lives. Nothing is ever
+    rewritten, so the archive can be copied or tailed while a run is going.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (or create) an archive directory
+
+        Args:
+            path: Directory holding the data and index files
+        """
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._data_path = os.path.join(path, DATA_FILE)
+        self._index_path = os.path.join(path, INDEX_FILE)
+        self._lock = threading.Lock()
+        # (domain, source) -> (offset, length, fetched_at), latest response wins
+        self._index: Dict[Tuple[str, str], Tuple[int, int, float]] = {}
+        self._load_index()
+
+    def _load_index(self):
+        if not os.path.exists(self._index_path):
+            return
+        with open(self._index_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # torn final line from an interrupted run
+                    continue
+                self._index[(entry["domain"], entry["source"])] = (
+                    entry["offset"], entry["length"], entry["fetched_at"]
+                )
+
+    def __len__(self):
+        return len(self._index)
+
+    def append(self, domain: str, source: str, payload):
+        """
+        Archive one raw response
+
+        Args:
+            domain: Normalized domain name
+            source: Source name (RDAP, WHOIS_API, WHOIS_PORT43)
+            payload: Decoded JSON (dict/list) or raw WHOIS text
+        """
+        fetched_at = time.time()
+        record = json.dumps({"domain": domain, "source": source, "fetched_at": fetched_at,
+                             "payload": payload}, separators=(",", ":"))
+        blob = zlib.compress(record.encode("utf-8"), COMPRESSION_LEVEL)
+
+        with self._lock:
+            with open(self._data_path, "ab") as data:
+                offset = data.tell()
+                data.write(_FRAME_HEADER.pack(len(blob)))
+                data.write(blob)
+            with open(self._index_path, "a", encoding="utf-8") as index:
+                index.write(json.dumps({"domain": domain, "source": source, "offset": offset,
+                                        "length": len(blob), "fetched_at": fetched_at}) + "\n")
+            self._index[(domain, source)] = (offset, len(blob), fetched_at)
+
+    def _read(self, data, offset: int, length: int) -> dict:
+        data.seek(offset + _FRAME_HEADER.size)
+        return json.loads(zlib.decompress(data.read(length)))
+
+    def get(self, domain: str, source: str) -> Optional[dict]:
+        """Latest archived record for (domain, source), or None"""
+        location = self._index.get((domain, source))
+        if location is None:
+            return None
+        with open(self._data_path, "rb") as data:
+            return self._read(data, location[0], location[1])
+
+    def iter_latest(self) -> Iterator[dict]:
+        """
+        Yield the most recently fetched record for every archived domain
+
+        Records are read in file order so the data file is scanned sequentially.
+        """
+        latest: Dict[str, Tuple[int, int, float]] = {}
+        for (domain, _source), location in self._index.items():
+            if domain not in latest or location[2] > latest[domain][2]:
+                latest[domain] = location
+
+        with open(self._data_path, "rb") as data:
+            for offset, length, _fetched_at in sorted(latest.values()):
+                yield self._read(data, offset, length)
+
+
+def reparse_archive(path: str):
+    """
+    Rebuild a results DataFrame from archived responses with no network access
+
+    Args:
+        path: Archive directory
+
+    Returns:
+        DataFrame in the same schema as AdvancedWHOISFetcher results
+    """
+    import pandas as pd
+    from advanced_whois_fetcher import AdvancedWHOISFetcher, failed_result
+    from date_utils import normalize_date_columns
+    from registrars import compact_columns
+
+    fetcher = AdvancedWHOISFetcher()
+    results = []
+    for record in ResponseArchive(path).iter_latest():
+        try:
+            results.append(fetcher.parse_response(record["domain"], record["source"], record["payload"]))
+        except Exception as e:
+            results.append(failed_result(record["domain"], "REPARSE_FAILED", str(e)))
+    return compact_columns(normalize_date_columns(pd.DataFrame(results)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Raw WHOIS/RDAP response archive tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    reparse = commands.add_parser("reparse", help="Rebuild results from the archive without network access")
+    reparse.add_argument("archive", help="Archive directory")
+    reparse.add_argument("-o", "--output", required=True, help="Output file (.csv or .json)")
+
+    args = parser.parse_args()
+
+    if args.command == "reparse":
+        df = reparse_archive(args.archive)
+        if args.output.endswith(".json"):
+            df.to_json(args.output, orient="records", indent=2, date_format="iso")
+        else:
+            df.to_csv(args.output, index=False)
+        print(f"Reparsed {len(df)} domains into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
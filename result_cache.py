@@ -0,0 +1,347 @@
+"""
+Result cache shared between app replicas and batch workers.
+
+TieredCache puts an in-process LRU (LocalLRUCache) in front of a networked
+backend. RedisCache speaks the Redis protocol (RESP) directly over a socket,
+so it works against Redis, KeyDB, Valkey or the bundled LocalRespServer
+stand-in without extra dependencies. All backends support batched
+get_many/set_many so a whole domain list costs one round trip.
+"""
+import json
+import socket
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_TTL = 7 * 24 * 3600      # seconds a resolved domain stays cached
+LOCAL_MAX_ENTRIES = 100000
+KEY_PREFIX = "whois:"
+BATCH_SIZE = 1000                # keys per MGET / pipelined SET batch
+
+
+class LocalLRUCache:
+    """Thread-safe in-process LRU cache with per-entry TTL"""
+
+    def __init__(self, max_entries: int = LOCAL_MAX_ENTRIES, ttl: float = DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, dict]:
+        now = time.time()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._data.get(key)
+                if entry is None:
+                    continue
+                expires_at, value = entry
+                if expires_at < now:
+                    del self._data[key]
+                    continue
+                self._data.move_to_end(key)
+                found[key] = value
+        return found
+
+    def set_many(self, items: Dict[str, dict], ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        self.set_expiring({key: (value, ttl) for key, value in items.items()})
+
+    def set_expiring(self, items: Dict[str, Tuple[dict, float]]):
+        """Store entries that each carry their own TTL: {key: (value, ttl_seconds)}"""
+        now = time.time()
+        with self._lock:
+            for key, (value, ttl) in items.items():
+                self._data[key] = (now + ttl, value)
+                self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def get(self, key: str) -> Optional[dict]:
+        return self.get_many([key]).get(key)
+
+    def set(self, key: str, value: dict, ttl: Optional[float] = None):
+        self.set_many({key: value}, ttl)
+
+
+class RedisCache:
+    """
+    Minimal Redis-protocol client for the shared cache tier
+
+    One connection per thread; values are stored as JSON with SET ... EX.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 6379, ttl: float = DEFAULT_TTL,
+                 prefix: str = KEY_PREFIX, timeout: float = 2.0):
+        self.host = host
+        self.port = port
+        self.ttl = ttl
+        self.prefix = prefix
+        self.timeout = timeout
+        self._local = threading.local()
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisCache":
+        """Build from a redis://host:port URL"""
+        address = url.split("://", 1)[-1].split("/")[0]
+        host, _, port = address.partition(":")
+        return cls(host=host or "127.0.0.1", port=int(port or 6379), **kwargs)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            conn = (sock, sock.makefile("rb"))
+            self._local.conn = conn
+        return conn
+
+    def _reset(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            try:
+                conn[0].close()
+            except OSError:
+                pass
+        self._local.conn = None
+
+    @staticmethod
+    def _encode(*args) -> bytes:
+        out = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(out)
+
+    @classmethod
+    def _read_reply(cls, reader):
+        line = reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by cache server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RuntimeError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(rest)
+            if count < 0:
+                return None
+            return [cls._read_reply(reader) for _ in range(count)]
+        raise ConnectionError(f"Unexpected reply: {line!r}")
+
+    def _pipeline(self, commands: List[tuple]) -> list:
+        """Send commands in one write and read all replies (reconnects once on failure)"""
+        payload = b"".join(self._encode(*cmd) for cmd in commands)
+        for attempt in range(2):
+            try:
+                sock, reader = self._connection()
+                sock.sendall(payload)
+                return [self._read_reply(reader) for _ in commands]
+            except (OSError, ConnectionError):
+                self._reset()
+                if attempt:
+                    raise
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, dict]:
+        keys = list(keys)
+        found = {}
+        for i in range(0, len(keys), BATCH_SIZE):
+            batch = keys[i:i + BATCH_SIZE]
+            values = self._pipeline([("MGET", *[self.prefix + k for k in batch])])[0]
+            for key, value in zip(batch, values):
+                if value is not None:
+                    found[key] = json.loads(value)
+        return found
+
+    def get_many_with_ttl(self, keys: Iterable[str]) -> Dict[str, Tuple[dict, Optional[float]]]:
+        """
+        Values together with their remaining TTL
+
+        The MGET and one PTTL per key go out in the same pipeline, so this is
+        still one round trip per batch.
+
+        Returns:
+            {key: (value, seconds_left)}; seconds_left is None for keys
+            stored without an expiry
+        """
+        keys = list(keys)
+        found = {}
+        for i in range(0, len(keys), BATCH_SIZE):
+            batch = [self.prefix + k for k in keys[i:i + BATCH_SIZE]]
+            replies = self._pipeline([("MGET", *batch)] + [("PTTL", k) for k in batch])
+            for key, value, pttl in zip(keys[i:i + BATCH_SIZE], replies[0], replies[1:]):
+                # -2: expired between MGET and PTTL; -1: no expiry
+                if value is None or pttl == -2:
+                    continue
+                found[key] = (json.loads(value), None if pttl < 0 else pttl / 1000.0)
+        return found
+
+    def set_many(self, items: Dict[str, dict], ttl: Optional[float] = None):
+        ttl = int(self.ttl if ttl is None else ttl)
+        items = list(items.items())
+        for i in range(0, len(items), BATCH_SIZE):
+            self._pipeline([("SET", self.prefix + key, json.dumps(value, default=str), "EX", ttl)
+                            for key, value in items[i:i + BATCH_SIZE]])
+
+    def get(self, key: str) -> Optional[dict]:
+        return self.get_many([key]).get(key)
+
+    def set(self, key: str, value: dict, ttl: Optional[float] = None):
+        self.set_many({key: value}, ttl)
+
+
+def cache_from_url(url: Optional[str]) -> "TieredCache":
+    """
+    TieredCache with a shared Redis-protocol backend at url
+    (local LRU only when url is empty)
+    """
+    return TieredCache(RedisCache.from_url(url) if url else None)
+
+
+class TieredCache:
+    """
+    In-process LRU in front of a shared backend
+
+    Reads check the local layer first and fetch only the misses from the
+    shared backend (one batched round trip), back-filling the local layer
+    with each entry's remaining shared TTL (capped at the local TTL) so a
+    replica never serves an entry the shared tier has already expired.
+    Writes go to both. A shared backend outage degrades to local-only.
+    """
+
+    def __init__(self, shared=None, local: Optional[LocalLRUCache] = None):
+        self.local = local or LocalLRUCache()
+        self.shared = shared
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, dict]:
+        keys = list(keys)
+        found = self.local.get_many(keys)
+        missing = [k for k in keys if k not in found]
+        if missing and self.shared is not None:
+            try:
+                remote = self.shared.get_many_with_ttl(missing)
+            except (OSError, ConnectionError, RuntimeError):
+                remote = {}
+            if remote:
+                self.local.set_expiring({
+                    key: (value, self.local.ttl if ttl is None else min(ttl, self.local.ttl))
+                    for key, (value, ttl) in remote.items()
+                })
+                found.update((key, value) for key, (value, _ttl) in remote.items())
+        return found
+
+    def set_many(self, items: Dict[str, dict], ttl: Optional[float] = None):
+        if not items:
+            return
+        self.local.set_many(items, ttl)
+        if self.shared is not None:
+            try:
+                self.shared.set_many(items, ttl)
+            except (OSError, ConnectionError, RuntimeError):
+                pass
+
+    def get(self, key: str) -> Optional[dict]:
+        return self.get_many([key]).get(key)
+
+    def set(self, key: str, value: dict, ttl: Optional[float] = None):
+        self.set_many({key: value}, ttl)
+
+
+class LocalRespServer:
+    """
+    Tiny in-memory Redis stand-in (PING, GET, SET [EX], MGET, PTTL, DEL, FLUSHALL)
+
+    Lets tests and local development exercise RedisCache and TieredCache
+    without a real Redis server. Not for production use.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        store: Dict[bytes, tuple] = {}
+        lock = threading.Lock()
+
+        def live(key):
+            entry = store.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.time():
+                del store[key]
+                return None
+            return value
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                while True:
+                    try:
+                        command = RedisCache._read_reply(self.rfile)
+                    except (ConnectionError, OSError, ValueError):
+                        return
+                    name = command[0].upper()
+                    args = command[1:]
+                    with lock:
+                        if name == b"PING":
+                            reply = b"+PONG\r\n"
+                        elif name == b"GET":
+                            reply = self.bulk(live(args[0]))
+                        elif name == b"MGET":
+                            reply = b"*%d\r\n" % len(args) + b"".join(self.bulk(live(k)) for k in args)
+                        elif name == b"SET":
+                            expires_at = None
+                            if len(args) >= 4 and args[2].upper() == b"EX":
+                                expires_at = time.time() + int(args[3])
+                            store[args[0]] = (args[1], expires_at)
+                            reply = b"+OK\r\n"
+                        elif name == b"PTTL":
+                            if live(args[0]) is None:
+                                reply = b":-2\r\n"
+                            elif store[args[0]][1] is None:
+                                reply = b":-1\r\n"
+                            else:
+                                remaining = max(0, int((store[args[0]][1] - time.time()) * 1000))
+                                reply = b":%d\r\n" % remaining
+                        elif name == b"DEL":
+                            reply = b":%d\r\n" % sum(store.pop(k, None) is not None for k in args)
+                        elif name == b"FLUSHALL":
+                            store.clear()
+                            reply = b"+OK\r\n"
+                        else:
+                            reply = b"-ERR unknown command\r\n"
+                    self.wfile.write(reply)
+
+            @staticmethod
+            def bulk(value):
+                if value is None:
+                    return b"$-1\r\n"
+                return b"$%d\r\n%s\r\n" % (len(value), value)
+
+        class Server(socketserver.ThreadingTCPServer):
+            daemon_threads = True
+            allow_reuse_address = True
+
+        self._server = Server((host, port), Handler)
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"redis://{self.host}:{self.port}"
+
+    def start(self) -> "LocalRespServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
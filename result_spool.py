@@ -0,0 +1,192 @@
+"""
+Disk-backed result store so sessions do not hold DataFrames in memory.
+
+ResultSpool writes each run's results to an uncompressed Arrow IPC (Feather
+v2) file and hands back an ID; session state keeps only that ID. Results are
+memory-mapped back on demand with their string columns left Arrow-backed
+(pd.ArrowDtype), so the bulk of a result set stays in the page cache rather
+than on the Python heap. Recently used result sets stay loaded up to a total
+byte budget, process-wide, measured as what each loaded value actually
+retains (for a ResultSet: the DataFrame plus its display copy, search index
+and cached exports). Files are evicted by age and by total spool size,
+least recently used first; every use counts, including in-memory hits.
+"""
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+SPOOL_DIR = os.path.join(tempfile.gettempdir(), "whois_result_spool")
+SPOOL_MAX_BYTES = 2 * 1024 ** 3    # total size of spooled results on disk
+SPOOL_MAX_AGE = 24 * 3600          # seconds since last use before a result is deleted
+SPOOL_MAX_LOADED_BYTES = 1024 ** 3  # memory retained by the result sets kept loaded across all sessions
+SUFFIX = ".arrow"
+
+
+class ResultSpool:
+    """
+    Results spooled to disk and referenced by ID
+
+    Args:
+        directory: Spool directory (created if missing)
+        max_bytes: Evict least recently used files beyond this total size
+        max_age: Evict files unused for this many seconds
+        max_loaded_bytes: Keep recently used result sets loaded up to this
+            total retained size (see _retained_bytes); the most recent one
+            always stays loaded
+    """
+
+    def __init__(self, directory: str = SPOOL_DIR, max_bytes: int = SPOOL_MAX_BYTES,
+                 max_age: float = SPOOL_MAX_AGE, max_loaded_bytes: int = SPOOL_MAX_LOADED_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.max_loaded_bytes = max_loaded_bytes
+        self._loaded: OrderedDict = OrderedDict()   # result id -> (value, size)
+        self._loaded_bytes = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, result_id: str) -> str:
+        if not result_id.isalnum():
+            raise ValueError(f"Invalid result id: {result_id!r}")
+        return os.path.join(self.directory, result_id + SUFFIX)
+
+    def put(self, df: "pd.DataFrame") -> str:
+        """Spool df to disk and return its ID"""
+        import pyarrow as pa
+        import pyarrow.feather as feather
+
+        result_id = uuid.uuid4().hex
+        path = self._path(result_id)
+        tmp = path + ".tmp"
+        feather.write_feather(pa.Table.from_pandas(df, preserve_index=False), tmp, compression="uncompressed")
+        os.replace(tmp, path)
+        self.evict(keep=result_id)
+        return result_id
+
+    def _touch(self, result_id: str) -> bool:
+        """Mark a spooled result as recently used for eviction; False if it is gone"""
+        try:
+            os.utime(self._path(result_id))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _read(self, result_id: str):
+        import pyarrow as pa
+
+        try:
+            with pa.memory_map(self._path(result_id)) as source:
+                table = pa.ipc.open_file(source).read_all()
+        except FileNotFoundError:
+            return None
+        self._touch(result_id)
+        return table
+
+    @staticmethod
+    def _to_pandas(table) -> "pd.DataFrame":
+        import pandas as pd
+        import pyarrow as pa
+
+        # strings stay zero-copy views of the mapped file; categoricals and dates convert as usual
+        def types_mapper(arrow_type):
+            if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+                return pd.ArrowDtype(arrow_type)
+            return None
+
+        return table.to_pandas(types_mapper=types_mapper)
+
+    @staticmethod
+    def _retained_bytes(value, table) -> int:
+        """
+        Memory a loaded value holds: its own nbytes (e.g. ResultSet, which
+        includes derived caches), a DataFrame's deep size, else the Arrow size
+        """
+        nbytes = getattr(value, "nbytes", None)
+        if nbytes is not None:
+            return int(nbytes)
+        if hasattr(value, "memory_usage"):
+            return int(value.memory_usage(deep=True).sum())
+        return table.nbytes
+
+    def _remember(self, result_id: str, value, size: int):
+        """(Re)account a loaded value and unload least recently used ones beyond the budget"""
+        with self._lock:
+            old = self._loaded.pop(result_id, None)
+            if old is not None:
+                self._loaded_bytes -= old[1]
+            self._loaded[result_id] = (value, size)
+            self._loaded_bytes += size
+            while self._loaded_bytes > self.max_loaded_bytes and len(self._loaded) > 1:
+                _, (_, evicted) = self._loaded.popitem(last=False)
+                self._loaded_bytes -= evicted
+
+    def load(self, result_id: str) -> Optional["pd.DataFrame"]:
+        """Memory-map a spooled result back into a DataFrame (None if evicted)"""
+        table = self._read(result_id)
+        return None if table is None else self._to_pandas(table)
+
+    def get(self, result_id: str, build: Callable[["pd.DataFrame"], Any] = lambda df: df) -> Any:
+        """
+        build(DataFrame) for a spooled result, served from the in-memory LRU
+        when recently used (None if the result has been evicted)
+        """
+        with self._lock:
+            entry = self._loaded.get(result_id)
+        if entry is not None:
+            self._touch(result_id)  # keep the file of a result still being viewed
+            value = entry[0]
+            # derived caches (search index, exports) grow after the first load
+            size = getattr(value, "nbytes", None)
+            self._remember(result_id, value, entry[1] if size is None else int(size))
+            return value
+
+        table = self._read(result_id)
+        if table is None:
+            return None
+        value = build(self._to_pandas(table))
+        self._remember(result_id, value, self._retained_bytes(value, table))
+        return value
+
+    def discard(self, result_id: str):
+        """Delete a spooled result (e.g. when its session starts over)"""
+        with self._lock:
+            entry = self._loaded.pop(result_id, None)
+            if entry is not None:
+                self._loaded_bytes -= entry[1]
+        try:
+            os.unlink(self._path(result_id))
+        except OSError:
+            pass
+
+    def evict(self, keep: Optional[str] = None):
+        """Delete results unused for max_age, then least recently used ones beyond max_bytes"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(SUFFIX):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name[:-len(SUFFIX)]))
+        entries.sort()
+
+        now = time.time()
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, result_id in entries:
+            if result_id == keep:
+                continue
+            if now - mtime <= self.max_age and total <= self.max_bytes:
+                break
+            self.discard(result_id)
+            total -= size
@@ -0,0 +1,336 @@
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Source values the results page reports on, in display order
+SUMMARY_SOURCES = ['RDAP', 'WHOIS_API', 'WHOIS_PORT43', 'NOT_IN_ZONE', 'FAILED']
+DISPLAY_COLUMNS = ['Domain', 'Registrar', 'Creation Date', 'Expiration Date', 'Updated Date', 'Source', 'Status']
+MAX_CACHED_EXPORTS = 8
+INDEX_CHUNK_ROWS = 20000           # domains laid out as code point arrays at a time while indexing
+DEFAULT_PAGE_SIZE = 100
+
+
+class DomainSearchIndex:
+    """
+    Trigram index over the Domain column for fast substring search
+
+    Each trigram maps to the sorted row positions containing it, so a query is
+    answered by intersecting a handful of posting lists and verifying only the
+    surviving candidates instead of scanning every row.
+
+    The index is built with array operations rather than a loop over rows:
+    domains are laid out as fixed-width code point arrays, characters are
+    renumbered densely, and each (trigram, row) pair is packed into one
+    integer, so a single sort yields CSR-style posting lists.
+    """
+
+    def __init__(self, domains: pd.Series):
+        self.domains = domains.fillna('').astype(str).str.lower().to_numpy(dtype=object)
+        chunks = []
+        present = np.zeros(0x110000, dtype=bool)
+        for start in range(0, len(self.domains), INDEX_CHUNK_ROWS):
+            chunk = self.domains[start:start + INDEX_CHUNK_ROWS].astype(str)
+            width = chunk.dtype.itemsize // 4
+            if width >= 3:
+                chars = chunk.view(np.uint32).reshape(len(chunk), width)
+                present[chars.ravel()] = True
+                chunks.append((start, chars))
+        present[0] = False  # NUL padding
+
+        # dense character ids (1..k) so a trigram and a row fit in one uint64
+        self._chars = np.flatnonzero(present).astype(np.uint32)
+        self._char_bits = max(1, int(len(self._chars)).bit_length())
+        row_bits = max(1, len(self.domains).bit_length())
+        if 3 * self._char_bits + row_bits > 64:
+            raise ValueError("Too many distinct characters to index")
+        char_ids = np.zeros(0x110000, dtype=np.uint64)
+        char_ids[self._chars] = np.arange(1, len(self._chars) + 1, dtype=np.uint64)
+
+        keys = []
+        for start, chars in chunks:
+            valid = chars[:, 2:] != 0  # windows inside the string (arrays are NUL-padded)
+            grams = self._pack(char_ids[chars])
+            rows = np.arange(start, start + len(chars), dtype=np.uint64)[:, None]
+            keys.append(((grams << np.uint64(row_bits)) | rows)[valid])
+        keys = np.sort(np.concatenate(keys)) if keys else np.empty(0, dtype=np.uint64)
+        keys = keys[np.r_[True, keys[1:] != keys[:-1]]] if len(keys) else keys  # repeated trigram in a domain
+
+        grams = keys >> np.uint64(row_bits)
+        self._rows = (keys & np.uint64((1 << row_bits) - 1)).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, grams[1:] != grams[:-1]]) if len(grams) else np.empty(0, np.int64)
+        self._grams = grams[starts]
+        self._starts = np.append(starts, len(grams))
+        # memory held by the index, including the lowered domain strings
+        self.nbytes = (self.domains.nbytes + sum(map(sys.getsizeof, self.domains)) + self._chars.nbytes
+                       + self._grams.nbytes + self._starts.nbytes + self._rows.nbytes)
+
+    def _pack(self, ids: np.ndarray) -> np.ndarray:
+        """One integer per 3-character window of a (rows, width) array of character ids"""
+        bits = np.uint64(self._char_bits)
+        return (ids[:, :-2] << (bits + bits)) | (ids[:, 1:-1] << bits) | ids[:, 2:]
+
+    def postings(self, gram: str) -> Optional[np.ndarray]:
+        """Sorted rows whose domain contains the 3-character gram, None if none do"""
+        points = np.array([ord(c) for c in gram], dtype=np.uint32)
+        positions = np.searchsorted(self._chars, points)
+        if (positions >= len(self._chars)).any() or (self._chars[positions] != points).any():
+            return None
+        code = self._pack((positions + 1).astype(np.uint64)[None, :])[0, 0]
+        i = np.searchsorted(self._grams, code)
+        if i == len(self._grams) or self._grams[i] != code:
+            return None
+        return self._rows[self._starts[i]:self._starts[i + 1]]
+
+    def search(self, term: str) -> np.ndarray:
+        """
+        Find rows whose domain contains term (case-insensitive)
+
+        Args:
+            term: Substring to look for
+
+        Returns:
+            Sorted array of matching row positions
+        """
+        term = term.strip().lower()
+        if not term:
+            return np.arange(len(self.domains), dtype=np.int64)
+
+        if len(term) < 3:
+            # Too short for trigrams - a vectorized scan is still cheap
+            mask = pd.Series(self.domains).str.contains(term, regex=False).to_numpy()
+            return np.flatnonzero(mask)
+
+        postings = [self.postings(term[i:i + 3]) for i in range(len(term) - 2)]
+        if any(rows is None for rows in postings):
+            return np.empty(0, dtype=np.int64)
+        candidates = None
+        for rows in sorted(postings, key=len):
+            candidates = rows if candidates is None else np.intersect1d(candidates, rows, assume_unique=True)
+            if len(candidates) == 0:
+                return candidates
+
+        if len(term) == 3:
+            return candidates
+        return np.asarray([row for row in candidates if term in self.domains[row]], dtype=np.int64)
+
+
+class ResultSet:
+    """
+    Results of a run plus everything derived from them
+
+    Summary counts, the search index and export payloads are computed once and
+    kept alongside the DataFrame, so Streamlit reruns (e.g. every keystroke in
+    the search box) reuse them instead of recomputing from scratch. prepare()
+    builds the search index in the background so the first search does not
+    pay for it.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df.reset_index(drop=True)
+        self._search_index: Optional[DomainSearchIndex] = None
+        self._index_lock = threading.Lock()
+        self._source_counts: Optional[pd.Series] = None
+        self._display_df: Optional[pd.DataFrame] = None
+        self._exports: OrderedDict = OrderedDict()
+        self._export_lock = threading.Lock()
+        self._ranks: Dict[str, np.ndarray] = {}
+        self._last_filter: Optional[tuple] = None
+        self._last_positions: Optional[np.ndarray] = None
+        self._frame_bytes: Optional[int] = None
+        self._display_bytes = 0
+
+    def __len__(self):
+        return len(self.df)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory retained by the result set: the DataFrame plus every derived
+        cache built so far (display copy, search index, sort ranks, exports)
+        """
+        if self._frame_bytes is None:
+            self._frame_bytes = int(self.df.memory_usage(deep=True).sum())
+        total = self._frame_bytes + self._display_bytes
+        search_index = self._search_index
+        if search_index is not None:
+            total += search_index.nbytes
+        total += sum(rank.nbytes for rank in list(self._ranks.values()))
+        if self._last_positions is not None:
+            total += self._last_positions.nbytes
+        with self._export_lock:
+            total += sum(len(payload) for payload in self._exports.values())
+        return total
+
+    @property
+    def source_counts(self) -> pd.Series:
+        """Row count per Source, computed with a single groupby"""
+        if self._source_counts is None:
+            self._source_counts = (self.df.groupby('Source', sort=False, observed=True).size()
+                                   .sort_values(ascending=False))
+        return self._source_counts
+
+    def summary(self) -> Dict[str, int]:
+        """Total plus per-source counts for the results header"""
+        counts = self.source_counts
+        summary = {'Total': len(self.df)}
+        for source in SUMMARY_SOURCES:
+            summary[source] = int(counts.get(source, 0))
+        return summary
+
+    @property
+    def display_df(self) -> pd.DataFrame:
+        """Results with the Status column added and columns in display order"""
+        if self._display_df is None:
+            display_df = self.df.copy()
+            display_df['Status'] = np.where(display_df['Source'] != 'FAILED', "✅ Success", "❌ Failed")
+            display_df = display_df[[col for col in DISPLAY_COLUMNS if col in display_df.columns]]
+            self._display_bytes = int(display_df.memory_usage(deep=True).sum())
+            self._display_df = display_df
+        return self._display_df
+
+    @property
+    def search_index(self) -> DomainSearchIndex:
+        if self._search_index is None:
+            with self._index_lock:
+                if self._search_index is None:
+                    self._search_index = DomainSearchIndex(self.df['Domain'])
+        return self._search_index
+
+    def prepare(self) -> "ResultSet":
+        """Start building the search index on a background thread; returns self"""
+        threading.Thread(target=lambda: self.search_index, name="results-index", daemon=True).start()
+        return self
+
+    def filter_positions(self, search_term: str = "", source_filter: str = "All",
+                         status_filter: str = "All") -> np.ndarray:
+        """Row positions matching the search box and filter selections"""
+        key = (search_term.strip().lower(), source_filter, status_filter)
+        if key != self._last_filter:
+            self._last_positions = self._filter_positions(search_term, source_filter, status_filter)
+            self._last_filter = key
+        return self._last_positions
+
+    def _filter_positions(self, search_term, source_filter, status_filter) -> np.ndarray:
+        positions = self.search_index.search(search_term) if search_term else None
+
+        mask = None
+        sources = self.df['Source']
+        if source_filter != "All":
+            mask = (sources == source_filter).to_numpy()
+        if status_filter == "Success":
+            status_mask = (sources != 'FAILED').to_numpy()
+            mask = status_mask if mask is None else mask & status_mask
+        elif status_filter == "Failed":
+            status_mask = (sources == 'FAILED').to_numpy()
+            mask = status_mask if mask is None else mask & status_mask
+
+        if mask is None:
+            return positions if positions is not None else np.arange(len(self.df), dtype=np.int64)
+        if positions is None:
+            return np.flatnonzero(mask)
+        return positions[mask[positions]]
+
+    def count(self, search_term: str = "", source_filter: str = "All",
+              status_filter: str = "All") -> int:
+        """Number of rows matching the filters, without materializing them"""
+        return len(self.filter_positions(search_term, source_filter, status_filter))
+
+    def _rank(self, column: str) -> np.ndarray:
+        """Sort rank of every row by column (missing values last), cached per column"""
+        if column not in self._ranks:
+            values = self.df[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                # sort the (small) dictionary instead of the rows; missing codes (-1) go last
+                categories = values.cat.categories
+                category_rank = np.empty(len(categories) + 1, dtype=np.int64)
+                category_rank[categories.argsort()] = np.arange(len(categories), dtype=np.int64)
+                category_rank[-1] = len(categories)
+                self._ranks[column] = category_rank[values.cat.codes.to_numpy()]
+                return self._ranks[column]
+            order = values.sort_values(kind='mergesort', na_position='last').index.to_numpy()
+            rank = np.empty(len(order), dtype=np.int64)
+            rank[order] = np.arange(len(order), dtype=np.int64)
+            self._ranks[column] = rank
+        return self._ranks[column]
+
+    def page(self, page: int = 1, page_size: int = DEFAULT_PAGE_SIZE, sort_by: Optional[str] = None,
+             ascending: bool = True, search_term: str = "", source_filter: str = "All",
+             status_filter: str = "All") -> pd.DataFrame:
+        """
+        One page of the filtered, sorted results, ready for display
+
+        Filtering and sorting run on row positions; only the rows of the
+        requested page are materialized.
+
+        Args:
+            page: 1-based page number (clamped to the available range)
+            page_size: Rows per page
+            sort_by: Column to sort by, or None to keep result order
+            ascending: Sort direction
+            search_term, source_filter, status_filter: Active filters
+
+        Returns:
+            DataFrame with at most page_size rows
+        """
+        positions = self.filter_positions(search_term, source_filter, status_filter)
+
+        if sort_by:
+            ranks = self._rank(sort_by)[positions]
+            order = np.argsort(ranks, kind='stable')
+            if not ascending:
+                order = order[::-1]
+            positions = positions[order]
+
+        pages = max(1, -(-len(positions) // page_size))
+        page = min(max(1, page), pages)
+        start = (page - 1) * page_size
+        return self.display_df.iloc[positions[start:start + page_size]]
+
+    def filter(self, search_term: str = "", source_filter: str = "All",
+               status_filter: str = "All") -> pd.DataFrame:
+        """Filtered view of the results (no copy when nothing is filtered)"""
+        positions = self.filter_positions(search_term, source_filter, status_filter)
+        if len(positions) == len(self.df):
+            return self.df
+        return self.df.iloc[positions]
+
+    def export(self, fmt: str, search_term: str = "", source_filter: str = "All",
+               status_filter: str = "All") -> str:
+        """
+        Serialized export of the filtered results, cached per filter combination
+
+        Safe to call from a download button's deferred callable, which runs on
+        its own thread alongside the next script rerun.
+
+        Args:
+            fmt: 'csv' or 'json'
+            search_term, source_filter, status_filter: Active filters
+
+        Returns:
+            Export payload as a string
+        """
+        key = (fmt, search_term.strip().lower(), source_filter, status_filter)
+        with self._export_lock:
+            if key in self._exports:
+                self._exports.move_to_end(key)
+                return self._exports[key]
+
+        # not filter(): its last-filter memo belongs to the rerun thread
+        positions = self._filter_positions(search_term, source_filter, status_filter)
+        df = self.df if len(positions) == len(self.df) else self.df.iloc[positions]
+        if fmt == 'csv':
+            payload = df.to_csv(index=False)
+        elif fmt == 'json':
+            payload = df.to_json(orient='records', indent=2, date_format='iso')
+        else:
+            raise ValueError(f"Unsupported export format: {fmt}")
+
+        with self._export_lock:
+            self._exports[key] = payload
+            if len(self._exports) > MAX_CACHED_EXPORTS:
+                self._exports.popitem(last=False)
+        return payload
@@ -0,0 +1,351 @@
+import heapq
+import itertools
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+RDAP_BOOTSTRAP_URL = "https://data.iana.org/rdap/dns.json"
+RDAP_BOOTSTRAP_CACHE = os.path.join(tempfile.gettempdir(), "whois_rdap_bootstrap.json")
+BOOTSTRAP_MAX_AGE = 7 * 24 * 3600  # seconds
+BOOTSTRAP_RETRY_AFTER = 300        # seconds before a failed bootstrap load is tried again
+
+
+class DelayQueue:
+    """
+    Min-heap of items that become ready at a future time
+
+    Used to park lookups that are backing off so the worker that ran them can
+    pick up other work instead of sleeping.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, item: Any, delay: float):
+        """Schedule item to become ready after delay seconds"""
+        heapq.heappush(self._heap, (time.monotonic() + delay, next(self._counter), item))
+
+    def pop_ready(self) -> List[Any]:
+        """Remove and return every item whose delay has elapsed, earliest first"""
+        now = time.monotonic()
+        ready = []
+        while self._heap and self._heap[0][0] <= now:
+            ready.append(heapq.heappop(self._heap)[2])
+        return ready
+
+    def next_ready_in(self) -> Optional[float]:
+        """Seconds until the next item is ready (0 if overdue), None if empty"""
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - time.monotonic())
+
+
+class DispatchPlanner:
+    """
+    Interleaves pending lookups round-robin across registry hosts
+
+    Input lists are usually clustered by TLD; dispatching them in order sends
+    every worker to the same registry at once. The planner keeps one queue per
+    host and hands out work host by host, skipping hosts that are at their
+    in-flight limit, so every registry is kept busy without any single one
+    being hammered.
+
+    The limit is `max_per_host` when set; otherwise each active host (queued
+    work or lookups in flight) gets a fair share of `total_slots`, so a list
+    for a single registry can still use every worker. Items added with
+    capped=False (lookups that do not hit the registry, e.g. a paid API) are
+    interleaved the same way but never count towards or wait for the limit.
+    """
+
+    def __init__(self, max_per_host: Optional[int] = None, total_slots: Optional[int] = None):
+        self.max_per_host = max_per_host
+        self.total_slots = total_slots
+        self._queues: Dict[str, deque] = {}
+        self._hosts = deque()        # round-robin order of hosts with queued work
+        self._in_flight: Dict[str, int] = {}
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def limit(self) -> Optional[int]:
+        """Current per-host in-flight limit (None = unlimited)"""
+        if self.max_per_host is not None:
+            return self.max_per_host
+        if self.total_slots is None:
+            return None
+        active = len(set(self._queues).union(h for h, n in self._in_flight.items() if n))
+        return max(1, -(-self.total_slots // max(1, active)))
+
+    def add(self, item: Any, host: str, front: bool = False, capped: bool = True):
+        """Queue item for host (front=True for retries that should go first)"""
+        queue = self._queues.get(host)
+        if queue is None:
+            queue = self._queues[host] = deque()
+            self._hosts.append(host)
+        if front:
+            queue.appendleft((item, capped))
+        else:
+            queue.append((item, capped))
+        self._size += 1
+
+    def next(self) -> Optional[Tuple[Any, str, bool]]:
+        """
+        Next (item, host, capped) from the first host in rotation that is
+        under its in-flight limit (or whose next item is uncapped), or None
+        if every host with work is saturated
+        """
+        limit = self.limit()
+        for _ in range(len(self._hosts)):
+            host = self._hosts[0]
+            self._hosts.rotate(-1)
+            queue = self._queues[host]
+            item, capped = queue[0]
+            if capped and limit is not None and self._in_flight.get(host, 0) >= limit:
+                continue
+            queue.popleft()
+            if not queue:
+                del self._queues[host]
+                self._hosts.remove(host)
+            self._size -= 1
+            if capped:
+                self._in_flight[host] = self._in_flight.get(host, 0) + 1
+            return item, host, capped
+        return None
+
+    def done(self, host: str, capped: bool = True):
+        """Release host's in-flight slot once its lookup attempt finishes"""
+        if capped:
+            self._in_flight[host] -= 1
+
+
+class RegistryResolver:
+    """
+    Maps domains to the registry that serves them
+
+    Uses the IANA RDAP bootstrap registry (TLD -> RDAP base URL), cached on
+    disk for a week (a stale copy is used if refreshing fails). When no
+    bootstrap data is available the TLD itself is used as the grouping key,
+    which still spreads clustered lists across registries, and loading is
+    retried after BOOTSTRAP_RETRY_AFTER seconds.
+    """
+
+    def __init__(self, bootstrap_url: str = RDAP_BOOTSTRAP_URL,
+                 cache_path: str = RDAP_BOOTSTRAP_CACHE, timeout: float = 5.0):
+        self.bootstrap_url = bootstrap_url
+        self.cache_path = cache_path
+        self.timeout = timeout
+        self._tld_hosts: Optional[Dict[str, str]] = None
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+
+    def _read_cache(self, max_age: Optional[float]) -> Optional[dict]:
+        try:
+            if max_age is not None and time.time() - os.path.getmtime(self.cache_path) >= max_age:
+                return None
+            with open(self.cache_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _load(self) -> Optional[Dict[str, str]]:
+        """TLD -> RDAP host map, None if no bootstrap data could be loaded"""
+        data = self._read_cache(BOOTSTRAP_MAX_AGE)
+        if data is None:
+            try:
+                from urllib.request import urlopen
+                with urlopen(self.bootstrap_url, timeout=self.timeout) as resp:
+                    data = json.loads(resp.read())
+                with open(self.cache_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+            except (OSError, ValueError):
+                data = self._read_cache(None)
+                if data is None:
+                    return None
+
+        hosts = {}
+        for tlds, urls in data.get("services", []):
+            if not urls:
+                continue
+            host = urlsplit(urls[0]).netloc
+            for tld in tlds:
+                hosts[tld.lower()] = host
+        return hosts
+
+    def host_for(self, domain: str) -> str:
+        """Registry host for domain (longest matching TLD suffix), or 'tld:<tld>'"""
+        if self._tld_hosts is None and time.monotonic() >= self._retry_at:
+            with self._lock:
+                if self._tld_hosts is None and time.monotonic() >= self._retry_at:
+                    self._tld_hosts = self._load()
+                    if self._tld_hosts is None:
+                        self._retry_at = time.monotonic() + BOOTSTRAP_RETRY_AFTER
+        tld_hosts = self._tld_hosts or {}
+
+        labels = domain.rstrip(".").split(".")
+        for i in range(1, len(labels)):
+            host = tld_hosts.get(".".join(labels[i:]))
+            if host:
+                return host
+        return "tld:" + labels[-1]
+
+
+SCHEDULER_CAPACITY = 32            # lookup attempts in flight across all jobs sharing a scheduler
+TENANT_MAX_IN_FLIGHT = 16          # of those, at most this many for any one tenant
+FAST_LANE_MAX_DOMAINS = 200        # jobs up to this size are interactive and use the fast lane
+FAST_LANE_SLOTS = 4                # slots of the capacity only fast-lane jobs may use
+
+
+class ScheduledJob:
+    """One fetch run registered with a FairShareScheduler"""
+
+    def __init__(self, scheduler: "FairShareScheduler", tenant: str, size: int, weight: float):
+        self.scheduler = scheduler
+        self.tenant = tenant
+        self.size = size
+        self.weight = weight
+        self.fast = size <= scheduler.fast_lane_max_domains
+        self.vtime = 0.0            # virtual service received: granted slots / weight
+        self.in_flight = 0
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Wait up to timeout seconds (forever if None) for a lookup slot"""
+        return self.scheduler._acquire(self, timeout)
+
+    def release(self):
+        """Give back a slot once its lookup attempt has finished"""
+        self.scheduler._release(self)
+
+    def close(self):
+        """Unregister the job (its slots must have been released)"""
+        self.scheduler._close(self)
+
+    def __enter__(self) -> "ScheduledJob":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FairShareScheduler:
+    """
+    Weighted fair queuing of lookup slots across tenants and their jobs
+
+    Shared by every fetcher of a deployment. Each fetch run registers a job
+    for its tenant (a user or session) and acquires one slot per lookup
+    attempt. A free slot goes to the waiting tenant that has received the
+    least service relative to its weight, and within that tenant to its least
+    served job, so one tenant's huge batch cannot starve anybody else's and a
+    tenant running several jobs does not get more than its share. Tenants are
+    capped at `tenant_max_in_flight` slots, and `fast_lane_slots` of the
+    capacity are held back for small (interactive) jobs, which therefore
+    never queue behind the in-flight attempts of batch jobs.
+
+    Tenants and jobs that become active start at the current minimum virtual
+    time, so idling does not bank credit for a later burst.
+
+    Args:
+        capacity: Lookup attempts in flight across all jobs
+        tenant_max_in_flight: Per-tenant cap
+        fast_lane_max_domains: Jobs up to this many domains use the fast lane
+        fast_lane_slots: Slots reserved for fast-lane jobs
+        tenant_weights: Optional weight per tenant (default 1.0)
+    """
+
+    def __init__(self, capacity: int = SCHEDULER_CAPACITY, tenant_max_in_flight: int = TENANT_MAX_IN_FLIGHT,
+                 fast_lane_max_domains: int = FAST_LANE_MAX_DOMAINS, fast_lane_slots: int = FAST_LANE_SLOTS,
+                 tenant_weights: Optional[Dict[str, float]] = None):
+        self.capacity = capacity
+        self.tenant_max_in_flight = tenant_max_in_flight
+        self.fast_lane_max_domains = fast_lane_max_domains
+        self.fast_lane_slots = min(fast_lane_slots, capacity - 1)
+        self.tenant_weights = dict(tenant_weights or {})
+        self.in_flight = 0
+        self._tenant_vtime: Dict[str, float] = {}
+        self._tenant_in_flight: Dict[str, int] = {}
+        self._jobs: Dict[str, List[ScheduledJob]] = {}
+        self._waiting: List[ScheduledJob] = []
+        self._cond = threading.Condition()
+
+    def job(self, tenant: str, size: int, weight: float = 1.0) -> ScheduledJob:
+        """Register a job of `size` domains for tenant"""
+        job = ScheduledJob(self, tenant, size, weight)
+        with self._cond:
+            jobs = self._jobs.get(tenant)
+            if jobs:
+                job.vtime = min(j.vtime for j in jobs)
+            else:
+                jobs = self._jobs[tenant] = []
+                self._tenant_vtime[tenant] = min(self._tenant_vtime.values(), default=0.0)
+            jobs.append(job)
+        return job
+
+    def _eligible(self, job: ScheduledJob) -> bool:
+        limit = self.capacity if job.fast else self.capacity - self.fast_lane_slots
+        return (self.in_flight < limit
+                and self._tenant_in_flight.get(job.tenant, 0) < self.tenant_max_in_flight)
+
+    def _pick(self) -> Optional[ScheduledJob]:
+        """Waiting job that should get the next slot: least served tenant, then least served job"""
+        best = None
+        for job in self._waiting:
+            if not self._eligible(job):
+                continue
+            key = (self._tenant_vtime[job.tenant], job.vtime)
+            if best is None or key < best[0]:
+                best = (key, job)
+        return best[1] if best else None
+
+    def _acquire(self, job: ScheduledJob, timeout: Optional[float]) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._waiting.append(job)
+            try:
+                while self._pick() is not job:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+                self.in_flight += 1
+                job.in_flight += 1
+                self._tenant_in_flight[job.tenant] = self._tenant_in_flight.get(job.tenant, 0) + 1
+                job.vtime += 1.0 / job.weight
+                self._tenant_vtime[job.tenant] += 1.0 / self.tenant_weights.get(job.tenant, 1.0)
+                return True
+            finally:
+                self._waiting.remove(job)
+                self._cond.notify_all()
+
+    def _release(self, job: ScheduledJob):
+        with self._cond:
+            self.in_flight -= 1
+            job.in_flight -= 1
+            self._tenant_in_flight[job.tenant] -= 1
+            self._cond.notify_all()
+
+    def _close(self, job: ScheduledJob):
+        with self._cond:
+            jobs = self._jobs.get(job.tenant, [])
+            if job in jobs:
+                jobs.remove(job)
+            if not jobs:
+                self._jobs.pop(job.tenant, None)
+                self._tenant_vtime.pop(job.tenant, None)
+                self._tenant_in_flight.pop(job.tenant, None)
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, dict]:
+        """Slots in flight and active jobs per tenant"""
+        with self._cond:
+            return {tenant: {"in_flight": self._tenant_in_flight.get(tenant, 0), "jobs": len(jobs),
+                             "domains": sum(j.size for j in jobs)}
+                    for tenant, jobs in self._jobs.items()}
@@ -0,0 +1,32 @@
+import pandas as pd
+
+from date_utils import normalize_date_columns, to_iso_date
+
+
+def test_normalize_date_columns_mixed_formats():
+    df = pd.DataFrame({
+        "Domain": ["a.com", "b.com", "c.com", "d.com"],
+        "Creation Date": ["2001-05-04T12:00:00Z", "04-May-2001", None, "garbage"],
+    })
+    normalize_date_columns(df)
+    assert pd.api.types.is_datetime64_any_dtype(df["Creation Date"])
+    assert df["Creation Date"].iloc[0] == pd.Timestamp("2001-05-04")
+    assert df["Creation Date"].iloc[1] == pd.Timestamp("2001-05-04")
+    assert df["Creation Date"].iloc[2:].isna().all()
+
+
+def test_normalize_date_columns_keeps_year_9999_placeholder():
+    df = pd.DataFrame({
+        "Expiration Date": ["9999-12-31", "31-Dec-9999", "2030-01-01"],
+        "Updated Date": [None, None, None],
+    })
+    normalize_date_columns(df)
+    assert df["Expiration Date"].tolist() == [
+        pd.Timestamp("9999-12-31"), pd.Timestamp("9999-12-31"), pd.Timestamp("2030-01-01")
+    ]
+    assert df["Updated Date"].isna().all()
+
+
+def test_to_iso_date():
+    assert to_iso_date("9999-12-31T00:00:00Z") == "9999-12-31"
+    assert to_iso_date(None) is None
@@ -0,0 +1,42 @@
+import time
+
+import pandas as pd
+
+from monitor import Monitor
+
+
+class FlakyFetcher:
+    """Fails the first `failures` batches, then reports every domain registered"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = []
+        self.last_changes = None
+
+    def fetch_multiple_domains_advanced(self, domains, refresh=False):
+        self.calls.append(list(domains))
+        if len(self.calls) <= self.failures:
+            raise RuntimeError("upstream exploded")
+        return pd.DataFrame([{"Domain": d, "Registrar": "X", "Creation Date": None,
+                              "Expiration Date": pd.Timestamp("9999-12-31"), "Updated Date": None,
+                              "Source": "RDAP", "Error": None} for d in domains])
+
+
+def test_failed_tick_reschedules_due_domains(tmp_path):
+    fetcher = FlakyFetcher(failures=1)
+    monitor = Monitor(str(tmp_path / "monitor.db"), fetcher_factory=lambda tracker: fetcher, tick=1.0)
+    try:
+        monitor.watch(["a.com", "b.com"], spread=0)
+        now = time.time() + 1
+
+        assert monitor.run_once(now) == 0
+        assert len(monitor) == 2
+        assert sorted(fetcher.calls[0]) == ["a.com", "b.com"]
+
+        # backoff: not due again on the next tick, but within a few
+        assert monitor.run_once(now + 1) == 0
+        assert monitor.run_once(now + 10) == 2
+        assert sorted(fetcher.calls[1]) == ["a.com", "b.com"]
+        assert len(monitor) == 2
+    finally:
+        monitor.close()
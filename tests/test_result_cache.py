@@ -0,0 +1,86 @@
+import time
+
+import pytest
+
+from result_cache import LocalLRUCache, LocalRespServer, RedisCache, TieredCache
+
+
+@pytest.fixture
+def server():
+    server = LocalRespServer().start()
+    yield server
+    server.stop()
+
+
+def test_redis_batched_round_trip(server):
+    cache = RedisCache.from_url(server.url)
+    items = {f"d{i}.com": {"Domain": f"d{i}.com", "n": i} for i in range(2500)}
+    cache.set_many(items)
+    found = cache.get_many(list(items) + ["missing.com"])
+    assert found == items
+
+
+def test_redis_ttl_expiry(server):
+    cache = RedisCache.from_url(server.url)
+    cache.set("short.com", {"n": 1}, ttl=1)
+    cache.set("long.com", {"n": 2})
+    assert cache.get("short.com") == {"n": 1}
+    time.sleep(1.1)
+    assert cache.get("short.com") is None
+    assert cache.get("long.com") == {"n": 2}
+
+
+def test_redis_reports_remaining_ttl(server):
+    cache = RedisCache.from_url(server.url, ttl=100)
+    cache.set_many({"a.com": {"n": 1}, "b.com": {"n": 2}})
+    cache.set("c.com", {"n": 3}, ttl=5)
+    found = cache.get_many_with_ttl(["a.com", "c.com", "missing.com"])
+    assert set(found) == {"a.com", "c.com"}
+    assert found["a.com"][0] == {"n": 1}
+    assert 99 < found["a.com"][1] <= 100
+    assert 4 < found["c.com"][1] <= 5
+
+
+def test_tiered_reads_local_first_and_backfills(server):
+    shared = RedisCache.from_url(server.url)
+    shared.set("remote.com", {"n": 1})
+    tiered = TieredCache(shared)
+    tiered.set("both.com", {"n": 2})
+
+    assert tiered.get_many(["remote.com", "both.com", "missing.com"]) == {
+        "remote.com": {"n": 1}, "both.com": {"n": 2}
+    }
+    assert tiered.local.get("remote.com") == {"n": 1}
+    assert shared.get("both.com") == {"n": 2}
+
+
+def test_tiered_backfill_keeps_remaining_shared_ttl(server):
+    shared = RedisCache.from_url(server.url)
+    shared.set("expiring.com", {"n": 1}, ttl=1)
+    tiered = TieredCache(shared, LocalLRUCache(ttl=3600))
+
+    assert tiered.get("expiring.com") == {"n": 1}
+    time.sleep(1.1)
+    # the back-filled copy must expire with the shared entry, not an hour later
+    assert tiered.local.get("expiring.com") is None
+    assert tiered.get("expiring.com") is None
+
+
+def test_tiered_backfill_capped_at_local_ttl(server):
+    shared = RedisCache.from_url(server.url, ttl=3600)
+    shared.set("long.com", {"n": 1})
+    tiered = TieredCache(shared, LocalLRUCache(ttl=1))
+
+    assert tiered.get("long.com") == {"n": 1}
+    time.sleep(1.1)
+    assert tiered.local.get("long.com") is None
+
+
+def test_tiered_degrades_to_local_when_backend_down():
+    server = LocalRespServer().start()
+    url = server.url
+    server.stop()
+    tiered = TieredCache(RedisCache.from_url(url, timeout=0.5))
+
+    tiered.set("kept.com", {"n": 1})
+    assert tiered.get_many(["kept.com", "missing.com"]) == {"kept.com": {"n": 1}}
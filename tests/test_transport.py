@@ -0,0 +1,96 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("h2")
+
+from transport import Http2Transport, LocalH2Server
+
+
+def echo(path):
+    return 200, {"path": path}, {}
+
+
+@pytest.fixture
+def h2_server():
+    server = LocalH2Server(echo, delay=0.2).start()
+    yield server
+    server.stop()
+
+
+def test_concurrent_requests_share_one_connection(h2_server):
+    transport = Http2Transport(prior_knowledge=True)
+    try:
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            responses = list(pool.map(lambda i: transport.get(f"{h2_server.url}/domain/d{i}.com"), range(10)))
+    finally:
+        transport.close()
+
+    assert [r.json()["path"] for r in responses] == [f"/domain/d{i}.com" for i in range(10)]
+    assert all(r.http_version == "HTTP/2" for r in responses)
+    assert h2_server.connections == 1
+
+    connections = transport.connection_stats()
+    assert len(connections) == 1
+    assert connections[0]["streams"] == 10
+    assert connections[0]["http_version"] == "HTTP/2"
+
+    host = transport.host_stats()[h2_server.host]
+    assert host["connections"] == 1
+    assert host["streams"] == 10
+    assert host["peak_in_flight"] > 1
+
+
+def test_redirects_are_counted_as_streams():
+    def handler(path):
+        if path == "/old":
+            return 301, None, {"location": "/new"}
+        return 200, {"path": path}, {}
+
+    server = LocalH2Server(handler).start()
+    transport = Http2Transport(prior_knowledge=True)
+    try:
+        resp = transport.get(f"{server.url}/old")
+    finally:
+        transport.close()
+        server.stop()
+
+    assert resp.json() == {"path": "/new"}
+    assert transport.host_stats()[server.host]["streams"] == 2
+
+
+def test_falls_back_to_http1():
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            data = json.dumps({"path": self.path}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    transport = Http2Transport()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        responses = [transport.get(f"{url}/domain/d{i}.com") for i in range(3)]
+    finally:
+        transport.close()
+        server.shutdown()
+        server.server_close()
+
+    assert [r.json()["path"] for r in responses] == [f"/domain/d{i}.com" for i in range(3)]
+    assert all(r.http_version == "HTTP/1.1" for r in responses)
+    connections = transport.connection_stats()
+    assert [c["http_version"] for c in connections] == ["HTTP/1.1"]
+    assert connections[0]["streams"] == 3
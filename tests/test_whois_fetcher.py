@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+
+from date_utils import normalize_date_columns
+from registrars import compact_columns
+from whois_fetcher import to_legacy_schema
+
+
+def test_to_legacy_schema_uses_none_for_missing_values():
+    df = compact_columns(normalize_date_columns(pd.DataFrame([
+        {"Domain": "ok.com", "Registrar": "GoDaddy.com, LLC", "Creation Date": "2001-05-04",
+         "Expiration Date": "9999-12-31", "Updated Date": None, "Source": "RDAP", "Error": np.nan},
+        {"Domain": "bad.com", "Registrar": None, "Creation Date": None, "Expiration Date": None,
+         "Updated Date": None, "Source": "FAILED", "Error": "All sources failed"},
+    ])))
+
+    ok, bad = to_legacy_schema(df).to_dict("records")
+    assert ok == {"domain": "ok.com", "registrar": "GoDaddy.com, LLC", "registration_date": "2001-05-04",
+                  "expiry_date": "9999-12-31", "update_date": None, "status": "Success", "error": None}
+    assert bad["status"] == "Error"
+    assert bad["error"] == "All sources failed"
+    assert bad["registrar"] is None and bad["registration_date"] is None
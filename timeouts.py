@@ -0,0 +1,128 @@
+"""
+Adaptive per-host connect/read timeouts.
+
+Instead of one fixed timeout for every registry, AdaptiveTimeouts keeps a
+bounded window of observed connect and response latencies per host and sets
+each timeout to p99 x factor, clamped to a floor and ceiling. Fast registries
+get short timeouts, so hung connections are abandoned quickly; slow ones get
+enough time that they are not retried needlessly. Samples persist to a JSON
+file so a new run starts from what previous runs learned.
+"""
+import json
+import os
+import tempfile
+import threading
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+TIMEOUTS_PATH = os.path.join(tempfile.gettempdir(), "whois_adaptive_timeouts.json")
+DEFAULT_TIMEOUT = (10.0, 10.0)   # (connect, read) until a host has enough samples
+TIMEOUT_FACTOR = 3.0
+CONNECT_BOUNDS = (0.5, 10.0)     # (floor, ceiling) seconds
+READ_BOUNDS = (1.0, 30.0)
+MIN_SAMPLES = 20
+WINDOW = 512                     # samples kept per host and phase
+
+
+def _percentile(samples, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class AdaptiveTimeouts:
+    """
+    Per-host timeout estimator
+
+    Args:
+        path: JSON file to load samples from and save them to (None = memory only)
+        default: (connect, read) used while a host has fewer than MIN_SAMPLES
+    """
+
+    def __init__(self, path: Optional[str] = TIMEOUTS_PATH, default: Tuple[float, float] = DEFAULT_TIMEOUT,
+                 factor: float = TIMEOUT_FACTOR, quantile: float = 0.99):
+        self.path = path
+        self.default = default
+        self.factor = factor
+        self.quantile = quantile
+        self._connect: Dict[str, deque] = {}
+        self._read: Dict[str, deque] = {}
+        self._cached: Dict[str, Tuple[float, float]] = {}
+        self._observed: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        for host, phases in data.items():
+            self._connect[host] = deque(phases.get("connect", []), maxlen=WINDOW)
+            self._read[host] = deque(phases.get("read", []), maxlen=WINDOW)
+
+    def _estimate(self, samples, bounds, default) -> float:
+        if samples is None or len(samples) < MIN_SAMPLES:
+            return default
+        value = _percentile(samples, self.quantile) * self.factor
+        return round(min(bounds[1], max(bounds[0], value)), 3)
+
+    def timeout_for(self, host: str) -> Tuple[float, float]:
+        """(connect, read) timeout for host, suitable for requests' timeout argument"""
+        with self._lock:
+            self._ensure_loaded()
+            cached = self._cached.get(host)
+            if cached is None:
+                cached = (
+                    self._estimate(self._connect.get(host), CONNECT_BOUNDS, self.default[0]),
+                    self._estimate(self._read.get(host), READ_BOUNDS, self.default[1])
+                )
+                self._cached[host] = cached
+            return cached
+
+    def _observe(self, table: Dict[str, deque], host: str, seconds: float):
+        with self._lock:
+            self._ensure_loaded()
+            samples = table.get(host)
+            if samples is None:
+                samples = table[host] = deque(maxlen=WINDOW)
+            samples.append(round(seconds, 4))
+            # re-estimate after every 16th sample rather than on every lookup
+            count = self._observed.get(host, 0) + 1
+            self._observed[host] = count
+            if count % 16 == 0 or len(samples) == MIN_SAMPLES:
+                self._cached.pop(host, None)
+
+    def observe_connect(self, host: str, seconds: float):
+        """Record time to establish a TCP connection (DNS + connect)"""
+        self._observe(self._connect, host, seconds)
+
+    def observe_read(self, host: str, seconds: float):
+        """
+        Record time from sending a request to its response headers; a request
+        that timed out is recorded with the timeout it was given
+        """
+        self._observe(self._read, host, seconds)
+
+    def save(self):
+        """Persist samples atomically (no-op without a path)"""
+        if not self.path:
+            return
+        with self._lock:
+            data = {host: {"connect": list(self._connect.get(host, ())),
+                           "read": list(self._read.get(host, ()))}
+                    for host in set(self._connect) | set(self._read)}
+        directory = os.path.dirname(self.path) or "."
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".timeouts-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+        except OSError:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
@@ -0,0 +1,283 @@
+"""
+Optional per-lookup tracing.
+
+A Tracer records a span tree per domain (attempts, sources, HTTP phases,
+parsing, backoff waits) and exports it in the Chrome Trace Event format, which
+chrome://tracing and https://ui.perfetto.dev open directly. Each domain gets its
+own lane in the viewer so its attempts line up even when retries ran on
+different worker threads.
+
+Code on the lookup path calls trace_span(), which is a no-op unless the
+current thread is inside a span of an active tracer, so tracing costs nothing
+when disabled.
+"""
+import contextlib
+import itertools
+import json
+import threading
+import time
+from typing import Dict, List, Optional
+
+_active = threading.local()
+
+
+class Span:
+    __slots__ = ("span_id", "parent_id", "lane", "name", "start", "end", "attrs", "thread")
+
+    def __init__(self, span_id, parent_id, lane, name, start, attrs):
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.lane = lane
+        self.name = name
+        self.start = start
+        self.end = None
+        self.attrs = attrs
+        self.thread = threading.current_thread().name
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+
+class Tracer:
+    """Collects spans for one run and exports / summarizes them"""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self.origin = time.perf_counter()
+        self._ids = itertools.count(1)
+        self._lanes = itertools.count(1)
+        self._lane_names: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def start_span(self, name: str, parent: Optional[Span] = None, start: Optional[float] = None,
+                   **attrs) -> Span:
+        """
+        Open a span that is ended explicitly with end_span()
+
+        A span without a parent starts a new lane (one per domain).
+        """
+        with self._lock:
+            span_id = next(self._ids)
+            if parent is None:
+                lane = next(self._lanes)
+                self._lane_names[lane] = attrs.get("domain", name)
+            else:
+                lane = parent.lane
+            span = Span(span_id, parent.span_id if parent else None, lane, name,
+                        time.perf_counter() if start is None else start, attrs)
+            self.spans.append(span)
+        return span
+
+    def end_span(self, span: Span, **attrs):
+        span.end = time.perf_counter()
+        span.attrs.update(attrs)
+
+    def record(self, name: str, start: float, end: float, parent: Optional[Span] = None, **attrs) -> Span:
+        """Record an already finished span (e.g. a backoff wait measured across threads)"""
+        span = self.start_span(name, parent=parent, start=start, **attrs)
+        span.end = end
+        return span
+
+    @contextlib.contextmanager
+    def span(self, name: str, parent: Optional[Span] = None, **attrs):
+        """
+        Time a block as a span and make it the current span on this thread,
+        so nested trace_span() calls (HTTP phases, parsing) attach under it
+        """
+        stack = getattr(_active, "stack", None)
+        if stack is None:
+            stack = _active.stack = []
+        if parent is None and stack and stack[-1][0] is self:
+            parent = stack[-1][1]
+
+        span = self.start_span(name, parent=parent, **attrs)
+        stack.append((self, span))
+        try:
+            yield span
+        except Exception as e:
+            span.attrs["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            stack.pop()
+            self.end_span(span)
+
+    def export_chrome_trace(self, path: str):
+        """
+        Write all spans as a Chrome Trace Event JSON file
+
+        Args:
+            path: Output file path (open it in chrome://tracing or Perfetto)
+        """
+        events = []
+        for lane, name in self._lane_names.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": lane, "args": {"name": name}})
+        for span in self.spans:
+            if span.end is None:
+                continue
+            args = {k: v if isinstance(v, (str, int, float, bool)) or v is None else str(v)
+                    for k, v in span.attrs.items()}
+            args["thread"] = span.thread
+            events.append({
+                "name": span.name,
+                "cat": "whois",
+                "ph": "X",
+                "pid": 1,
+                "tid": span.lane,
+                "ts": round((span.start - self.origin) * 1e6, 1),
+                "dur": round((span.end - span.start) * 1e6, 1),
+                "args": args
+            })
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def summary(self, top: int = 10) -> Dict:
+        """
+        Latency breakdown of the traced run
+
+        Args:
+            top: Number of slowest domains to report
+
+        Returns:
+            Dictionary with 'slowest_domains', 'hosts' (per-host attempt latency)
+            and 'phases' (total seconds spent per span name)
+        """
+        finished = [s for s in self.spans if s.end is not None]
+
+        roots = sorted((s for s in finished if s.parent_id is None), key=lambda s: s.duration, reverse=True)
+        slowest = [{"domain": s.attrs.get("domain"), "seconds": round(s.duration, 3),
+                    "source": s.attrs.get("source")} for s in roots[:top]]
+
+        host_samples: Dict[str, List[float]] = {}
+        host_errors: Dict[str, int] = {}
+        for s in finished:
+            if s.name == "attempt":
+                host = s.attrs.get("host", "unknown")
+                host_samples.setdefault(host, []).append(s.duration)
+                if "error" in s.attrs:
+                    host_errors[host] = host_errors.get(host, 0) + 1
+        hosts = []
+        for host, samples in host_samples.items():
+            samples.sort()
+            hosts.append({
+                "host": host,
+                "attempts": len(samples),
+                "errors": host_errors.get(host, 0),
+                "mean": round(sum(samples) / len(samples), 3),
+                "p95": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+                "max": round(samples[-1], 3)
+            })
+        hosts.sort(key=lambda h: h["p95"], reverse=True)
+
+        phases: Dict[str, float] = {}
+        for s in finished:
+            if s.parent_id is not None:
+                phases[s.name] = phases.get(s.name, 0.0) + s.duration
+
+        return {
+            "slowest_domains": slowest,
+            "hosts": hosts,
+            "phases": {k: round(v, 3) for k, v in sorted(phases.items(), key=lambda kv: -kv[1])}
+        }
+
+    def format_summary(self, top: int = 10) -> str:
+        """Human-readable version of summary()"""
+        summary = self.summary(top)
+        lines = ["Slowest domains:"]
+        for d in summary["slowest_domains"]:
+            lines.append(f"  {d['seconds']:>8.3f}s  {d['domain']}  ({d['source']})")
+        lines.append("Hosts (attempt latency):")
+        for h in summary["hosts"]:
+            lines.append(f"  {h['host']:<32} attempts={h['attempts']:<6} errors={h['errors']:<5} "
+                         f"mean={h['mean']:.3f}s p95={h['p95']:.3f}s max={h['max']:.3f}s")
+        lines.append("Time by phase (summed across workers):")
+        for name, seconds in summary["phases"].items():
+            lines.append(f"  {name:<24} {seconds:>10.3f}s")
+        return "\n".join(lines)
+
+
+def trace_span(name: str, **attrs):
+    """
+    Span under the current thread's active span, or a no-op context if this
+    thread is not being traced
+    """
+    stack = getattr(_active, "stack", None)
+    if not stack:
+        return contextlib.nullcontext()
+    tracer, parent = stack[-1]
+    return tracer.span(name, parent=parent, **attrs)
+
+
+def record_span(name: str, start: float, end: float, **attrs):
+    """Record a finished span under the current thread's active span (no-op if not traced)"""
+    stack = getattr(_active, "stack", None)
+    if stack:
+        tracer, parent = stack[-1]
+        tracer.record(name, start, end, parent=parent, **attrs)
+
+
+def current_span() -> Optional[Span]:
+    stack = getattr(_active, "stack", None)
+    return stack[-1][1] if stack else None
+
+
+def instrumented_http_adapter(connect_observer=None, **kwargs):
+    """
+    requests HTTPAdapter whose connections report connection setup phases
+
+    New connections record a 'tcp_connect' span (DNS + TCP) and, for HTTPS,
+    a 'tls_handshake' span under the current trace span. Reused keep-alive
+    connections record nothing, which itself shows up as a short request.
+
+    Args:
+        connect_observer: Optional callback(host, seconds) called for every
+            new TCP connection, traced or not
+        **kwargs: Passed to HTTPAdapter
+    """
+    from requests.adapters import HTTPAdapter
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    def timed_new_conn(conn, new_conn):
+        start = time.perf_counter()
+        with trace_span("tcp_connect", host=conn.host):
+            sock = new_conn()
+        conn._tcp_connected_at = time.perf_counter()
+        if connect_observer is not None:
+            connect_observer(conn.host, conn._tcp_connected_at - start)
+        return sock
+
+    class TimedHTTPConnection(HTTPConnection):
+        def _new_conn(self):
+            return timed_new_conn(self, super()._new_conn)
+
+    class TimedHTTPSConnection(HTTPSConnection):
+        def _new_conn(self):
+            return timed_new_conn(self, super()._new_conn)
+
+        def connect(self):
+            stack = getattr(_active, "stack", None)
+            if not stack:
+                return super().connect()
+            tracer, parent = stack[-1]
+            start = time.perf_counter()
+            self._tcp_connected_at = None
+            super().connect()
+            tracer.record("tls_handshake", self._tcp_connected_at or start, time.perf_counter(),
+                          parent=parent, host=self.host)
+
+    class TimedHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = TimedHTTPConnection
+
+    class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = TimedHTTPSConnection
+
+    class TracingHTTPAdapter(HTTPAdapter):
+        def init_poolmanager(self, *args, **pool_kwargs):
+            super().init_poolmanager(*args, **pool_kwargs)
+            self.poolmanager.pool_classes_by_scheme = {
+                "http": TimedHTTPConnectionPool,
+                "https": TimedHTTPSConnectionPool
+            }
+
+    return TracingHTTPAdapter(**kwargs)
@@ -0,0 +1,228 @@
+"""
+Optional HTTP/2 transport for RDAP and WHOIS API requests.
+
+By default AdvancedWHOISFetcher sends requests through a shared requests
+session, where every concurrent query to a registry needs its own HTTP/1.1
+connection. Http2Transport (httpx, `pip install httpx[http2]`) multiplexes
+concurrent queries as streams over a few HTTP/2 connections per host instead,
+and keeps per-connection stream counts so the effect is visible.
+LocalH2Server is a cleartext HTTP/2 stub for exercising it locally.
+"""
+import json
+import socket
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from tracing import record_span
+
+HTTP2_MAX_CONNECTIONS = 64         # connections across all hosts
+HTTP2_MAX_KEEPALIVE = 32
+
+
+class Http2Transport:
+    """
+    httpx-based transport with the subset of the requests API the fetcher uses
+
+    Args:
+        max_connections: Connection limit across all hosts; HTTP/2 hosts
+            normally need only one, since requests become streams on it
+        connect_observer: Optional callback(host, seconds) for every new TCP
+            connection (used for adaptive timeouts)
+        prior_knowledge: Speak HTTP/2 over cleartext without upgrade (for
+            LocalH2Server and other h2c endpoints)
+    """
+
+    name = "http/2"
+
+    def __init__(self, max_connections: int = HTTP2_MAX_CONNECTIONS,
+                 connect_observer: Optional[Callable[[str, float], None]] = None,
+                 prior_knowledge: bool = False):
+        try:
+            import httpx
+        except ImportError as e:
+            raise RuntimeError("The HTTP/2 transport requires httpx: pip install 'httpx[http2]'") from e
+
+        self._client = httpx.Client(
+            http2=True,
+            http1=not prior_knowledge,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=min(max_connections, HTTP2_MAX_KEEPALIVE))
+        )
+        self._httpx = httpx
+        self.read_timeout_errors = (httpx.ReadTimeout,)
+        self.connect_observer = connect_observer
+        self._lock = threading.Lock()
+        self._connections: Dict[int, dict] = {}
+        self._in_flight: Dict[str, int] = defaultdict(int)
+        self._peak_in_flight: Dict[str, int] = defaultdict(int)
+
+    def _trace_hook(self, host: str):
+        """httpcore trace callback: connection setup spans and connect timings"""
+        started = {}
+
+        def hook(event, info):
+            phase, _, state = event.rpartition(".")
+            if phase not in ("connection.connect_tcp", "connection.start_tls"):
+                return
+            if state == "started":
+                started[phase] = time.perf_counter()
+                return
+            if phase not in started:
+                return
+            start, end = started.pop(phase), time.perf_counter()
+            if phase == "connection.connect_tcp":
+                record_span("tcp_connect", start, end, host=host)
+                if state == "complete" and self.connect_observer is not None:
+                    self.connect_observer(host, end - start)
+            else:
+                record_span("tls_handshake", start, end, host=host)
+
+        return hook
+
+    def get(self, url: str, params=None, headers=None, timeout: Optional[Tuple[float, float]] = None):
+        """
+        GET url, following redirects
+
+        Args:
+            timeout: (connect, read) seconds, as for requests
+        """
+        host = self._httpx.URL(url).host
+        if timeout is not None:
+            timeout = self._httpx.Timeout(timeout[1], connect=timeout[0])
+        with self._lock:
+            self._in_flight[host] += 1
+            self._peak_in_flight[host] = max(self._peak_in_flight[host], self._in_flight[host])
+        try:
+            resp = self._client.get(url, params=params, headers=headers, timeout=timeout,
+                                    extensions={"trace": self._trace_hook(host)})
+        finally:
+            with self._lock:
+                self._in_flight[host] -= 1
+        for hop in list(resp.history) + [resp]:
+            self._count_stream(hop)
+        return resp
+
+    def _count_stream(self, resp):
+        stream = resp.extensions.get("network_stream")
+        if stream is None:
+            return
+        with self._lock:
+            conn = self._connections.get(id(stream))
+            if conn is None:
+                client_addr = stream.get_extra_info("client_addr")
+                conn = self._connections[id(stream)] = {
+                    "host": resp.url.host,
+                    "local_port": client_addr[1] if client_addr else None,
+                    "http_version": resp.http_version,
+                    "streams": 0
+                }
+            conn["streams"] += 1
+
+    def connection_stats(self) -> List[dict]:
+        """Every connection used so far: host, local port, HTTP version and number of streams (requests) it carried"""
+        with self._lock:
+            return [dict(conn) for conn in self._connections.values()]
+
+    def host_stats(self) -> Dict[str, dict]:
+        """Per host: connections opened, streams carried and peak concurrent requests"""
+        stats: Dict[str, dict] = {}
+        for conn in self.connection_stats():
+            host = stats.setdefault(conn["host"], {"connections": 0, "streams": 0})
+            host["connections"] += 1
+            host["streams"] += conn["streams"]
+        with self._lock:
+            for name, host in stats.items():
+                host["peak_in_flight"] = self._peak_in_flight.get(name, 0)
+        return stats
+
+    def close(self):
+        self._client.close()
+
+
+class LocalH2Server:
+    """
+    Cleartext HTTP/2 (prior knowledge) stub serving JSON from a handler
+
+    Each stream is answered on its own thread, so concurrent requests really
+    are multiplexed over one connection. Not for production use.
+
+    Args:
+        handler: Callable(path) -> (status, body dict or None, extra headers)
+        delay: Seconds to wait before answering each stream
+    """
+
+    def __init__(self, handler: Callable[[str], Tuple[int, Optional[dict], Dict[str, str]]],
+                 host: str = "127.0.0.1", port: int = 0, delay: float = 0.0):
+        self.handler = handler
+        self.delay = delay
+        self._sock = socket.create_server((host, port))
+        self.host, self.port = self._sock.getsockname()[:2]
+        self.connections = 0
+        self._stop = threading.Event()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "LocalH2Server":
+        threading.Thread(target=self._accept, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._sock.close()
+
+    def _accept(self):
+        while not self._stop.is_set():
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        import h2.config
+        import h2.connection
+        import h2.events
+
+        h2_conn = h2.connection.H2Connection(config=h2.config.H2Configuration(client_side=False))
+        write_lock = threading.Lock()
+        h2_conn.initiate_connection()
+        conn.sendall(h2_conn.data_to_send())
+
+        def respond(stream_id, path):
+            if self.delay:
+                time.sleep(self.delay)
+            status, body, extra = self.handler(path)
+            data = b"" if body is None else json.dumps(body).encode("utf-8")
+            headers = [(":status", str(status)), ("content-type", "application/json"),
+                       ("content-length", str(len(data)))] + list(extra.items())
+            with write_lock:
+                h2_conn.send_headers(stream_id, headers, end_stream=not data)
+                if data:
+                    h2_conn.send_data(stream_id, data, end_stream=True)
+                conn.sendall(h2_conn.data_to_send())
+
+        with conn:
+            while not self._stop.is_set():
+                try:
+                    data = conn.recv(65535)
+                except OSError:
+                    return
+                if not data:
+                    return
+                with write_lock:
+                    events = h2_conn.receive_data(data)
+                    conn.sendall(h2_conn.data_to_send())
+                for event in events:
+                    if isinstance(event, h2.events.RequestReceived):
+                        headers = {k.decode() if isinstance(k, bytes) else k: v.decode() if isinstance(v, bytes) else v
+                                   for k, v in event.headers}
+                        threading.Thread(target=respond, args=(event.stream_id, headers[":path"]),
+                                         daemon=True).start()
+                    elif isinstance(event, h2.events.ConnectionTerminated):
+                        return
@@ -1,52 +1,159 @@
 import pandas as pd
-import streamlit as st
-from typing import List, Optional
+from typing import BinaryIO, Callable, Iterator, List, Optional, Tuple
 import io
+import logging
+
+logger = logging.getLogger(__name__)
+
+CSV_CHUNK_ROWS = 50000             # rows parsed at a time from (possibly compressed) CSV streams
+DOMAIN_COLUMNS = ['domain', 'domains', 'website', 'url', 'site', 'Domain', 'Website', 'URL']
+COMPRESSED_SUFFIXES = {'.gz': 'gzip', '.gzip': 'gzip', '.zst': 'zstd', '.zstd': 'zstd'}
+PLAIN_FORMATS = ('csv', 'txt', 'xlsx', 'xls')
+
+
+class UnsupportedFormatError(ValueError):
+    """File format (or compression codec) that iter_domains cannot read"""
+
+
+def split_file_name(name: str) -> Tuple[str, List[str]]:
+    """
+    Format and compression layers of a file name, outermost layer first
+
+    'export.csv.gz' -> ('csv', ['gzip']); 'bundle.zip' -> ('zip', [])
+    """
+    name = name.lower()
+    layers = []
+    while True:
+        suffix = name[name.rfind('.'):] if '.' in name else ''
+        if suffix not in COMPRESSED_SUFFIXES:
+            break
+        layers.append(COMPRESSED_SUFFIXES[suffix])
+        name = name[:-len(suffix)]
+    return name.rsplit('.', 1)[-1] if '.' in name else '', layers
+
+
+def _decompressed(stream: BinaryIO, codec: str) -> BinaryIO:
+    """Streaming decompressor over a binary file object"""
+    if codec == 'gzip':
+        import gzip
+        return gzip.GzipFile(fileobj=stream, mode='rb')
+    try:
+        import zstandard
+    except ImportError:
+        raise UnsupportedFormatError("Reading .zst files requires the 'zstandard' package") from None
+    return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(stream, closefd=False))
+
+
+def _iter_csv_domains(stream: BinaryIO, name: str, warn: Callable[[str], None]) -> Iterator[str]:
+    reader = pd.read_csv(stream, chunksize=CSV_CHUNK_ROWS, dtype=str)
+    domain_column = None
+    for chunk in reader:
+        if domain_column is None:
+            domain_column = next((c for c in DOMAIN_COLUMNS if c in chunk.columns), None)
+            if domain_column is None:
+                # If no obvious column found, use the first column
+                domain_column = chunk.columns[0]
+                warn(f"No domain column found in {name}. Using first column: '{domain_column}'")
+        for domain in chunk[domain_column].dropna():
+            domain = domain.strip()
+            if domain:
+                yield domain
+
+
+def _iter_excel_domains(stream: BinaryIO, name: str, warn: Callable[[str], None]) -> Iterator[str]:
+    # Excel readers need random access; only this one workbook is held in memory
+    df = pd.read_excel(io.BytesIO(stream.read()))
+    domain_column = next((c for c in DOMAIN_COLUMNS if c in df.columns), None)
+    if domain_column is None:
+        domain_column = df.columns[0]
+        warn(f"No domain column found in {name}. Using first column: '{domain_column}'")
+    for domain in df[domain_column].dropna().astype(str):
+        domain = domain.strip()
+        if domain:
+            yield domain
+
+
+def _iter_text_domains(stream: BinaryIO) -> Iterator[str]:
+    for line in io.TextIOWrapper(stream, encoding='utf-8', errors='replace'):
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield line
+
+
+def iter_domains(stream: BinaryIO, name: str, default_format: Optional[str] = None,
+                 warn: Optional[Callable[[str], None]] = None) -> Iterator[str]:
+    """
+    Stream domains out of a binary file object, decompressing on the fly
+
+    Handles CSV, Excel and text files, gzip/zstd compressed (compound
+    extensions such as .csv.gz or .txt.zst), and zip archives, whose members
+    are read one after another without extracting to disk.
+
+    Args:
+        stream: Binary file object (read sequentially)
+        name: File name, used to detect the format
+        default_format: Format assumed for unrecognized extensions (e.g.
+            'txt'); by default they are rejected
+        warn: Callback for non-fatal problems (e.g. no domain column found);
+            defaults to logging a warning
+
+    Returns:
+        Iterator over the non-empty domain strings, in file order
+
+    Raises:
+        UnsupportedFormatError: The file (or a codec it needs) is not supported
+    """
+    if warn is None:
+        warn = logger.warning
+    file_format, layers = split_file_name(name)
+    if file_format not in PLAIN_FORMATS + ('zip',) and default_format:
+        file_format = default_format
+    for codec in layers:
+        stream = _decompressed(stream, codec)
+
+    if file_format == 'zip':
+        import zipfile
+        with zipfile.ZipFile(stream if stream.seekable() else io.BytesIO(stream.read())) as archive:
+            for member in archive.infolist():
+                base = member.filename.rsplit('/', 1)[-1]
+                if member.is_dir() or member.filename.startswith('__MACOSX/') or base.startswith('.'):
+                    continue
+                if split_file_name(base)[0] not in PLAIN_FORMATS + ('zip',):
+                    continue
+                with archive.open(member) as member_stream:
+                    yield from iter_domains(member_stream, base, warn=warn)
+    elif file_format == 'csv':
+        yield from _iter_csv_domains(stream, name, warn)
+    elif file_format in ('xlsx', 'xls'):
+        yield from _iter_excel_domains(stream, name, warn)
+    elif file_format == 'txt':
+        yield from _iter_text_domains(stream)
+    else:
+        raise UnsupportedFormatError(f"Unsupported file format: {name}")
+
 
 def read_domains_from_file(uploaded_file) -> Optional[List[str]]:
     """
-    Read domains from uploaded file (CSV or Excel)
+    Read domains from uploaded file (CSV, Excel or text; optionally gzip/zstd
+    compressed or bundled in a zip archive)
     
     Args:
-        uploaded_file: Streamlit uploaded file object
+        uploaded_file: Streamlit uploaded file object (or any binary file with a name)
         
     Returns:
         List of domain names or None if error
     """
+    import streamlit as st
+
     try:
-        file_extension = uploaded_file.name.split('.')[-1].lower()
-        
-        if file_extension == 'csv':
-            df = pd.read_csv(uploaded_file)
-        elif file_extension in ['xlsx', 'xls']:
-            df = pd.read_excel(uploaded_file)
-        else:
-            st.error("Unsupported file format. Please upload CSV or Excel file.")
-            return None
-        
-        # Try to find domain column
-        domain_column = None
-        possible_names = ['domain', 'domains', 'website', 'url', 'site', 'Domain', 'Website', 'URL']
-        
-        for col_name in possible_names:
-            if col_name in df.columns:
-                domain_column = col_name
-                break
-        
-        if domain_column is None:
-            # If no obvious column found, use the first column
-            domain_column = df.columns[0]
-            st.warning(f"No domain column found. Using first column: '{domain_column}'")
-        
-        # Extract domains and clean them
-        domains = df[domain_column].dropna().astype(str).tolist()
-        domains = [domain.strip() for domain in domains if domain.strip()]
-        
-        return domains
-        
+        domains = list(iter_domains(uploaded_file, uploaded_file.name, warn=st.warning))
+    except UnsupportedFormatError as e:
+        st.error(f"{e}. Please upload CSV, Excel or text files (optionally .gz, .zst or .zip).")
+        return None
     except Exception as e:
         st.error(f"Error reading file: {str(e)}")
         return None
+    return domains
 
 def create_sample_csv() -> str:
     """Create a sample CSV content for download"""
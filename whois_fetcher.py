@@ -1,123 +1,109 @@
-import whois
 import pandas as pd
-from datetime import datetime
-import time
 import logging
 from typing import Dict, List, Optional
+from advanced_whois_fetcher import AdvancedWHOISFetcher, MAX_THREADS
+from date_utils import DATE_COLUMNS
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# AdvancedWHOISFetcher result column -> legacy WHOISFetcher column
+LEGACY_COLUMNS = {
+    'Domain': 'domain',
+    'Registrar': 'registrar',
+    'Creation Date': 'registration_date',
+    'Expiration Date': 'expiry_date',
+    'Updated Date': 'update_date',
+    'Error': 'error'
+}
+
+# Sources that mean the lookup did not succeed
+FAILED_SOURCES = ('FAILED', 'EXCEPTION')
+
+
+def to_legacy_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Map AdvancedWHOISFetcher results onto the legacy snake_case schema
+
+    Args:
+        df: Results from AdvancedWHOISFetcher
+
+    Returns:
+        DataFrame with domain, registrar, registration_date, expiry_date,
+        update_date, status and error columns (dates as 'YYYY-MM-DD' strings)
+    """
+    if df.empty:
+        return pd.DataFrame(columns=list(LEGACY_COLUMNS.values()) + ['status'])
+
+    legacy = df.rename(columns=LEGACY_COLUMNS)
+
+    for column in DATE_COLUMNS:
+        name = LEGACY_COLUMNS[column]
+        if pd.api.types.is_datetime64_any_dtype(legacy[name]):
+            legacy[name] = legacy[name].dt.strftime('%Y-%m-%d').astype(object).where(legacy[name].notna(), None)
+
+    # legacy callers expect plain strings (or None) rather than categoricals / NaN
+    for name in ('registrar', 'error'):
+        legacy[name] = legacy[name].astype(object).where(legacy[name].notna(), None)
+
+    failed = legacy['Source'].isin(FAILED_SOURCES)
+    legacy['status'] = failed.map({True: 'Error', False: 'Success'})
+
+    return legacy[['domain', 'registrar', 'registration_date', 'expiry_date', 'update_date', 'status', 'error']]
+
+
 class WHOISFetcher:
-    def __init__(self, delay: float = 1.0):
+    def __init__(self, delay: Optional[float] = None, max_threads: int = MAX_THREADS, api_key: str = ""):
         """
-        Initialize WHOIS fetcher with rate limiting
-        
+        Initialize WHOIS fetcher
+
+        Lookups run on the shared AdvancedWHOISFetcher engine, so this class gets
+        the same concurrency, source chain, circuit breakers, retry budget and
+        HTTP connection pool; only the output schema differs.
+
         Args:
-            delay: Delay between requests in seconds to be respectful to WHOIS servers
+            delay: Pause after each port-43 query to be respectful to WHOIS
+                servers. Defaults to None, the engine's short random pause
+                (0.2-0.5s); before the move to the concurrent engine the
+                default was a fixed 1.0s after every lookup, so pass
+                delay=1.0 to keep that pacing
+            max_threads: Concurrent lookups
+            api_key: Paid WHOIS API key (optional)
         """
         self.delay = delay
-    
+        self.engine = AdvancedWHOISFetcher(max_threads=max_threads, api_key=api_key, port43_delay=delay)
+
     def fetch_domain_whois(self, domain: str) -> Dict:
         """
         Fetch WHOIS data for a single domain
-        
+
         Args:
             domain: Domain name to query
-            
+
         Returns:
             Dictionary containing WHOIS data
         """
-        try:
-            # Clean domain name
-            domain = domain.strip().lower()
-            if domain.startswith('http://') or domain.startswith('https://'):
-                domain = domain.split('/')[2]
-            if domain.startswith('www.'):
-                domain = domain[4:]
-            
-            logger.info(f"Fetching WHOIS data for: {domain}")
-            
-            # Fetch WHOIS data
-            w = whois.whois(domain)
-            
-            # Extract relevant information
-            result = {
-                'domain': domain,
-                'registrar': self._extract_registrar(w),
-                'registration_date': self._extract_date(w.creation_date),
-                'expiry_date': self._extract_date(w.expiration_date),
-                'update_date': self._extract_date(w.updated_date),
-                'status': 'Success',
-                'error': None
-            }
-            
-            # Add rate limiting delay
-            time.sleep(self.delay)
-            
-            return result
-            
-        except Exception as e:
-            logger.error(f"Error fetching WHOIS for {domain}: {str(e)}")
-            return {
-                'domain': domain,
-                'registrar': None,
-                'registration_date': None,
-                'expiry_date': None,
-                'update_date': None,
-                'status': 'Error',
-                'error': str(e)
-            }
-    
-    def _extract_registrar(self, whois_data) -> Optional[str]:
-        """Extract registrar name from WHOIS data"""
-        if hasattr(whois_data, 'registrar') and whois_data.registrar:
-            if isinstance(whois_data.registrar, list):
-                return whois_data.registrar[0] if whois_data.registrar else None
-            return str(whois_data.registrar)
-        return None
-    
-    def _extract_date(self, date_field) -> Optional[str]:
-        """Extract and format date from WHOIS data"""
-        if not date_field:
-            return None
-        
-        try:
-            if isinstance(date_field, list):
-                date_field = date_field[0] if date_field else None
-            
-            if isinstance(date_field, datetime):
-                return date_field.strftime('%Y-%m-%d')
-            elif isinstance(date_field, str):
-                # Try to parse string date
-                try:
-                    parsed_date = datetime.strptime(date_field, '%Y-%m-%d')
-                    return parsed_date.strftime('%Y-%m-%d')
-                except:
-                    return date_field
-            
-        except Exception as e:
-            logger.warning(f"Error parsing date {date_field}: {str(e)}")
-        
-        return None
-    
+        logger.info(f"Fetching WHOIS data for: {domain}")
+
+        result = self.engine.fetch_domain_with_backoff(domain)
+        if result['Source'] in FAILED_SOURCES:
+            logger.error(f"Error fetching WHOIS for {result['Domain']}: {result['Error']}")
+
+        return to_legacy_schema(pd.DataFrame([result])).iloc[0].to_dict()
+
     def fetch_multiple_domains(self, domains: List[str]) -> pd.DataFrame:
         """
-        Fetch WHOIS data for multiple domains
-        
+        Fetch WHOIS data for multiple domains concurrently
+
         Args:
             domains: List of domain names
-            
+
         Returns:
             DataFrame containing WHOIS data for all domains
         """
-        results = []
-        total_domains = len(domains)
-        
-        for i, domain in enumerate(domains, 1):
-            logger.info(f"Processing domain {i}/{total_domains}: {domain}")
-            result = self.fetch_domain_whois(domain)
-            results.append(result)
-        
-        return pd.DataFrame(results)
\ No newline at end of file
+        def log_progress(completed, total, domain):
+            logger.info(f"Processed domain {completed}/{total}: {domain}")
+
+        results = self.engine.fetch_multiple_domains_advanced(domains, log_progress)
+        return to_legacy_schema(results)
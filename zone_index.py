@@ -0,0 +1,261 @@
+"""
+Offline registration index built from local zone files.
+
+A TLD zone file lists every delegated domain of that TLD. build_zone_index()
+reduces one or more zone files to a sorted array of 8-byte name hashes plus
+the list of zones it covers; ZoneIndex memory-maps that array and answers
+membership with a binary search (vectorized with numpy for whole batches).
+
+A domain under a covered zone that is missing from the index is reported as
+absent without any network lookup. Absent is not the same as unregistered:
+registered domains without nameservers (serverHold, clientHold, redemption)
+are not in zone files either, so callers must not treat absence as a
+definitive answer (the fetcher reports these domains as NOT_IN_ZONE). Hash
+collisions can only make an absent domain look present, which just sends it
+down the normal lookup path.
+
+Names are compared in their ASCII (IDNA / punycode) form, as zone files
+store them: münchen.de is looked up as xn--mnchen-3ya.de.
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import time
+from array import array
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+HASHES_FILE = "hashes.u64"
+META_FILE = "zones.json"
+CHUNK_SIZE = 1_000_000  # hashes collected per chunk while building
+
+
+def to_ascii(domain: str) -> str:
+    """
+    Lowercase ASCII form of a domain name, Unicode labels IDNA-encoded
+    ("München.de" -> "xn--mnchen-3ya.de"); labels that cannot be encoded
+    are kept as they are
+    """
+    labels = []
+    for label in domain.strip().rstrip(".").split("."):
+        if label.isascii():
+            labels.append(label.lower())
+            continue
+        try:
+            labels.append(label.encode("idna").decode("ascii"))
+        except UnicodeError:
+            labels.append(label.lower())
+    return ".".join(labels)
+
+
+def name_hash(name: str) -> int:
+    """64-bit hash of a lowercase ASCII domain name without trailing dot (see to_ascii)"""
+    return int.from_bytes(hashlib.blake2b(name.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _open_zone(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, encoding="utf-8", errors="replace")
+
+
+def _zone_from_filename(path: str) -> str:
+    name = os.path.basename(path).lower()
+    for suffix in (".gz", ".txt", ".zone"):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return name.strip(".")
+
+
+def iter_zone_domains(path: str) -> Iterator[tuple]:
+    """
+    Yield (zone, domain) for every name delegated directly under the zone
+    apex of a master-format zone file
+
+    The apex is taken from the SOA record, else $ORIGIN, else the file name
+    ("com.zone.gz" -> "com"). Deeper names such as glue records are mapped
+    to the delegated domain they belong to.
+    """
+    origin = _zone_from_filename(path)
+    apex = None
+    with _open_zone(path) as f:
+        for line in f:
+            if not line.strip() or line[0] in " \t;":
+                # blank, comment, or a continuation of the previous owner
+                continue
+            tokens = line.split(";", 1)[0].split()
+            if not tokens:
+                continue
+            owner = tokens[0].lower()
+            if owner == "$origin" and len(tokens) > 1:
+                origin = tokens[1].lower().rstrip(".")
+                continue
+            if owner.startswith("$"):
+                continue
+
+            if owner == "@":
+                owner = origin
+            elif owner.endswith("."):
+                owner = owner.rstrip(".")
+            else:
+                owner = f"{owner}.{origin}" if origin else owner
+
+            if apex is None:
+                apex = owner if any(t.upper() == "SOA" for t in tokens[1:]) else origin
+            if not owner.endswith("." + apex):
+                continue
+            label = owner[:-len(apex) - 1].rsplit(".", 1)[-1]
+            yield apex, f"{label}.{apex}"
+
+
+def build_zone_index(zone_paths: Iterable[str], out_dir: str) -> dict:
+    """
+    Build an index directory from zone files
+
+    Args:
+        zone_paths: Zone files (plain or .gz), one zone each
+        out_dir: Directory to write hashes.u64 and zones.json to
+
+    Returns:
+        The index metadata (zones covered, domain count, build time)
+    """
+    import numpy as np
+
+    os.makedirs(out_dir, exist_ok=True)
+    chunks = []
+    zones = set()
+    for path in zone_paths:
+        current = array("Q")
+        for zone, domain in iter_zone_domains(path):
+            zones.add(zone)
+            current.append(name_hash(domain))
+            if len(current) >= CHUNK_SIZE:
+                chunks.append(np.unique(np.frombuffer(current, dtype=np.uint64)))
+                current = array("Q")
+        if current:
+            chunks.append(np.unique(np.frombuffer(current, dtype=np.uint64)))
+
+    hashes = np.unique(np.concatenate(chunks)) if chunks else np.empty(0, dtype=np.uint64)
+    tmp = os.path.join(out_dir, HASHES_FILE + ".tmp")
+    hashes.astype("<u8").tofile(tmp)
+    os.replace(tmp, os.path.join(out_dir, HASHES_FILE))
+
+    meta = {"zones": sorted(zones), "count": int(len(hashes)), "built_at": time.time()}
+    with open(os.path.join(out_dir, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    return meta
+
+
+class ZoneIndex:
+    """
+    Memory-mapped registration index
+
+    Args:
+        path: Directory written by build_zone_index()
+    """
+
+    def __init__(self, path: str):
+        import numpy as np
+
+        self.path = path
+        with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.zones = set(self.meta["zones"])
+        if self.meta["count"]:
+            self._hashes = np.memmap(os.path.join(path, HASHES_FILE), dtype="<u8", mode="r")
+        else:
+            self._hashes = np.empty(0, dtype="<u8")
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def registrable_name(self, domain: str) -> Optional[str]:
+        """
+        ASCII name delegated under the longest covered zone suffix of domain,
+        or None if not covered
+        """
+        labels = to_ascii(domain).split(".")
+        for i in range(1, len(labels)):
+            if ".".join(labels[i:]) in self.zones:
+                return ".".join(labels[i - 1:])
+        return None
+
+    def _contains(self, hashes: "np.ndarray") -> "np.ndarray":
+        import numpy as np
+
+        if not len(self._hashes):
+            return np.zeros(len(hashes), dtype=bool)
+        positions = np.searchsorted(self._hashes, hashes)
+        found = np.zeros(len(hashes), dtype=bool)
+        valid = positions < len(self._hashes)
+        found[valid] = self._hashes[positions[valid]] == hashes[valid]
+        return found
+
+    def is_absent(self, domain: str) -> bool:
+        """True only when domain's zone is covered and the domain is absent from it"""
+        return bool(self.absent([domain]))
+
+    def absent(self, domains: List[str]) -> List[str]:
+        """
+        The domains missing from their (covered) zone: unregistered, or
+        registered without nameservers
+
+        Args:
+            domains: Normalized domains
+
+        Returns:
+            Subset of domains, in input order
+        """
+        import numpy as np
+
+        covered = []
+        hashes = []
+        for domain in domains:
+            name = self.registrable_name(domain)
+            if name is not None:
+                covered.append(domain)
+                hashes.append(name_hash(name))
+        if not covered:
+            return []
+        found = self._contains(np.array(hashes, dtype=np.uint64))
+        return [domain for domain, present in zip(covered, found) if not present]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline registration index from zone files")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Build an index from zone files (plain or .gz)")
+    build.add_argument("zones", nargs="+", help="Zone files")
+    build.add_argument("-o", "--output", required=True, help="Index directory")
+
+    check = commands.add_parser("check", help="Report which domains are missing from their zone")
+    check.add_argument("index", help="Index directory")
+    check.add_argument("domains", nargs="+")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        meta = build_zone_index(args.zones, args.output)
+        print(f"Indexed {meta['count']} domains across {len(meta['zones'])} zones into {args.output}")
+    elif args.command == "check":
+        index = ZoneIndex(args.index)
+        absent = set(index.absent(args.domains))
+        for domain in args.domains:
+            if domain in absent:
+                state = "not in zone"
+            elif index.registrable_name(domain) is None:
+                state = "not covered"
+            else:
+                state = "in zone"
+            print(f"{domain}\t{state}")
+
+
+if __name__ == "__main__":
+    main()